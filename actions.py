@@ -1,5 +1,16 @@
-import random
 from player import BODY_PARTS # Import BODY_PARTS for random injury selection
+from combat import CombatEngine
+from random_streams import get_stream
+
+rng = get_stream("combat") # Rolls for fleeing and its injuries
+_engine = None # Built on the first attack, so combat_rules.json is only read once
+
+def combat_engine():
+    """The CombatEngine player attacks are resolved with, shared between attacks."""
+    global _engine
+    if _engine is None:
+        _engine = CombatEngine()
+    return _engine
 
 def attack(player, characters_in_room):
     """Player attempts to attack."""
@@ -7,43 +18,37 @@ def attack(player, characters_in_room):
     if player.is_part_severely_injured('left_arm') and player.is_part_severely_injured('right_arm'):
         return "Your arms are too severely injured to even attempt an attack!", False
 
-    guards = [c for c in characters_in_room if c.role == 'Guard']
+    guards = [c for c in characters_in_room if c.role == 'Guard' and c.health > 0]
     if guards:
         guard = guards[0]
-        
-        # Player takes damage from attacking a guard
-        base_damage_taken = random.randint(30, 50) # Substantial damage
-        
-        # Apply debuffs to player's attack effectiveness (which might indirectly increase damage taken)
-        attack_debuff = player.get_debuff(action_type='attack')
-        # A simple way to model debuff: increase damage taken
-        damage_taken = base_damage_taken + (attack_debuff * 5) # Each debuff point adds 5 damage
-
-        player.health -= damage_taken
-        morale_message = player.change_morale(-5) # Lose morale for taking damage
 
-        # Apply injury to a random body part
-        if damage_taken > 0:
-            injured_part = random.choice(BODY_PARTS)
-            # Severity scales with damage. For simplicity, if damage is high, more severe injury.
-            if damage_taken >= 45:
-                injury_msg = player.apply_injury(injured_part, 'severe_injury')
-            elif damage_taken >= 35:
-                injury_msg = player.apply_injury(injured_part, 'major_injury')
-            elif damage_taken >= 25:
-                injury_msg = player.apply_injury(injured_part, 'minor_injury')
-            else:
-                injury_msg = "" # No new injury if damage is too low
+        # One round against the guard, resolved by the combat engine (stats in combat_rules.json)
+        engine = combat_engine()
+        engine.add_player(player)
+        engine.add_character("guard", guard, player.location)
+        try:
+            result = engine.resolve_tick()
+        finally:
+            engine.end_encounter(player.location) # The engine is reused for the next attack
+        damage_taken = result["damage"].get("player", 0)
+        damage_dealt = result["damage"].get("guard", 0)
+        morale_message = player.change_morale(-5) if damage_taken else "" # Lose morale for taking damage
 
         if player.health <= 0:
             return f"You foolishly lunge at {guard.name}. They don't even break a sweat as they neutralize you. The world fades to black.", True
+        if damage_dealt:
+            final_message = f"You lunge at {guard.name} and land a blow for {damage_dealt} damage!"
         else:
-            final_message = f"You foolishly lunge at {guard.name}. They easily sidestep and counter, dealing {damage_taken} damage! You manage to stumble back, but that was a mistake."
-            if injury_msg:
-                final_message += f" {injury_msg}"
-            if morale_message:
-                final_message += f" {morale_message}"
-            return final_message, False
+            final_message = f"You foolishly lunge at {guard.name}. They easily sidestep."
+        if damage_taken:
+            final_message += f" They counter, dealing {damage_taken} damage! You manage to stumble back, but that was a mistake."
+        if "guard" in result["defeated"]:
+            final_message += f" {guard.name} collapses and doesn't get up."
+        for injury_msg in result["injuries"]:
+            final_message += f" {injury_msg}"
+        if morale_message:
+            final_message += f" {morale_message}"
+        return final_message, False
     else:
         return "You swing wildly at the air. There's nothing here to attack.", False
 
@@ -57,9 +62,9 @@ def run(player, characters_in_room, current_room_exits, game_map):
     
     # Running consumes stamina regardless of success
     base_stamina_cost = 20
-    stamina_debuff_injury = player.get_debuff(action_type='run')
+    run_modifier = player.get_action_modifier('run') # Injuries (negative) and held items
     morale_effect_stamina = player.get_morale_effect('run') # Morale can affect stamina cost
-    stamina_cost = base_stamina_cost + (stamina_debuff_injury * 2) - morale_effect_stamina # Injuries increase cost, good morale reduces it
+    stamina_cost = base_stamina_cost - (run_modifier * 2) - morale_effect_stamina # Injuries increase cost, good morale reduces it
     
     if player.stamina < stamina_cost:
         return "You are too exhausted to run!", False
@@ -69,11 +74,8 @@ def run(player, characters_in_room, current_room_exits, game_map):
         guard = guards[0]
         
         # Success chance based on player dexterity vs guard dexterity, adjusted by injury debuff and morale
-        dex_difference = player.attributes['dexterity'] - guard.attributes['dexterity']
-        dex_injury_debuff = player.get_debuff(attribute='dexterity')
-        morale_effect_dex = player.get_morale_effect('dexterity') # Morale can affect underlying attribute directly
-        
-        effective_player_dex = player.attributes['dexterity'] - dex_injury_debuff + morale_effect_dex
+        # Injuries, morale and held items, from the player's cached modifiers
+        effective_player_dex = player.get_effective_attribute('dexterity')
 
         effective_player_dex = max(1, effective_player_dex) # Ensure not negative
 
@@ -83,22 +85,23 @@ def run(player, characters_in_room, current_room_exits, game_map):
 
         success_chance = max(0.1, min(success_chance, 0.9)) # Min 10%, Max 90%
 
-        if random.random() < success_chance:
+        if rng.random() < success_chance:
             # On success, move to a random adjacent room.
-            player.location = random.choice(list(current_room_exits.values()))
+            exit_info = rng.choice(list(current_room_exits.values()))
+            player.location = exit_info["destination"] if isinstance(exit_info, dict) else exit_info
             morale_message = player.change_morale(10) # Gain morale for successful escape
             final_message = f"You make a mad dash! In the chaos, you manage to slip past {guard.name} and into another room."
             if morale_message:
                 final_message += f" {morale_message}"
             return final_message, False
         else:
-            damage_taken = random.randint(15, 35) # Damage on failed run
+            damage_taken = rng.randint(15, 35) # Damage on failed run
             player.health -= damage_taken
             morale_message = player.change_morale(-10) # Lose morale for failed escape
             
             # Apply injury to a random body part, biased towards legs for failed runs
             injury_msg = ""
-            injured_part = random.choice(['left_leg', 'right_leg', random.choice(BODY_PARTS)]) # Higher chance for leg injury
+            injured_part = rng.choice(['left_leg', 'right_leg', rng.choice(BODY_PARTS)]) # Higher chance for leg injury
             
             if damage_taken >= 30:
                 injury_msg = player.apply_injury(injured_part, 'severe_injury')
@@ -0,0 +1,72 @@
+# bench_door_checks.py
+# Move checks per second: the old per-call exit lookups (fetch the room,
+# normalize the exit, allocate a dict) against DoorManager's compiled door
+# table, plus full navigation.move calls.
+
+import random
+import time
+
+from door_manager import DoorManager
+from map_generator import generate_grid_map
+from navigation import move
+from player import Player
+
+def legacy_door_details(map_data, current_room_id, direction):
+    """DoorManager.get_door_details as every check used to call it."""
+    room = map_data.get(current_room_id)
+    if room and "exits" in room:
+        exit_info = room["exits"].get(direction)
+        if exit_info:
+            if isinstance(exit_info, str):
+                return {"destination": exit_info, "door_level": 0}
+            return exit_info
+    return None
+
+def legacy_move_check(map_data, clearance_level, current_room_id, direction):
+    """get_destination, check_access and get_door_level, each looking the exit up again."""
+    door_details = legacy_door_details(map_data, current_room_id, direction)
+    if door_details is None or door_details.get("destination") is None:
+        return None
+    door_details = legacy_door_details(map_data, current_room_id, direction)
+    if clearance_level < door_details.get("door_level", 0):
+        return legacy_door_details(map_data, current_room_id, direction).get("door_level", 0)
+    return door_details.get("destination")
+
+def run_benchmark(num_checks=500000):
+    print(f"--- Door check benchmark: {num_checks} move checks ---")
+    game_map, _ = generate_grid_map(100, 100, door_level_weights={0: 6, 1: 3, 2: 1})
+    # Half the exits in the old string format, which the old path re-normalized on every call
+    for room in game_map.values():
+        for direction, exit_info in room["exits"].items():
+            if exit_info["door_level"] == 0 and random.random() < 0.5:
+                room["exits"][direction] = exit_info["destination"]
+    door_manager = DoorManager(game_map)
+    room_ids = list(game_map)
+    checks = [(random.randint(0, 2), random.choice(room_ids), random.choice(["north", "south", "east", "west"]))
+              for _ in range(num_checks)]
+
+    start = time.perf_counter()
+    for clearance_level, room_id, direction in checks:
+        legacy_move_check(game_map, clearance_level, room_id, direction)
+    legacy_time = time.perf_counter() - start
+    print(f"Per-call lookups: {num_checks / legacy_time:>12,.0f} checks/s")
+
+    start = time.perf_counter()
+    get_exit = door_manager.get_exit
+    for clearance_level, room_id, direction in checks:
+        door = get_exit(room_id, direction)
+        if door is not None and clearance_level >= door[1]:
+            pass
+    compiled_time = time.perf_counter() - start
+    print(f"Compiled table:   {num_checks / compiled_time:>12,.0f} checks/s ({legacy_time / compiled_time:.1f}x)")
+
+    player = Player(room_ids[0])
+    start = time.perf_counter()
+    for clearance_level, room_id, direction in checks:
+        player.location, player.clearance_level = room_id, clearance_level
+        move(player, direction, game_map, door_manager)
+    move_time = time.perf_counter() - start
+    print(f"navigation.move:  {num_checks / move_time:>12,.0f} moves/s")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,82 @@
+# bench_npc_memory.py
+# tracemalloc report of memory per NPC: the old layout (a dict per NPC holding
+# a __dict__-based Character with an attributes dict and a datetime) against
+# the current NPCManager struct-of-arrays store, both with Characters left
+# unmaterialized and with every Character generated.
+
+import contextlib
+import datetime
+import io
+import random
+import tracemalloc
+
+from character import generate_character
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+
+class LegacyCharacter:
+    """The Character layout before __slots__, interning and packed attributes."""
+    def __init__(self, character):
+        self.role = character.role.lower().capitalize() # A fresh string per NPC, as before
+        self.name = "".join(character.name)
+        self.origin = character.origin
+        self.personality = character.personality
+        self.specialty = character.specialty
+        self.clearance_level = character.clearance_level
+        self.max_health = character.max_health
+        self.health = character.health
+        self.max_stamina = character.max_stamina
+        self.stamina = character.stamina
+        self.attributes = character.attributes.to_dict()
+        self.level = 1
+
+def measure(build):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    keep_alive = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep_alive
+    return after - before
+
+def run_benchmark(num_npcs=100000):
+    print(f"--- NPC memory report: {num_npcs} NPCs ---")
+    game_map, _ = generate_grid_map(50, 50)
+    room_ids = list(game_map.keys())
+    roles = [random.choice(["Guard", "Scientist", "D-Class"]) for _ in range(num_npcs)]
+    rooms = [random.choice(room_ids) for _ in range(num_npcs)]
+
+    def build_legacy():
+        npcs = {}
+        for i, (role, room) in enumerate(zip(roles, rooms)):
+            npcs[f"npc_{i + 1:03d}"] = {
+                "character": LegacyCharacter(generate_character(role)),
+                "current_room": room,
+                "last_moved_at": datetime.datetime.now()
+            }
+        return npcs
+
+    def build_compact():
+        npc_manager = NPCManager(game_map)
+        with contextlib.redirect_stdout(io.StringIO()): # spawn_npc prints every spawn
+            for role, room in zip(roles, rooms):
+                npc_manager.spawn_npc(role, room)
+        return npc_manager
+
+    def build_materialized():
+        npc_manager = build_compact()
+        for npc_id in npc_manager.get_npc_ids():
+            npc_manager.get_character(npc_id)
+        return npc_manager
+
+    graph_bytes = measure(lambda: NPCManager(game_map))
+    legacy_bytes = measure(build_legacy)
+    compact_bytes = measure(build_compact) - graph_bytes
+    materialized_bytes = measure(build_materialized) - graph_bytes
+    print(f"Before (dict + Character + datetime):       {legacy_bytes / num_npcs:,.0f} bytes/NPC")
+    print(f"After, no Character looked at yet:          {compact_bytes / num_npcs:,.0f} bytes/NPC")
+    print(f"After, every Character materialized:       {materialized_bytes / num_npcs:,.0f} bytes/NPC")
+    print(f"Reduction (lazy): {1 - compact_bytes / legacy_bytes:.0%}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,38 @@
+# bench_npc_tick.py
+# Measures batch NPC movement throughput (NPCManager.tick_all) against the
+# one-at-a-time NPCManager.move_npc loop.
+
+import contextlib
+import io
+import time
+
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+
+def build_manager(num_npcs, grid_size=100):
+    game_map, _ = generate_grid_map(grid_size, grid_size, door_level_weights={0: 6, 1: 3, 2: 1})
+    npc_manager = NPCManager(game_map)
+    share = num_npcs // 3
+    start = time.perf_counter()
+    npc_manager.spawn_npcs({"Guard": share, "Scientist": share, "D-Class": num_npcs - 2 * share}, list(game_map))
+    print(f"spawn_npcs: {num_npcs} NPCs in {time.perf_counter() - start:.3f}s")
+    return npc_manager
+
+def run_benchmark(num_npcs=200000, ticks=20):
+    print(f"--- NPC movement benchmark: {num_npcs} NPCs ---")
+    npc_manager = build_manager(num_npcs)
+
+    start = time.perf_counter()
+    moved = sum(npc_manager.tick_all() for _ in range(ticks))
+    elapsed = time.perf_counter() - start
+    print(f"tick_all: {moved} moves in {elapsed:.3f}s ({moved / elapsed:,.0f} moves/s)")
+
+    npc_ids = npc_manager.get_npc_ids()[:50000]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): # move_npc reports NPCs with no usable exit
+        moved = sum(npc_manager.move_npc(npc_id) for npc_id in npc_ids)
+    elapsed = time.perf_counter() - start
+    print(f"move_npc: {moved} moves in {elapsed:.3f}s ({moved / elapsed:,.0f} moves/s)")
+
+if __name__ == "__main__":
+    run_benchmark()
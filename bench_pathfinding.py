@@ -0,0 +1,42 @@
+# bench_pathfinding.py
+# Compares single-query latency of flat BFS (pathfinding.shortest_path) with
+# HierarchicalPathfinder across generated map sizes.
+
+import random
+import time
+
+from door_manager import DoorManager
+from hierarchical_pathfinding import HierarchicalPathfinder
+from map_generator import generate_grid_map
+from pathfinding import shortest_path
+
+def run_benchmark(sides=(50, 100, 200, 316), queries=50, clearance_level=1):
+    print(f"--- Pathfinding benchmark: {queries} random queries per map, clearance {clearance_level} ---")
+    print(f"{'rooms':>8} {'precompute':>11} {'flat BFS':>12} {'hierarchical':>13} {'speedup':>8}")
+    for side in sides:
+        game_map, _ = generate_grid_map(side, side, door_level_weights={0: 7, 1: 2, 2: 1})
+        door_manager = DoorManager(game_map)
+        graph = door_manager.graph
+        room_ids = graph.room_ids
+        pairs = [(random.choice(room_ids), random.choice(room_ids)) for _ in range(queries)]
+
+        start = time.perf_counter()
+        pathfinder = HierarchicalPathfinder(door_manager)
+        pathfinder.precompute(clearance_level)
+        precompute_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for from_room_id, target_room_id in pairs:
+            shortest_path(graph, graph.index[from_room_id], graph.index[target_room_id], clearance_level)
+        flat_time = (time.perf_counter() - start) / queries
+
+        start = time.perf_counter()
+        for from_room_id, target_room_id in pairs:
+            pathfinder.next_hop(from_room_id, target_room_id, clearance_level)
+        hierarchical_time = (time.perf_counter() - start) / queries
+
+        print(f"{len(room_ids):>8} {precompute_time:>10.2f}s {flat_time * 1000:>10.2f}ms "
+              f"{hierarchical_time * 1000:>11.2f}ms {flat_time / hierarchical_time:>7.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,40 @@
+# bench_turn_scheduler.py
+# 100k sleeping entities: cost per world turn of the TurnScheduler timing
+# wheel against polling every entity for its wake-up turn.
+
+import random
+import time
+
+from turn_scheduler import TurnScheduler
+
+def run_benchmark(num_entities=100000, max_sleep=5000, turns=2000):
+    print(f"--- Turn scheduler benchmark: {num_entities} entities sleeping up to {max_sleep} turns ---")
+    wake_turns = [random.randint(1, max_sleep) for _ in range(num_entities)]
+
+    scheduler = TurnScheduler()
+    start = time.perf_counter()
+    for entity, wake_turn in enumerate(wake_turns):
+        scheduler.schedule(("npc", entity), wake_turn)
+    elapsed = time.perf_counter() - start
+    print(f"Scheduling: {elapsed / num_entities * 1e6:.2f}us per insert")
+
+    start = time.perf_counter()
+    woken = 0
+    for _ in range(turns):
+        for key in scheduler.advance():
+            woken += 1
+            scheduler.schedule_in(key, random.randint(1, max_sleep)) # Back to sleep
+    wheel_time = (time.perf_counter() - start) / turns
+    print(f"Timing wheel: {wheel_time * 1000:.3f}ms/turn ({woken / turns:.0f} entities due per turn)")
+
+    start = time.perf_counter()
+    polled_turns = 50
+    for turn in range(1, polled_turns + 1):
+        for entity in range(num_entities):
+            if wake_turns[entity] == turn:
+                wake_turns[entity] = turn + random.randint(1, max_sleep)
+    poll_time = (time.perf_counter() - start) / polled_turns
+    print(f"Polling everyone: {poll_time * 1000:.3f}ms/turn ({poll_time / wheel_time:.0f}x slower)")
+
+if __name__ == "__main__":
+    run_benchmark()
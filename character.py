@@ -1,4 +1,7 @@
+import array
 import random
+import sys
+from random_streams import get_stream
 
 # Data pools for character generation
 FIRST_NAMES = ["James", "John", "Robert", "Michael", "William", "David", "Richard", "Maria", "Olga", "Kenji"]
@@ -20,21 +23,63 @@ DIALOGUE_LINES = {
     "Careless": ["Eh, whatever.", "I'm supposed to be on break.", "Not my problem."]
 }
 
+ATTRIBUTE_NAMES = ('strength', 'dexterity', 'intelligence')
+_ATTRIBUTE_INDEX = {name: i for i, name in enumerate(ATTRIBUTE_NAMES)}
+ATTRIBUTE_MIN, ATTRIBUTE_MAX = -32768, 32767 # Range of the short integers attributes are stored in
+
+def _clamp_attribute(value):
+    return max(ATTRIBUTE_MIN, min(ATTRIBUTE_MAX, value))
+
+
+class Attributes(array.array):
+    """
+    Core attributes packed into a short-integer array. Values outside its
+    range (huge bonuses from config) are clamped rather than rejected.
+    Indexable by attribute name like the dict it replaces, e.g. attributes['strength'].
+    """
+    __slots__ = ()
+
+    def __new__(cls, values=None):
+        values = values or {}
+        return super().__new__(cls, 'h', [_clamp_attribute(values.get(name, 0)) for name in ATTRIBUTE_NAMES])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = _ATTRIBUTE_INDEX[key]
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, str):
+            key = _ATTRIBUTE_INDEX[key]
+        if isinstance(key, int):
+            value = _clamp_attribute(value)
+        super().__setitem__(key, value)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        return dict(zip(ATTRIBUTE_NAMES, self))
+
 
 class Character:
     """Represents a single character in the game, player or NPC."""
+    __slots__ = ('role', 'name', 'origin', 'personality', 'specialty', 'clearance_level',
+                 'max_health', 'health', 'max_stamina', 'stamina', 'attributes', 'level')
+
     def __init__(self, role, name, origin, personality, specialty, clearance_level, health, stamina, attributes):
-        self.role = role
-        self.name = name
-        self.origin = origin
-        self.personality = personality
-        self.specialty = specialty
+        # Descriptive strings repeat across thousands of NPCs, so share one copy of each
+        self.role = sys.intern(role)
+        self.name = sys.intern(name)
+        self.origin = sys.intern(origin)
+        self.personality = sys.intern(personality)
+        self.specialty = sys.intern(specialty)
         self.clearance_level = clearance_level
         self.max_health = health
         self.health = health
         self.max_stamina = stamina
         self.stamina = stamina
-        self.attributes = attributes
+        self.attributes = Attributes(attributes)
         self.level = 1 # Added for debug display
 
     def get_description(self, debug=False):
@@ -60,46 +105,65 @@ class Character:
         
     def get_dialogue(self):
         """Returns a random dialogue line based on personality."""
-        return random.choice(DIALOGUE_LINES.get(self.personality, ["..." ]))
+        return get_stream("dialogue").choice(DIALOGUE_LINES.get(self.personality, ["..." ]))
 
-def generate_character(role):
-    """Generates a random character object of a given role."""
+# Clearance levels a role can be generated with
+ROLE_CLEARANCES = {
+    'scientist': (2, 3),
+    'guard': (1, 2)
+}
+
+def clearance_for_seed(role, seed):
+    """Clearance level a seeded character of this role will have, without generating it."""
+    choices = ROLE_CLEARANCES.get(role.lower(), (0,))
+    return choices[seed % len(choices)]
+
+def generate_character(role, seed=None):
+    """
+    Generates a random character object of a given role.
+    With a seed the character is fully determined by (role, seed), so it can
+    be generated only when first needed and always come out the same.
+    """
+    rng = random.Random(seed) if seed is not None else get_stream("npc")
     role_str = role.lower()
-    name = f"Dr. {random.choice(LAST_NAMES)}" if role_str == 'scientist' else f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
-    origin = random.choice(ORIGINS)
-    personality = random.choice(PERSONALITIES)
+    name = f"Dr. {rng.choice(LAST_NAMES)}" if role_str == 'scientist' else f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    origin = rng.choice(ORIGINS)
+    personality = rng.choice(PERSONALITIES)
     
     # Base stats
-    health = random.randint(80, 120)
-    stamina = random.randint(80, 120)
+    health = rng.randint(80, 120)
+    stamina = rng.randint(80, 120)
     attributes = {
-        'strength': random.randint(4, 7),
-        'dexterity': random.randint(4, 7),
-        'intelligence': random.randint(4, 7)
+        'strength': rng.randint(4, 7),
+        'dexterity': rng.randint(4, 7),
+        'intelligence': rng.randint(4, 7)
     }
 
     if role_str == 'scientist':
-        specialty = random.choice(SCIENTIST_SPECIALTIES)
-        clearance_level = random.choice([2, 3])
-        attributes['intelligence'] += random.randint(2, 4) # Scientists are smarter
-        health = random.randint(70, 100) # Slightly less healthy
-        stamina = random.randint(70, 100) # Slightly less stamina
+        specialty = rng.choice(SCIENTIST_SPECIALTIES)
+        clearance_level = rng.choice(ROLE_CLEARANCES['scientist'])
+        attributes['intelligence'] += rng.randint(2, 4) # Scientists are smarter
+        health = rng.randint(70, 100) # Slightly less healthy
+        stamina = rng.randint(70, 100) # Slightly less stamina
     elif role_str == 'guard':
-        specialty = random.choice(GUARD_SPECIALTIES)
-        clearance_level = random.choice([1, 2])
-        attributes['strength'] += random.randint(2, 4) # Guards are stronger
-        attributes['dexterity'] += random.randint(1, 3) # Guards are also quick
-        health = random.randint(90, 130) # More healthy
-        stamina = random.randint(90, 130) # More stamina
+        specialty = rng.choice(GUARD_SPECIALTIES)
+        clearance_level = rng.choice(ROLE_CLEARANCES['guard'])
+        attributes['strength'] += rng.randint(2, 4) # Guards are stronger
+        attributes['dexterity'] += rng.randint(1, 3) # Guards are also quick
+        health = rng.randint(90, 130) # More healthy
+        stamina = rng.randint(90, 130) # More stamina
     else: # D-Class
         specialty = "Expendable"
         clearance_level = 0
         attributes = { # D-Class have generally lower stats
-            'strength': random.randint(3, 5),
-            'dexterity': random.randint(3, 5),
-            'intelligence': random.randint(3, 5)
+            'strength': rng.randint(3, 5),
+            'dexterity': rng.randint(3, 5),
+            'intelligence': rng.randint(3, 5)
         }
-        health = random.randint(70, 90)
-        stamina = random.randint(70, 90)
+        health = rng.randint(70, 90)
+        stamina = rng.randint(70, 90)
+
+    if seed is not None:
+        clearance_level = clearance_for_seed(role_str, seed)
 
     return Character(role.capitalize(), name, origin, personality, specialty, clearance_level, health, stamina, attributes)
\ No newline at end of file
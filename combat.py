@@ -0,0 +1,257 @@
+# combat.py
+# Fights between groups of the player, NPCs and SCPs, configured by
+# combat_rules.json and resolved for every encounter in the facility at once.
+
+import json
+from player import BODY_PARTS
+from random_streams import RandomStreams, world_streams
+from room_graph import np
+
+COMBAT_RULES_FILE = "combat_rules.json"
+
+
+def load_combat_rules(filepath=COMBAT_RULES_FILE):
+    """Loads the combat rules: fighter stats per kind, hit chances, damage modifiers and injury thresholds."""
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+class CombatEngine:
+    """
+    Every fighter of every ongoing encounter is a slot in one set of columns
+    (encounter, side, health, dexterity, damage range, damage bonus,
+    defense), so
+    resolve_tick handles all encounters together: in one vectorized pass
+    each living fighter picks a target among the other sides of its
+    encounter, rolls to hit and for damage, and damage is summed per target.
+    Encounters are usually rooms; fighters on the same side never attack
+    each other, and an encounter with a single side left standing is over.
+    Fighter kinds ("player", NPC roles, SCP object classes) take their stats
+    from the rules' "fighters" table, falling back to "default".
+    Fighters backed by an object with a health attribute (the Player, NPC
+    Characters) get their health written back after each tick; the player
+    also gets injured per the rules' injury_thresholds.
+    Rolls come from the game's "combat" stream, or from streams of the
+    engine's own when given a seed (e.g. one per parallel simulation).
+    """
+    def __init__(self, rules=None, seed=None):
+        self.rules = rules if rules is not None else load_combat_rules()
+        streams = RandomStreams(seed) if seed is not None else world_streams
+        self._random = streams.stream("combat")
+        self._buffer = streams.buffer("combat") # Pre-drawn floats for the vectorized rolls
+        self._ids = [] # slot -> fighter id
+        self._slots = {} # {fighter_id: slot}
+        self._holders = [] # slot -> object with a health attribute, or None
+        self._encounter_ids = [] # encounter code -> encounter id
+        self._encounter_codes = {} # {encounter id: encounter code}
+        self._side_codes = {} # {side name: side code}
+        self._encounter = [] # encounter code per slot
+        self._side = [] # side code per slot
+        self._health = []
+        self._dexterity = []
+        self._damage_min = []
+        self._damage_max = []
+        self._damage_bonus = [] # Added to every hit dealt (negative for injuries)
+        self._defense = [] # Subtracted from every hit taken
+
+    def _fighter_stats(self, kind):
+        fighters = self.rules["fighters"]
+        return fighters.get(kind.lower(), fighters["default"])
+
+    def add_fighter(self, fighter_id, encounter_id, side, kind, dexterity=5, health=None, damage_bonus=0, defense=0,
+                    holder=None):
+        """
+        Adds a fighter to an encounter (created on first use). health defaults
+        to the holder's health, then to the kind's. Returns False if a fighter
+        with that id is already fighting.
+        """
+        if fighter_id in self._slots:
+            print(f"Warning: Fighter {fighter_id} is already in an encounter.")
+            return False
+        stats = self._fighter_stats(kind)
+        if health is None:
+            health = holder.health if holder is not None else stats["health"]
+        if encounter_id not in self._encounter_codes:
+            self._encounter_codes[encounter_id] = len(self._encounter_ids)
+            self._encounter_ids.append(encounter_id)
+        self._slots[fighter_id] = len(self._ids)
+        self._ids.append(fighter_id)
+        self._holders.append(holder)
+        self._encounter.append(self._encounter_codes[encounter_id])
+        self._side.append(self._side_codes.setdefault(side, len(self._side_codes)))
+        self._health.append(health)
+        self._dexterity.append(dexterity)
+        self._damage_min.append(stats["damage"][0])
+        self._damage_max.append(stats["damage"][1])
+        self._damage_bonus.append(damage_bonus)
+        self._defense.append(defense)
+        return True
+
+    def add_player(self, player, encounter_id=None, side="player"):
+        """Adds the player with their cached effective dexterity; attack modifiers (injuries, held items) change the damage they deal."""
+        return self.add_fighter("player", encounter_id if encounter_id is not None else player.location, side, "player",
+                                dexterity=player.get_effective_attribute('dexterity'),
+                                damage_bonus=player.get_action_modifier('attack') * self.rules["damage_per_modifier"],
+                                holder=player)
+
+    def add_character(self, fighter_id, character, encounter_id, side=None):
+        """Adds an NPC Character; it sides with its role unless told otherwise."""
+        return self.add_fighter(fighter_id, encounter_id, side if side is not None else character.role, character.role,
+                                dexterity=character.attributes['dexterity'], holder=character)
+
+    def add_npc(self, npc_manager, npc_id, side=None):
+        """Adds an NPC from an NPCManager, fighting in the room it is in."""
+        room_id = npc_manager.get_npc_room(npc_id)
+        if room_id is None:
+            print(f"Warning: Attempted to add non-existent NPC to combat: {npc_id}")
+            return False
+        return self.add_character(npc_id, npc_manager.get_character(npc_id), room_id, side)
+
+    def add_scp(self, scp, side=None):
+        """Adds an SCP, fighting in its current room on a side of its own unless told otherwise."""
+        return self.add_fighter(scp.id, scp.current_room, side if side is not None else scp.id, scp.object_class)
+
+    def get_health(self, fighter_id):
+        slot = self._slots.get(fighter_id)
+        return self._health[slot] if slot is not None else None
+
+    def active_encounters(self):
+        """Returns the ids of encounters where more than one side is still standing."""
+        sides = {}
+        for slot, health in enumerate(self._health):
+            if health > 0:
+                sides.setdefault(self._encounter[slot], set()).add(self._side[slot])
+        return [self._encounter_ids[code] for code, standing in sides.items() if len(standing) > 1]
+
+    def end_encounter(self, encounter_id):
+        """Removes an encounter and its fighters. Returns the number of fighters removed."""
+        code = self._encounter_codes.get(encounter_id)
+        if code is None:
+            return 0
+        keep = [slot for slot in range(len(self._ids)) if self._encounter[slot] != code]
+        removed = len(self._ids) - len(keep)
+        for name in ("_ids", "_holders", "_encounter", "_side", "_health", "_dexterity",
+                     "_damage_min", "_damage_max", "_damage_bonus", "_defense"):
+            column = getattr(self, name)
+            setattr(self, name, [column[slot] for slot in keep])
+        self._slots = {fighter_id: slot for slot, fighter_id in enumerate(self._ids)}
+        return removed
+
+    def _targets_numpy(self, live, encounter, side):
+        """
+        Picks a random enemy for every living fighter. Sorting by
+        (encounter, side) makes each encounter a block of side blocks, so
+        "a random fighter of this encounter outside my own side" is one
+        offset into the encounter block that skips over the side block.
+        Returns (attacker slots, target slots).
+        """
+        order = live[np.lexsort((side[live], encounter[live]))]
+        enc, sid = encounter[order], side[order]
+        positions = np.arange(len(order))
+        new_encounter = np.r_[True, enc[1:] != enc[:-1]]
+        new_side = new_encounter | np.r_[True, sid[1:] != sid[:-1]]
+        encounter_start = np.maximum.accumulate(np.where(new_encounter, positions, 0))
+        side_start = np.maximum.accumulate(np.where(new_side, positions, 0))
+        encounter_group = np.cumsum(new_encounter) - 1
+        side_group = np.cumsum(new_side) - 1
+        encounter_size = np.bincount(encounter_group)[encounter_group]
+        side_size = np.bincount(side_group)[side_group]
+        enemies = encounter_size - side_size
+        fighting = enemies > 0
+        pick = encounter_start + self._buffer.integers(enemies, len(order))
+        pick += np.where(pick >= side_start, side_size, 0)
+        return order[fighting], order[pick[fighting]]
+
+    def _damage_numpy(self):
+        hit_chance = self.rules["hit_chance"]
+        health = np.array(self._health, dtype=np.int64)
+        live = np.flatnonzero(health > 0)
+        damage = np.zeros(len(health), dtype=np.int64)
+        if len(live) == 0:
+            return damage, 0
+        attackers, targets = self._targets_numpy(live, np.array(self._encounter), np.array(self._side))
+        dexterity = np.array(self._dexterity)
+        chance = hit_chance["base"] + (dexterity[attackers] - dexterity[targets]) * hit_chance["per_dexterity"]
+        hits = self._buffer.random(len(attackers)) < np.clip(chance, hit_chance["min"], hit_chance["max"])
+        attackers, targets = attackers[hits], targets[hits]
+        damage_min = np.array(self._damage_min)[attackers]
+        rolls = damage_min + self._buffer.integers(np.array(self._damage_max)[attackers] - damage_min + 1, len(attackers))
+        rolls += np.array(self._damage_bonus, dtype=np.int64)[attackers]
+        np.add.at(damage, targets, np.maximum(rolls - np.array(self._defense)[targets], 0))
+        return damage, len(attackers)
+
+    def _damage_python(self):
+        hit_chance = self.rules["hit_chance"]
+        rng = self._random
+        fighters = {} # {encounter code: [slot, ...]}
+        for slot, health in enumerate(self._health):
+            if health > 0:
+                fighters.setdefault(self._encounter[slot], []).append(slot)
+        damage = [0] * len(self._health)
+        hits = 0
+        for slots in fighters.values():
+            for attacker in slots:
+                enemies = [slot for slot in slots if self._side[slot] != self._side[attacker]]
+                if not enemies:
+                    continue
+                target = rng.choice(enemies)
+                chance = hit_chance["base"] + (self._dexterity[attacker] - self._dexterity[target]) * hit_chance["per_dexterity"]
+                if rng.random() < max(hit_chance["min"], min(hit_chance["max"], chance)):
+                    roll = rng.randint(self._damage_min[attacker], self._damage_max[attacker]) + self._damage_bonus[attacker]
+                    damage[target] += max(roll - self._defense[target], 0)
+                    hits += 1
+        return damage, hits
+
+    def _injure(self, player, damage_taken):
+        for threshold, severity in self.rules["injury_thresholds"]:
+            if damage_taken >= threshold:
+                return player.apply_injury(self._random.choice(BODY_PARTS), severity)
+        return ""
+
+    def resolve_tick(self):
+        """
+        Resolves one round of every encounter: each fighter still standing
+        attacks one enemy. Returns {"hits": int, "damage": {fighter_id: damage
+        taken}, "defeated": [fighter_id, ...], "injuries": [message, ...]}.
+        """
+        damage, hits = self._damage_numpy() if np is not None else self._damage_python()
+        result = {"hits": int(hits), "damage": {}, "defeated": [], "injuries": []}
+        for slot in (np.flatnonzero(damage) if np is not None else [s for s, d in enumerate(damage) if d]):
+            slot = int(slot)
+            taken = int(damage[slot])
+            fighter_id = self._ids[slot]
+            self._health[slot] -= taken
+            result["damage"][fighter_id] = taken
+            if self._health[slot] <= 0:
+                result["defeated"].append(fighter_id)
+            holder = self._holders[slot]
+            if holder is not None:
+                holder.health = self._health[slot]
+                if hasattr(holder, "apply_injury"):
+                    injury = self._injure(holder, taken)
+                    if injury:
+                        result["injuries"].append(injury)
+        return result
+
+
+if __name__ == "__main__":
+    import time
+    from character import generate_character
+
+    # A breach: 300 rooms, each with a few guards against an SCP and some D-class caught in the middle
+    engine = CombatEngine(seed=1)
+    classes = ["Safe", "Euclid", "Keter"]
+    for room in range(300):
+        room_id = f"room_{room}"
+        for i in range(4):
+            engine.add_character(f"guard_{room}_{i}", generate_character("Guard", seed=room * 10 + i), room_id)
+        engine.add_fighter(f"scp_{room}", room_id, f"scp_{room}", classes[room % 3])
+        engine.add_character(f"dclass_{room}", generate_character("D-class", seed=room * 10 + 9), room_id)
+    start = time.perf_counter()
+    ticks = 0
+    while engine.active_encounters() and ticks < 100:
+        engine.resolve_tick()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    print(f"300 encounters, {len(engine._ids)} fighters: {ticks} ticks in {elapsed * 1000:.1f}ms "
+          f"({elapsed / ticks * 1000:.2f}ms/tick)")
@@ -1,8 +1,80 @@
 # door_manager.py
+from reachability import ReachabilityIndex
+from room_graph import RoomGraph, RoomRegistry, SEALED_DOOR_LEVEL, exit_destination_and_level
+
+# Runtime door states, stored as an exit's optional "state" key in the map data
+DOOR_OPEN = "open" # Passable with clearance >= door_level
+DOOR_LOCKED = "locked" # Nobody passes until it is unlocked (lockpicking, keys...)
+DOOR_LOCKDOWN = "lockdown" # Sealed by a facility lockdown until it is lifted
+DOOR_DESTROYED = "destroyed" # Broken open; anyone passes whatever its door_level
+DOOR_STATES = (DOOR_OPEN, DOOR_LOCKED, DOOR_LOCKDOWN, DOOR_DESTROYED)
+
+def required_level(door_level, state):
+    """Clearance needed to pass a door in a given state (SEALED_DOOR_LEVEL if nobody can)."""
+    if state == DOOR_OPEN:
+        return door_level
+    if state == DOOR_DESTROYED:
+        return 0
+    return SEALED_DOOR_LEVEL
 
 class DoorManager:
-    def __init__(self, map_data):
+    """
+    Owns the doors of a map: their clearance levels and runtime states.
+    The shared graph holds each exit's *required* level (its door_level while
+    open, 0 once destroyed, SEALED_DOOR_LEVEL while locked or in lockdown),
+    so every change goes through one path: door listeners get
+    (room_index, direction, old_level, new_level) for required levels, which
+    keeps the reachability index, cached routes and other listeners
+    (pathfinding, breaches, sound...) up to date incrementally. Door state
+    listeners additionally get (room_index, direction, old_state, new_state).
+    Rooms are indexed by the `rooms` RoomRegistry (shared with the graph);
+    the public methods take room ids.
+    """
+    def __init__(self, map_data, rooms=None):
         self.map_data = map_data
+        self.rooms = rooms if rooms is not None else RoomRegistry(map_data)
+        self._index = self.rooms.index # {room_id: room index}, held directly for the per-move lookups
+        self.graph = RoomGraph(map_data, self.rooms) # Shared CSR view for pathfinding and batch movement
+        self.reachability = ReachabilityIndex(self.graph)
+        self._door_listeners = [] # Callables notified as listener(room_index, direction, old_level, new_level)
+        self._door_state_listeners = [] # Callables notified as listener(room_index, direction, old_state, new_state)
+        # Exits normalized once, so access checks are a list index and a dict lookup with nothing allocated
+        self._doors = [{} for _ in range(len(self.rooms))] # room index -> {direction: (destination, required_level, door_level)}
+        self._door_states = {} # {room_index: {direction: state}}, doors that are not open only
+        for room_id, room in map_data.items():
+            self._compile_room(self._index[room_id], room)
+        # Doors that start locked (or destroyed) in the map data
+        for room_index, states in self._door_states.items():
+            for direction in states:
+                self._sync_graph(room_index, direction, notify=False)
+
+    def refresh_room(self, room_id):
+        """Recompiles the door table entries of one room from map_data, e.g. after editing its exits."""
+        room_index = self.rooms.get(room_id)
+        if room_index is None:
+            print(f"Warning: Attempted to refresh the doors of a room that was not in the map at load: {room_id}")
+            return
+        self._compile_room(room_index, self.map_data.get(room_id))
+
+    def _compile_room(self, room_index, room):
+        self._door_states.pop(room_index, None)
+        doors = {}
+        for direction, exit_info in (room or {}).get("exits", {}).items():
+            if exit_info:
+                destination, door_level = exit_destination_and_level(exit_info)
+                state = exit_info.get("state", DOOR_OPEN) if isinstance(exit_info, dict) else DOOR_OPEN
+                if state != DOOR_OPEN:
+                    self._door_states.setdefault(room_index, {})[direction] = state
+                doors[direction] = (destination, required_level(door_level, state), door_level)
+        self._doors[room_index] = doors
+
+    def add_door_listener(self, listener):
+        """Registers a callable to be notified whenever the level required to pass a door changes."""
+        self._door_listeners.append(listener)
+
+    def add_door_state_listener(self, listener):
+        """Registers a callable to be notified whenever a door is locked, unlocked, sealed or destroyed."""
+        self._door_state_listeners.append(listener)
 
     def get_door_details(self, current_room_id, direction):
         """
@@ -20,38 +92,194 @@ class DoorManager:
                 return exit_info
         return None
 
+    def get_exit(self, current_room_id, direction):
+        """
+        Returns the compiled (destination, required_level, door_level) tuple
+        for an exit, or None if no such exit exists. required_level is what
+        it takes to pass the door in its current state.
+        """
+        room_index = self._index.get(current_room_id)
+        return self._doors[room_index].get(direction) if room_index is not None else None
+
+    def exit_at(self, room_index, direction):
+        """get_exit for callers that already hold a room index."""
+        return self._doors[room_index].get(direction)
+
     def get_door_level(self, current_room_id, direction):
         """
         Returns the door_level for a specific exit.
         Returns 0 if no explicit level is defined (i.e., open to all),
         or None if no exit exists in that direction.
         """
-        door_details = self.get_door_details(current_room_id, direction)
-        if door_details:
-            return door_details.get("door_level", 0) # Default to 0 if not specified
-        return None # No exit in that direction
+        door = self.get_exit(current_room_id, direction)
+        return door[2] if door is not None else None # No exit in that direction
 
     def check_access(self, entity_clearance_level, current_room_id, direction):
         """
         Checks if an entity with entity_clearance_level can open the door
-        in the specified direction from current_room_id.
+        in the specified direction from current_room_id, in its current state.
         Returns True if accessible, False otherwise.
         """
-        required_level = self.get_door_level(current_room_id, direction)
-        if required_level is None: # No exit in that direction
+        door = self.get_exit(current_room_id, direction)
+        if door is None: # No exit in that direction
             return False
-        
-        return entity_clearance_level >= required_level
+
+        return entity_clearance_level >= door[1]
+
+    def get_door_state(self, current_room_id, direction):
+        """Returns the state of an exit's door (DOOR_OPEN...), or None if no such exit exists."""
+        room_index = self.rooms.index.get(current_room_id)
+        if room_index is None or direction not in self._doors[room_index]:
+            return None
+        return self._door_states.get(room_index, {}).get(direction, DOOR_OPEN)
 
     def get_destination(self, current_room_id, direction):
         """
         Returns the destination room_id for a given room and direction.
         Returns None if no such exit exists.
         """
-        door_details = self.get_door_details(current_room_id, direction)
-        if door_details:
-            return door_details.get("destination")
-        return None
+        door = self.get_exit(current_room_id, direction)
+        return door[0] if door is not None else None
+
+    def can_reach(self, entity_clearance_level, from_room_id, target_room_id):
+        """
+        Checks if any route of doors opening at entity_clearance_level joins
+        the two rooms, without walking the map (see reachability.py).
+        Returns False for unknown rooms.
+        """
+        index = self.graph.index
+        if from_room_id not in index or target_room_id not in index:
+            return False
+        return self.reachability.connected(index[from_room_id], index[target_room_id], entity_clearance_level)
+
+    def get_reachable_rooms(self, entity_clearance_level, from_room_id):
+        """Returns the ids of every room connected to from_room_id at a clearance level (itself included)."""
+        from_index = self.graph.index.get(from_room_id)
+        if from_index is None:
+            return []
+        return [self.graph.room_ids[room_index]
+                for room_index in sorted(self.reachability.component_members(from_index, entity_clearance_level))]
+
+    def _sync_graph(self, room_index, direction, notify=True):
+        """Pushes an exit's required level from the door table into the graph and reachability index."""
+        edge = self.graph.edge_index(room_index, direction)
+        if edge is None:
+            return
+        old_level, new_level = self.graph.door_level[edge], self._doors[room_index][direction][1]
+        if old_level == new_level:
+            return
+        self.graph.set_door_level(edge, new_level)
+        self.reachability.door_changed(edge, old_level, new_level)
+        if notify:
+            for listener in self._door_listeners:
+                listener(room_index, direction, old_level, new_level)
+
+    def _update_exit(self, room_index, direction, **changes):
+        """Writes changed exit fields to the map data (upgrading string exits) and the door table."""
+        exits = self.map_data[self.rooms.room_ids[room_index]]["exits"]
+        exit_info = exits[direction]
+        if isinstance(exit_info, str):
+            exit_info = {"destination": exit_info, "door_level": 0}
+        exit_info = dict(exit_info, **changes)
+        if exit_info.get("state") == DOOR_OPEN:
+            del exit_info["state"]
+        exits[direction] = exit_info
+        destination, door_level = exit_destination_and_level(exit_info)
+        state = exit_info.get("state", DOOR_OPEN)
+        self._doors[room_index][direction] = (destination, required_level(door_level, state), door_level)
+        states = self._door_states.setdefault(room_index, {})
+        if state == DOOR_OPEN:
+            states.pop(direction, None)
+        else:
+            states[direction] = state
+        self._sync_graph(room_index, direction)
+
+    def set_door_level(self, current_room_id, direction, door_level):
+        """
+        Changes the clearance level required by a door (both sides of it, like
+        set_door_state), updating the map data and the shared graph, and
+        notifies door listeners. Returns False if no such exit exists.
+        """
+        room_index = self.rooms.index.get(current_room_id)
+        if room_index is None or direction not in self._doors[room_index]:
+            return False
+        for side_index, side in self._door_sides(room_index, direction):
+            self._update_exit(side_index, side, door_level=door_level)
+        return True
+
+    def _door_sides(self, room_index, direction):
+        """The exit itself plus the exit leading back through the same door, if there is one."""
+        sides = [(room_index, direction)]
+        edge = self.graph.edge_index(room_index, direction)
+        if edge is None: # Leads out of the map
+            return sides
+        graph = self.graph
+        destination = graph.dest[edge]
+        for back in range(graph.indptr[destination], graph.indptr[destination + 1]):
+            if graph.dest[back] == room_index:
+                sides.append((destination, graph.directions[back]))
+                break
+        return sides
+
+    def set_door_state(self, current_room_id, direction, state):
+        """
+        Puts a door (both sides of it) into a state from DOOR_STATES, updating
+        the map data, graph and reachability, and notifies listeners.
+        Returns False if no such exit exists or the state is unknown.
+        """
+        room_index = self.rooms.index.get(current_room_id)
+        if state not in DOOR_STATES or room_index is None or direction not in self._doors[room_index]:
+            return False
+        self._set_state(room_index, direction, state)
+        return True
+
+    def _set_state(self, room_index, direction, state):
+        for side_index, side in self._door_sides(room_index, direction):
+            old_state = self._door_states.get(side_index, {}).get(side, DOOR_OPEN)
+            if old_state == state:
+                continue
+            self._update_exit(side_index, side, state=state)
+            for listener in self._door_state_listeners:
+                listener(side_index, side, old_state, state)
+
+    def lock_door(self, current_room_id, direction):
+        return self.set_door_state(current_room_id, direction, DOOR_LOCKED)
+
+    def unlock_door(self, current_room_id, direction):
+        return self.set_door_state(current_room_id, direction, DOOR_OPEN)
+
+    def destroy_door(self, current_room_id, direction):
+        return self.set_door_state(current_room_id, direction, DOOR_DESTROYED)
+
+    def start_lockdown(self, room_ids=None, min_door_level=1):
+        """
+        Seals every open door with door_level >= min_door_level in the given
+        rooms (the whole facility if room_ids is None). Locked and destroyed
+        doors are left alone. Returns the number of doors sealed.
+        """
+        sealed = 0
+        for room_index in (self.rooms.indices(room_ids) if room_ids is not None else range(len(self._doors))):
+            for direction, door in list(self._doors[room_index].items()):
+                if door[2] >= min_door_level and direction not in self._door_states.get(room_index, {}):
+                    self._set_state(room_index, direction, DOOR_LOCKDOWN)
+                    sealed += 1
+        return sealed
+
+    def get_lockdown_rooms(self):
+        """Returns the ids of the rooms with at least one door sealed by a lockdown."""
+        room_ids = self.rooms.room_ids
+        return [room_ids[room_index] for room_index, states in self._door_states.items() if DOOR_LOCKDOWN in states.values()]
+
+    def lift_lockdown(self, room_ids=None):
+        """Reopens every door in lockdown in the given rooms (the whole facility if None). Returns how many."""
+        reopened = 0
+        rooms = self.rooms.indices(room_ids) if room_ids is not None else list(self._door_states)
+        for room_index in rooms:
+            for direction, state in list(self._door_states.get(room_index, {}).items()):
+                if state == DOOR_LOCKDOWN:
+                    self._set_state(room_index, direction, DOOR_OPEN)
+                    reopened += 1
+        return reopened
 
 
 # For testing purposes
@@ -0,0 +1,293 @@
+# hierarchical_pathfinding.py
+# Hierarchical (chunked) routing for very large generated facilities, where a
+# flat BFS per agent per turn is too slow.
+
+import heapq
+import re
+from collections import deque
+
+ROOM_COORD_PATTERN = re.compile(r"^room_(-?\d+)_(-?\d+)$") # Ids produced by generate_map
+
+
+class HierarchicalPathfinder:
+    """
+    Splits the coordinate grid of a generated map into chunk_size x chunk_size
+    chunks. Where two chunks touch, each contiguous run of crossing exits open
+    at a clearance level becomes one entrance, represented by its middle exit
+    (a transition). Portals are the rooms at either end of a transition. The
+    abstract graph of a clearance level holds portal-to-portal distances
+    inside each chunk (precomputed by chunk-local BFS) plus the transitions,
+    so a query searches the start and goal chunks room by room and the rest
+    of the route over portals with A*. Routes are near-optimal, not always shortest.
+    Rooms without coordinates in their id all share one chunk.
+    """
+    def __init__(self, door_manager, chunk_size=16):
+        self.graph = door_manager.graph
+        self.reachability = door_manager.reachability
+        self.chunk_size = chunk_size
+
+        self.coords = []
+        self.chunk_of = []
+        for room_id in self.graph.room_ids:
+            match = ROOM_COORD_PATTERN.match(room_id)
+            if match:
+                x, y = int(match.group(1)), int(match.group(2))
+                self.coords.append((x, y))
+                self.chunk_of.append((x // chunk_size, y // chunk_size))
+            else:
+                self.coords.append(None)
+                self.chunk_of.append(None)
+
+        # Exits between chunks, grouped by (from_chunk, to_chunk); only door levels change later
+        self._crossings = {}
+        for e in range(len(self.graph.dest)):
+            from_chunk, to_chunk = self.chunk_of[self.graph.source[e]], self.chunk_of[self.graph.dest[e]]
+            if from_chunk != to_chunk:
+                self._crossings.setdefault((from_chunk, to_chunk), []).append(e)
+        # Rooms at either end of a crossing; doors between two of them decide which crossings share an entrance
+        self._boundary = {room_index for edges in self._crossings.values()
+                          for e in edges for room_index in (self.graph.source[e], self.graph.dest[e])}
+
+        self._portals = {} # {level: {chunk: set(room_index)}}
+        self._transitions = {} # {level: {portal: [to_portal, ...]}}
+        self._abstract = {} # {level: {chunk: {portal: [(to_portal, cost), ...]}}}
+        door_manager.add_door_listener(self._on_door_changed)
+
+    def _level(self, clearance_level):
+        return min(max(clearance_level, 0), self.graph.max_door_level)
+
+    def _linked(self, from_index, to_index, level):
+        graph = self.graph
+        for e in range(graph.indptr[from_index], graph.indptr[from_index + 1]):
+            if graph.dest[e] == to_index:
+                return graph.door_level[e] <= level
+        return False
+
+    def _joined(self, a, b, level):
+        """Whether a and b can reach each other directly, both ways, at a level."""
+        return self._linked(a, b, level) and self._linked(b, a, level)
+
+    def _build_transitions(self, level):
+        """Picks one transition per entrance between every pair of chunks at a clearance level."""
+        graph = self.graph
+        portals = {}
+        transitions = {}
+        for (from_chunk, to_chunk), edges in self._crossings.items():
+            open_edges = [e for e in edges if graph.door_level[e] <= level]
+            if not open_edges:
+                continue
+            runs = [[e] for e in open_edges]
+            if from_chunk is not None and to_chunk is not None:
+                # Position along the shared boundary: y for east/west neighbours, x for north/south
+                axis = 1 if from_chunk[0] != to_chunk[0] else 0
+                open_edges.sort(key=lambda e: self.coords[graph.source[e]][axis])
+                runs = [[open_edges[0]]]
+                for e in open_edges[1:]:
+                    previous = runs[-1][-1]
+                    # Same entrance only if both sides are joined by exits open both ways along the
+                    # boundary, so any crossing in it can be reached from, and lead on to, the one kept
+                    if not (self._joined(graph.source[previous], graph.source[e], level)
+                            and self._joined(graph.dest[previous], graph.dest[e], level)):
+                        runs.append([])
+                    runs[-1].append(e)
+            for run in runs:
+                e = run[len(run) // 2]
+                u, v = graph.source[e], graph.dest[e]
+                portals.setdefault(from_chunk, set()).add(u)
+                portals.setdefault(to_chunk, set()).add(v)
+                transitions.setdefault(u, []).append(v)
+        self._portals[level] = portals
+        self._transitions[level] = transitions
+        self._abstract[level] = {}
+
+    def _local_bfs(self, start_index, level, reverse=False):
+        """
+        BFS that never leaves start_index's chunk. Returns {room_index: (hops, parent_edge)}.
+        With reverse=True it follows exits backwards (distances *to* start_index).
+        """
+        graph = self.graph
+        chunk = self.chunk_of[start_index]
+        if reverse:
+            rev_indptr, rev_edges = graph.incoming()
+        reached = {start_index: (0, -1)}
+        queue = deque([start_index])
+        while queue:
+            room_index = queue.popleft()
+            hops = reached[room_index][0] + 1
+            if reverse:
+                edges = rev_edges[rev_indptr[room_index]:rev_indptr[room_index + 1]]
+            else:
+                edges = range(graph.indptr[room_index], graph.indptr[room_index + 1])
+            for e in edges:
+                other = graph.source[e] if reverse else graph.dest[e]
+                if other in reached or graph.door_level[e] > level or self.chunk_of[other] != chunk:
+                    continue
+                reached[other] = (hops, e)
+                queue.append(other)
+        return reached
+
+    def _chunk_edges(self, level, chunk):
+        """Abstract edges leaving the portals of one chunk, built on first use."""
+        if level not in self._portals:
+            self._build_transitions(level)
+        by_chunk = self._abstract[level]
+        edges = by_chunk.get(chunk)
+        if edges is None:
+            portals = self._portals[level].get(chunk, set())
+            transitions = self._transitions[level]
+            edges = {}
+            for portal in portals:
+                reached = self._local_bfs(portal, level)
+                portal_edges = [(other, reached[other][0]) for other in portals
+                                if other != portal and other in reached]
+                portal_edges.extend((other, 1) for other in transitions.get(portal, []))
+                edges[portal] = portal_edges
+            by_chunk[chunk] = edges
+        return edges
+
+    def precompute(self, clearance_level):
+        """Builds the abstract graph of every chunk (and the reachability index) for a clearance level up front."""
+        level = self._level(clearance_level)
+        if len(self.graph):
+            self.reachability.component_of(0, level)
+        self._build_transitions(level)
+        for chunk in self._portals[level]:
+            self._chunk_edges(level, chunk)
+
+    def _on_door_changed(self, room_index, direction, old_level, new_level):
+        edge = self.graph.edge_index(room_index, direction)
+        if edge is None:
+            return
+        to_index = self.graph.dest[edge]
+        # Doors across a boundary, or along one, can split or merge entrances
+        entrances = (self.chunk_of[to_index] != self.chunk_of[room_index]
+                     or (room_index in self._boundary and to_index in self._boundary))
+        low, high = sorted((old_level, new_level))
+        for level in list(self._portals):
+            if not low <= level < high:
+                continue
+            if entrances: # Rebuilt on the next query
+                del self._portals[level], self._transitions[level], self._abstract[level]
+            else: # Only portal distances inside the door's chunk are stale
+                self._abstract[level].pop(self.chunk_of[room_index], None)
+
+    def _search(self, from_index, target_index, level):
+        """
+        Returns a list of room-index waypoints from start to target, where
+        consecutive waypoints are either in the same chunk or one exit apart,
+        or None if the target is unreachable.
+        """
+        start_reached = self._local_bfs(from_index, level)
+        if target_index in start_reached:
+            return [from_index, target_index]
+
+        goal_reached = self._local_bfs(target_index, level, reverse=True)
+        goal_chunk = self.chunk_of[target_index]
+
+        self._chunk_edges(level, self.chunk_of[from_index]) # Makes sure the level's portals exist
+        target_coords = self.coords[target_index]
+
+        def estimate(portal):
+            # Manhattan distance never overestimates on the room grid, so A* stays exact over portals
+            coords = self.coords[portal]
+            if coords is None or target_coords is None:
+                return 0
+            return abs(coords[0] - target_coords[0]) + abs(coords[1] - target_coords[1])
+
+        best = {}
+        parent = {}
+        heap = []
+        for portal in self._portals[level].get(self.chunk_of[from_index], ()):
+            if portal in start_reached:
+                best[portal] = start_reached[portal][0]
+                parent[portal] = from_index
+                heapq.heappush(heap, (best[portal] + estimate(portal), best[portal], portal))
+
+        goal_cost, goal_parent = None, None
+        while heap:
+            bound, cost, portal = heapq.heappop(heap)
+            if goal_cost is not None and bound >= goal_cost:
+                break
+            if cost > best[portal]:
+                continue
+            if self.chunk_of[portal] == goal_chunk and portal in goal_reached:
+                total = cost + goal_reached[portal][0]
+                if goal_cost is None or total < goal_cost:
+                    goal_cost, goal_parent = total, portal
+            for other, step in self._chunk_edges(level, self.chunk_of[portal]).get(portal, []):
+                new_cost = cost + step
+                if new_cost < best.get(other, new_cost + 1):
+                    best[other] = new_cost
+                    parent[other] = portal
+                    heapq.heappush(heap, (new_cost + estimate(other), new_cost, other))
+
+        if goal_parent is None:
+            return None
+        waypoints = [target_index]
+        node = goal_parent
+        while node != from_index:
+            waypoints.append(node)
+            node = parent[node]
+        waypoints.append(from_index)
+        waypoints.reverse()
+        # Drop repeats (start or target may themselves be portals)
+        return [w for i, w in enumerate(waypoints) if i == 0 or w != waypoints[i - 1]]
+
+    def _refine(self, from_index, to_index, level):
+        """Expands one waypoint hop into rooms (excluding from_index)."""
+        graph = self.graph
+        for e in range(graph.indptr[from_index], graph.indptr[from_index + 1]):
+            if graph.dest[e] == to_index and graph.door_level[e] <= level:
+                return [to_index]
+        reached = self._local_bfs(to_index, level, reverse=True)
+        rooms = []
+        room_index = from_index
+        while room_index != to_index:
+            room_index = graph.dest[reached[room_index][1]]
+            rooms.append(room_index)
+        return rooms
+
+    def find_path(self, from_room_id, target_room_id, clearance_level):
+        """Returns the list of room ids from start to target (inclusive), or None if unreachable."""
+        from_index, target_index = self.graph.index.get(from_room_id), self.graph.index.get(target_room_id)
+        if from_index is None or target_index is None:
+            return None
+        level = self._level(clearance_level)
+        if not self.reachability.connected(from_index, target_index, level):
+            return None # No route at all; skip the search
+        waypoints = self._search(from_index, target_index, level)
+        if waypoints is None:
+            return None
+        path = [from_index]
+        for a, b in zip(waypoints, waypoints[1:]):
+            path.extend(self._refine(a, b, level))
+        return [self.graph.room_ids[room_index] for room_index in path]
+
+    def next_hop(self, from_room_id, target_room_id, clearance_level):
+        """
+        Returns the next room id on a route to target_room_id, or None if
+        already there or unreachable. Only the first waypoint hop is refined.
+        """
+        from_index, target_index = self.graph.index.get(from_room_id), self.graph.index.get(target_room_id)
+        if from_index is None or target_index is None or from_index == target_index:
+            return None
+        level = self._level(clearance_level)
+        if not self.reachability.connected(from_index, target_index, level):
+            return None
+        waypoints = self._search(from_index, target_index, level)
+        if waypoints is None:
+            return None
+        return self.graph.room_ids[self._refine(waypoints[0], waypoints[1], level)[0]]
+
+
+if __name__ == "__main__":
+    from door_manager import DoorManager
+    from map_generator import generate_grid_map
+
+    game_map, start_room_id = generate_grid_map(64, 64, door_level_weights={0: 8, 1: 1, 2: 1})
+    door_manager = DoorManager(game_map)
+    pathfinder = HierarchicalPathfinder(door_manager)
+    pathfinder.precompute(0)
+    path = pathfinder.find_path(start_room_id, "room_63_63", 0)
+    print(f"{len(pathfinder._portals[0])} chunks; L0 route room_0_0 -> room_63_63: "
+          f"{len(path) - 1 if path else None} moves")
@@ -0,0 +1,327 @@
+# items.py
+# Item instances and the containers holding them (backpacks, rooms), so
+# adding, removing and finding items costs the same in a storage room with
+# thousands of items as in an empty corridor.
+#
+# Item definitions come from items.json. Besides "name", "description" and
+# "takeable", an item may set "weight" (per unit, default 0) and
+# "stackable" (default false): stackable items of the same kind in one
+# container merge into a single instance with a count.
+
+from room_graph import RoomRegistry
+
+
+class ItemInstance:
+    """One physical item, or a stack of a stackable item, with its own instance id."""
+    __slots__ = ('instance_id', 'item_id', 'count', 'unit_weight')
+
+    def __init__(self, instance_id, item_id, count=1, unit_weight=0):
+        self.instance_id = instance_id
+        self.item_id = item_id
+        self.count = count
+        self.unit_weight = unit_weight
+
+    @property
+    def weight(self):
+        return self.count * self.unit_weight
+
+    def __str__(self):
+        return self.item_id if self.count == 1 else f"{self.item_id} x{self.count}"
+
+    def __repr__(self):
+        return f"ItemInstance({self.instance_id!r}, count={self.count})"
+
+
+class ItemRegistry:
+    """
+    Creates item instances from the item definitions, handing out unique
+    instance ids ("keycard_l1#3"). Unknown item ids still get instances,
+    weightless and unstackable.
+    """
+    def __init__(self, definitions=None):
+        self.definitions = definitions if definitions is not None else {}
+        self._next_id = 1
+
+    def definition(self, item_id):
+        return self.definitions.get(item_id, {})
+
+    def name(self, item_id):
+        return self.definition(item_id).get("name", item_id)
+
+    def is_stackable(self, item_id):
+        return self.definition(item_id).get("stackable", False)
+
+    def create(self, item_id, count=1):
+        instance = ItemInstance(f"{item_id}#{self._next_id}", item_id, count, self.definition(item_id).get("weight", 0))
+        self._next_id += 1
+        return instance
+
+    def split(self, instance, count):
+        """Takes count units off a stack into a new instance (the whole instance if count covers it)."""
+        if count >= instance.count:
+            return instance
+        instance.count -= count
+        return self.create(instance.item_id, count)
+
+
+class ItemLocations:
+    """
+    Where every item instance is, as a holder tuple: ("room", room_index),
+    ("player", "backpack" / "left_hand" / "right_hand") or ("npc", npc_id).
+    Containers given an ItemLocations record their adds and removes in it,
+    so finding an item never means searching rooms, NPCs and hands.
+    """
+    def __init__(self):
+        self._holders = {} # {instance_id: holder}
+        self._instances = {} # {item_id: {instance_id: ItemInstance}}
+
+    def place(self, instance, holder):
+        self._holders[instance.instance_id] = holder
+        self._instances.setdefault(instance.item_id, {})[instance.instance_id] = instance
+
+    def forget(self, instance):
+        """Drops an instance that left its holder (it is placed again wherever it ends up)."""
+        if self._holders.pop(instance.instance_id, None) is None:
+            return
+        instances = self._instances[instance.item_id]
+        del instances[instance.instance_id]
+        if not instances:
+            del self._instances[instance.item_id]
+
+    def holder_of(self, instance_id):
+        return self._holders.get(instance_id)
+
+    def locate(self, item_id):
+        """Returns [(instance, holder), ...] for every instance of an item id."""
+        return [(instance, self._holders[instance_id]) for instance_id, instance in self._instances.get(item_id, {}).items()]
+
+    def find(self, key):
+        """Returns the holder of an instance id, or of some instance of an item id, or None."""
+        holder = self._holders.get(key)
+        if holder is None and key in self._instances:
+            holder = self._holders[next(iter(self._instances[key]))]
+        return holder
+
+
+class ItemContainer:
+    """
+    Item instances indexed by instance id and by item id, with the total
+    weight kept as items come and go. Lookups, adds and removes are O(1);
+    "key" arguments may be an instance id or an item id (then any instance
+    of that item). The display names are cached until the contents change.
+    With an ItemLocations, instances added are recorded there as held by
+    `holder`, and forgotten when they are removed.
+    """
+    def __init__(self, registry=None, locations=None, holder=None):
+        self.registry = registry if registry is not None else ItemRegistry()
+        self.locations = locations
+        self.holder = holder
+        self.weight = 0
+        self._instances = {} # {instance_id: ItemInstance}
+        self._by_item = {} # {item_id: {instance_id: ItemInstance}}, insertion ordered
+        self._names = None
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __iter__(self):
+        return iter(list(self._instances.values()))
+
+    def __contains__(self, key):
+        return key in self._instances or key in self._by_item
+
+    def find(self, key):
+        """Returns the instance with this instance id, or the latest instance of this item id, or None."""
+        instance = self._instances.get(key)
+        if instance is None:
+            instances = self._by_item.get(key)
+            if instances:
+                instance = next(reversed(instances.values())) # The newest, so removing it is a popitem
+        return instance
+
+    def count(self, item_id):
+        """Units of an item in the container, stacks included."""
+        return sum(instance.count for instance in self._by_item.get(item_id, {}).values())
+
+    def item_ids(self):
+        """The distinct item ids in the container, in the order they first arrived."""
+        return list(self._by_item)
+
+    def add(self, instance):
+        """Adds an instance, merging it into a stack already here if its item is stackable. Returns the instance holding it."""
+        self._names = None
+        self.weight += instance.weight
+        stacks = self._by_item.get(instance.item_id)
+        if stacks and self.registry.is_stackable(instance.item_id):
+            stack = next(iter(stacks.values()))
+            stack.count += instance.count
+            return stack
+        self._instances[instance.instance_id] = instance
+        self._by_item.setdefault(instance.item_id, {})[instance.instance_id] = instance
+        if self.locations is not None:
+            self.locations.place(instance, self.holder)
+        return instance
+
+    def add_item(self, item_id, count=1):
+        """Creates count units of an item (one instance each unless stackable) and adds them."""
+        if self.registry.is_stackable(item_id):
+            return self.add(self.registry.create(item_id, count))
+        for _ in range(count):
+            instance = self.add(self.registry.create(item_id))
+        return instance
+
+    def remove(self, key, count=None):
+        """
+        Removes an instance (by instance or item id), or only count units of
+        a stack. Returns the removed instance, or None if there is no match.
+        """
+        instance = self.find(key)
+        if instance is None:
+            return None
+        self._names = None
+        if count is not None and count < instance.count:
+            removed = self.registry.split(instance, count)
+            self.weight -= removed.weight
+            return removed
+        self.weight -= instance.weight
+        del self._instances[instance.instance_id]
+        stacks = self._by_item[instance.item_id]
+        if next(reversed(stacks)) == instance.instance_id:
+            stacks.popitem() # Unlike del, keeps later lookups from skipping over removed entries
+        else:
+            del stacks[instance.instance_id]
+        if not stacks:
+            del self._by_item[instance.item_id]
+        if self.locations is not None:
+            self.locations.forget(instance)
+        return instance
+
+    def names(self):
+        """Display names of the contents ("Stained Coffee Cup", "Battery x3"), cached between changes."""
+        if self._names is None:
+            self._names = [self.registry.name(instance.item_id) + (f" x{instance.count}" if instance.count > 1 else "")
+                           for instance in self._instances.values()]
+        return self._names
+
+
+class ItemManager:
+    """
+    The items of the facility: one ItemContainer per room touched so far,
+    filled from the room's "items" list in the map data the first time it
+    is used (the lists are left as they were, as the map's starting
+    contents), and one per NPC carrying something. Untouched rooms only
+    cost an entry in an {item_id: room indices} index built in one pass at
+    load, so a facility too big for memory stays that way. Every
+    container, and the player's when created with
+    item_locations=manager.locations, keeps manager.locations up to date,
+    so locate() answers "where is it?" in O(1); an item still lying in
+    untouched rooms fills just the rooms the index lists for it. Rooms are
+    held by index in the `rooms` RoomRegistry; locate() hands back room ids.
+    """
+    def __init__(self, map_data, definitions=None, registry=None, rooms=None):
+        self.map_data = map_data
+        self.registry = registry if registry is not None else ItemRegistry(definitions)
+        self.rooms = rooms if rooms is not None else RoomRegistry(map_data)
+        self.locations = ItemLocations()
+        self._rooms = {} # {room_index: ItemContainer}, for rooms touched so far
+        self._npcs = {} # {npc_id: ItemContainer}
+        self._untouched = {} # {item_id: set(room_index)} of rooms whose "items" list has it and no container yet
+        for room_id, room in map_data.items():
+            for item_id in room.get("items", ()):
+                self._untouched.setdefault(item_id, set()).add(self.rooms.get(room_id))
+
+    def room_items(self, room_id):
+        """The container of a room's items (filled from its "items" list on first use; never stored for unknown rooms)."""
+        room_index = self.rooms.get(room_id)
+        if room_index is None:
+            return ItemContainer(self.registry)
+        container = self._rooms.get(room_index)
+        if container is None:
+            container = self._rooms[room_index] = ItemContainer(self.registry, self.locations, ("room", room_index))
+            for item_id in self.map_data[room_id].get("items", []):
+                container.add_item(item_id)
+                untouched = self._untouched.get(item_id)
+                if untouched is not None:
+                    untouched.discard(room_index)
+                    if not untouched:
+                        del self._untouched[item_id]
+        return container
+
+    def _stock_rooms_with(self, item_id):
+        """Fills the containers of the untouched rooms holding item_id, so their items can be located."""
+        room_ids = self.rooms.room_ids
+        for room_index in list(self._untouched.get(item_id, ())):
+            self.room_items(room_ids[room_index])
+
+    def npc_items(self, npc_id):
+        """The container of what an NPC carries (created empty on first use)."""
+        container = self._npcs.get(npc_id)
+        if container is None:
+            container = self._npcs[npc_id] = ItemContainer(self.registry, self.locations, ("npc", npc_id))
+        return container
+
+    def locate(self, key):
+        """
+        Returns the holder of an item instance id, or of an instance of an
+        item id: ("room", room_id), ("player", "backpack" / "left_hand" /
+        "right_hand") or ("npc", npc_id). None if it is nowhere.
+        """
+        holder = self.locations.find(key)
+        if holder is None:
+            self._stock_rooms_with(key)
+            holder = self.locations.find(key)
+        return self._holder_ids(holder)
+
+    def locate_all(self, item_id):
+        """Returns [(instance, holder), ...] for every instance of an item id."""
+        self._stock_rooms_with(item_id)
+        return [(instance, self._holder_ids(holder)) for instance, holder in self.locations.locate(item_id)]
+
+    def _holder_ids(self, holder):
+        if holder is not None and holder[0] == "room":
+            return ("room", self.rooms.room_ids[holder[1]])
+        return holder
+
+    def room_contents(self):
+        """
+        Returns [(room_id, [item_id, ...]), ...] for every room touched so
+        far, one id per unit (untouched rooms still hold their "items" list).
+        """
+        room_ids = self.rooms.room_ids
+        return [(room_ids[room_index], [instance.item_id for instance in container for _ in range(instance.count)])
+                for room_index, container in self._rooms.items()]
+
+    def npc_contents(self):
+        """Returns [(npc_id, item_id, count), ...] for every instance NPCs carry."""
+        return [(npc_id, instance.item_id, instance.count) for npc_id, container in self._npcs.items() for instance in container]
+
+    def take(self, room_id, key, count=None):
+        """Removes an item from a room. Returns the instance, or None if it isn't there."""
+        return self.room_items(room_id).remove(key, count)
+
+    def drop(self, room_id, instance):
+        """Puts an item instance into a room. Returns the instance holding it, or None if the room is unknown."""
+        if room_id not in self.rooms:
+            print(f"Warning: Attempted to drop {instance.item_id} in non-existent room: {room_id}")
+            return None
+        return self.room_items(room_id).add(instance)
+
+
+if __name__ == "__main__":
+    import time
+
+    registry = ItemRegistry({"battery": {"name": "Battery", "weight": 0.1, "stackable": True},
+                             "document": {"name": "Document", "weight": 0.05}})
+    storage = ItemContainer(registry)
+    start = time.perf_counter()
+    for i in range(20000):
+        storage.add_item("document")
+        storage.add_item("battery", 2)
+    filled = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(20000):
+        storage.remove("document")
+        storage.remove("battery", 1)
+    emptied = time.perf_counter() - start
+    print(f"Storage room: 40k adds in {filled * 1000:.1f}ms, 40k removes in {emptied * 1000:.1f}ms; "
+          f"{len(storage)} instance(s) left weighing {storage.weight:.1f}: {storage.names()}")
@@ -0,0 +1,129 @@
+# loot.py
+# Weighted loot tables for generated maps. Room templates name a table with
+# "loot_table"; every other room takes the table of its zone, by how far it
+# is from the start room (see loot_tables.json).
+
+import json
+from hierarchical_pathfinding import ROOM_COORD_PATTERN
+from random_streams import get_buffer, get_stream
+from room_graph import np
+
+LOOT_TABLES_FILE = "loot_tables.json"
+
+
+def load_loot_tables(filepath=LOOT_TABLES_FILE):
+    """Loads {"tables": {name: {"rolls": [min, max], "items": {item_id: weight}}}, "zones": [...]}."""
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+class AliasTable:
+    """
+    Walker's alias method over weighted choices: built once in O(n), after
+    which every draw is O(1) (one uniform float picks a column and decides
+    between the column's own choice and its alias), however many choices
+    the table has.
+    """
+    def __init__(self, weights):
+        self.choices = list(weights)
+        n = len(self.choices)
+        total = float(sum(weights.values()))
+        scaled = [weights[choice] * n / total for choice in self.choices]
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large: # Vose's variant: each column is topped up from one larger column
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        if np is not None:
+            self._probability = np.array(self.probability)
+            self._alias = np.array(self.alias)
+
+    def draw(self, rng):
+        """One choice, using a single rng.random()."""
+        u = rng.random() * len(self.choices)
+        column = int(u)
+        return self.choices[column if u - column < self.probability[column] else self.alias[column]]
+
+    def draw_indices(self, uniforms):
+        """Choice indices for an array of uniform floats, vectorized."""
+        u = uniforms * len(self.choices)
+        columns = u.astype(np.int64)
+        return np.where(u - columns < self._probability[columns], columns, self._alias[columns])
+
+
+def zone_tables_by_depth(zones):
+    """
+    Flattens the zone list into (table per depth up to the last max_depth,
+    table beyond it), so a room's zone table is one list lookup by its
+    distance from the start room.
+    """
+    bounded = [zone["max_depth"] for zone in zones if "max_depth" in zone]
+    by_depth = []
+    for depth in range(max(bounded, default=-1) + 1):
+        by_depth.append(next((zone["table"] for zone in zones if depth <= zone.get("max_depth", depth)), None))
+    beyond = next((zone["table"] for zone in zones if "max_depth" not in zone), None)
+    return by_depth, beyond
+
+
+def apply_loot(game_map, loot_tables):
+    """
+    Adds loot to every room's "items" list in one pass: rooms are grouped
+    by table, then each table rolls how many items every one of its rooms
+    gets and draws them all at once from its alias table. Rolls come from
+    the "loot" random stream. Returns the number of items placed.
+    """
+    tables = {name: (table["rolls"], AliasTable(table["items"])) for name, table in loot_tables["tables"].items()}
+    by_depth, beyond = zone_tables_by_depth(loot_tables.get("zones", []))
+    rooms_by_table = {}
+    for room_id, room in game_map.items():
+        name = room.get("loot_table")
+        if name is None:
+            match = ROOM_COORD_PATTERN.match(room_id) # Zones go by grid distance from room_0_0
+            depth = abs(int(match.group(1))) + abs(int(match.group(2))) if match else 0
+            name = by_depth[depth] if depth < len(by_depth) else beyond
+        if name in tables:
+            rooms_by_table.setdefault(name, []).append(room)
+
+    placed = 0
+    buffer, rng = get_buffer("loot"), get_stream("loot")
+    for name, rooms in rooms_by_table.items():
+        (low, high), alias_table = tables[name]
+        choices = alias_table.choices
+        if np is None:
+            for room in rooms:
+                for _ in range(rng.randint(low, high)):
+                    room.setdefault("items", []).append(alias_table.draw(rng))
+                    placed += 1
+            continue
+        counts = low + buffer.integers(high - low + 1, len(rooms))
+        drawn = alias_table.draw_indices(buffer.random(int(counts.sum())))
+        ends = np.cumsum(counts).tolist()
+        drawn = drawn.tolist()
+        start = 0
+        for room, end in zip(rooms, ends):
+            if end > start:
+                room.setdefault("items", []).extend([choices[i] for i in drawn[start:end]])
+            start = end
+        placed += len(drawn)
+    return placed
+
+
+if __name__ == "__main__":
+    import time
+    from collections import Counter
+    from map_generator import generate_grid_map
+
+    loot_tables = load_loot_tables()
+    table = AliasTable(loot_tables["tables"]["office"]["items"])
+    rng = get_stream("loot")
+    print(f"Office loot, 100k draws: {Counter(table.draw(rng) for _ in range(100000))}")
+
+    game_map, _ = generate_grid_map(316, 316)
+    start = time.perf_counter()
+    placed = apply_loot(game_map, loot_tables)
+    print(f"{len(game_map)} rooms: {placed} items placed in {time.perf_counter() - start:.3f}s")
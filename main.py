@@ -1,4 +1,3 @@
-import random # NEW IMPORT
 import curses
 import sys
 import time
@@ -7,12 +6,17 @@ import os
 from player import Player
 from navigation import move
 from actions import attack, run
-from map_generator import generate_map, load_room_templates
+from map_generator import generate_map, load_room_templates, validate_map
+from loot import load_loot_tables
 from character import generate_character
 from map_visualizer import generate_ascii_map, generate_simple_map_view # Renamed to generate_ascii_map
-from door_manager import DoorManager # NEW IMPORT
+from door_manager import DoorManager, DOOR_LOCKED # NEW IMPORT
 from npc_manager import NPCManager # NEW IMPORT
 from scp_manager import SCPManager # NEW IMPORT
+from random_streams import get_stream, set_world_seed
+from items import ItemManager
+from room_graph import RoomRegistry
+from world_store import WorldStore
 
 # ... (Color definitions remain the same) ...
 HIGHLIGHT_PAIR = 1
@@ -49,7 +53,9 @@ def generate_and_load_data(items_file, debug=False):
             start_room_id = 'cell' # Default start for static map
         else:
             room_templates = load_room_templates()
-            game_map, start_room_id = generate_map(room_templates, num_rooms=15)
+            game_map, start_room_id = generate_map(room_templates, num_rooms=15, loot_tables=load_loot_tables())
+            for problem in validate_map(game_map, start_room_id):
+                print(f"Warning: {problem}")
         
         with open(items_file, 'r') as f:
             all_items = json.load(f)
@@ -193,15 +199,27 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
         display_message(stdscr, f"Error loading game config '{config_file}': {e}. Using default settings.", is_danger=True)
         game_config = {} # Use an empty dict to fallback to all defaults
 
+    # One seed for every random stream (map, npc, combat, loot, dialogue); a fresh one if not configured
+    world_seed = set_world_seed(game_config.get("game_settings", {}).get("world_seed"))
+    npc_rng = get_stream("npc") # NPC setup rolls
+    action_rng = get_stream("combat") # Lockpicking rolls
+
     # --- Map Loading ---
     map_settings = game_config.get("map_settings", {})
     map_mode = map_settings.get("mode", "generate_random")
     static_map_file = map_settings.get("static_map_file", "debug_output/debug_map.json")
     random_map_num_rooms = map_settings.get("random_map_num_rooms", 15)
+    world_store_file = map_settings.get("world_store_file") # SQLite file for facilities too big for memory
+    checkpoint_actions = map_settings.get("world_store_checkpoint_actions", 20) # Actions between world store saves
 
     game_map = None
     start_room_id = None
 
+    if world_store_file and os.path.exists(world_store_file):
+        game_map = WorldStore(world_store_file)
+        start_room_id = game_map.get_meta("start_room_id") or game_config.get("player", {}).get("start_location")
+        map_mode = "world_store"
+
     if map_mode == "load_static":
         try:
             with open(static_map_file, 'r') as f:
@@ -214,16 +232,21 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
     if map_mode == "generate_random":
         try:
             room_templates = load_room_templates()
-            game_map, start_room_id_generated = generate_map(room_templates, num_rooms=random_map_num_rooms)
+            game_map, start_room_id_generated = generate_map(room_templates, num_rooms=random_map_num_rooms, loot_tables=load_loot_tables())
             if start_room_id is None: # Only use generated start_room if not set by player config
                 start_room_id = start_room_id_generated
         except Exception as e:
             display_message(stdscr, f"Error generating random map: {e}. Cannot start game.", is_danger=True)
             return
-        
+        problems = validate_map(game_map, start_room_id)
+        if problems:
+            display_message(stdscr, "Warning: the generated map has problems:\n" + "\n".join(problems), is_danger=True)
+
     if game_map is None: # Final check if map generation failed
         display_message(stdscr, "Fatal Error: No game map could be loaded or generated.", is_danger=True)
         return
+    if world_store_file and not isinstance(game_map, WorldStore): # First run: move the map into the store
+        game_map = WorldStore.create(world_store_file, game_map, start_room_id)
 
     # --- Load Items ---
     try:
@@ -232,6 +255,8 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
     except (FileNotFoundError, json.JSONDecodeError) as e:
         display_message(stdscr, f"Error loading items.json: {e}. Game may have issues.", is_danger=True)
         all_items = {} # Provide empty dict as fallback
+    rooms = RoomRegistry(game_map) # Room ids interned once; every manager below indexes rooms by these integers
+    item_manager = ItemManager(game_map, all_items, rooms=rooms) # Room contents, indexed
 
     # --- Player Initialization ---
     player_config = game_config.get("player", {})
@@ -245,42 +270,51 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
         health=player_config.get("health", 100),
         stamina=player_config.get("stamina", 100),
         attributes=player_config.get("attributes", {"strength": 5, "dexterity": 5, "intelligence": 5}),
-        start_location=player_config.get("start_location", start_room_id)
+        start_location=player_config.get("start_location", start_room_id),
+        item_registry=item_manager.registry,
+        item_locations=item_manager.locations
     )
-    player.inventory.extend(player_config.get("inventory", []))
-    equipped = player_config.get("equipped_items", {})
-    player.left_hand = equipped.get("left_hand")
-    player.right_hand = equipped.get("right_hand")
+    if not (isinstance(game_map, WorldStore) and game_map.load_player(player)): # Resumed runs carry on where the player left
+        for item_id in player_config.get("inventory", []):
+            player.inventory.add_item(item_id)
+        equipped = player_config.get("equipped_items", {})
+        for hand in ('left', 'right'):
+            if equipped.get(f"{hand}_hand"):
+                player.set_hand(hand, item_manager.registry.create(equipped[f"{hand}_hand"]))
     player.knowledge.update(player_config.get("knowledge", []))
     player.max_morale = player_config.get("max_morale", 100) # Assuming Player class has default max_morale
     player.morale = player_config.get("morale", player.max_morale)
     player.max_sanity = player_config.get("max_sanity", 100)
     player.sanity = player_config.get("sanity", player.max_sanity)
+    player.item_modifiers = {item_id: data["modifiers"] for item_id, data in all_items.items() if "modifiers" in data}
+    player.invalidate_modifiers() # Hands, morale and sanity were set directly above
     
     # Instantiate managers
-    door_manager = DoorManager(game_map)
-    npc_manager = NPCManager(game_map)
-    scp_manager = SCPManager(game_map)
+    door_manager = DoorManager(game_map, rooms=rooms)
+    npc_manager = NPCManager(game_map, graph=door_manager.graph)
+    scp_manager = SCPManager(game_map, rooms=rooms)
 
     # Read debug option from config
     debug_active = game_config.get("game_settings", {}).get("enable_debug_option", False)
     
     # --- Initialize NPCs ---
     configured_npcs = game_config.get("npcs", [])
-    if not configured_npcs:
+    if isinstance(game_map, WorldStore) and game_map.load_npcs(npc_manager): # NPCs saved with the world
+        game_map.load_npc_items(item_manager)
+    elif not configured_npcs:
         # Generate some random NPCs if none are configured
         display_message(stdscr, "No NPCs configured. Generating 3 random NPCs.", is_dialogue=True)
         all_room_ids = list(game_map.keys())
         if all_room_ids:
             for _ in range(3): # Spawn 3 random NPCs
-                random_room = random.choice(all_room_ids)
-                random_role = random.choice(["Guard", "Scientist", "D-Class"])
+                random_room = npc_rng.choice(all_room_ids)
+                random_role = npc_rng.choice(["Guard", "Scientist", "D-Class"])
                 npc_manager.spawn_npc(random_role, random_room)
     else:
         for npc_data in configured_npcs:
             npc_manager.spawn_npc(
                 npc_data.get("role", "D-Class"),
-                npc_data.get("initial_room_id", random.choice(list(game_map.keys())))
+                npc_data.get("initial_room_id", npc_rng.choice(list(game_map.keys())))
             )
 
     # --- Initialize SCPs ---
@@ -293,6 +327,7 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
         display_message(stdscr, f"Warning: SCP definitions file '{scp_definitions_file}' not found. No SCPs loaded.", is_danger=True)
     
     game_over = False
+    actions_taken = 0
     
     display_message(stdscr, f"You are {player.name}, Clearance Level {player.clearance_level}.", is_item_info=True)
 
@@ -307,6 +342,9 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
             game_over = True
         else: # Only proceed with game logic if player health is above 0
             current_room_id = player.location
+            if isinstance(game_map, WorldStore): # Keep the rooms the player can act on cached
+                game_map.keep_hot([current_room_id] + [exit_info if isinstance(exit_info, str) else exit_info["destination"]
+                                                       for exit_info in game_map[current_room_id].get("exits", {}).values()])
             current_room = game_map[current_room_id]
             npcs_in_room = npc_manager.get_npcs_in_room(current_room_id)
             scps_in_room = scp_manager.get_scps_in_room(current_room_id) # Also get SCPs in room
@@ -316,7 +354,7 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
             options = []
             for detail in sorted(current_room.get("details", {}).keys()):
                 options.append(f"look at {detail}")
-            for item_id in current_room.get("items", []):
+            for item_id in item_manager.room_items(current_room_id).item_ids():
                 if all_items.get(item_id, {}).get("takeable"): # Use .get for robustness
                     options.append(f"take {item_id}")
             for direction in sorted(current_room.get('exits', {}).keys()): # Use .get for robustness
@@ -332,6 +370,8 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                 options.append("equip")
             if player.left_hand or player.right_hand:
                 options.append("unequip")
+            if player.inventory or player.left_hand or player.right_hand:
+                options.append("drop")
             if debug_active: # Use config for debug option
                 options.append("debug")
                 options.append("debug map")
@@ -352,7 +392,7 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                 stdscr.addstr(0, 0, f"Location: {current_room['name']} ({current_room_id})\n", loc_color)
                 stdscr.addstr(current_room['description'] + "\n", desc_color)
     
-                room_items = [all_items[item_id]["name"] for item_id in current_room.get("items", [])]
+                room_items = item_manager.room_items(current_room_id).names() # Cached until the room's items change
                 if room_items:
                     stdscr.addstr("You see: " + ", ".join(room_items) + ".\n\n", item_color)
                 else:
@@ -391,8 +431,12 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
             elif verb == 'debug':
                 if target == 'map':
                     message_to_show = generate_simple_map_view(game_map)
+                elif target.startswith('locate '):
+                    item_id = target[len('locate '):]
+                    found = item_manager.locate_all(item_id)
+                    message_to_show = "\n".join(f"{instance.instance_id}: {holder[0]} {holder[1]}" for instance, holder in found) or f"No '{item_id}' anywhere."
                 else:
-                    message_to_show = "DEBUG MODE\n" + player.get_description(debug=debug_active)
+                    message_to_show = f"DEBUG MODE (world seed {world_seed})\n" + player.get_description(debug=debug_active)
                     if npcs_in_room:
                         for npc_info in npcs_in_room:
                             message_to_show += "\n\n" + npc_info["character"].get_description(debug=debug_active)
@@ -434,7 +478,7 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                     json_map_path = os.path.join(output_dir, "debug_map.json")
                     try:
                         with open(json_map_path, 'w') as f:
-                            json.dump(game_map, f, indent=2)
+                            json.dump(dict(game_map), f, indent=2)
                         message_to_show += f"\nJSON map saved to {json_map_path}"
                     except Exception as e:
                         message_to_show += f"\nFailed to save JSON map: {e}"
@@ -451,17 +495,12 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
             elif verb == 'take':
                 item_id_to_take = target
                 item_data = all_items.get(item_id_to_take)
-                if item_id_to_take in current_room.get("items", []) and item_data and item_data.get("takeable"):
-                    if player.right_hand is None:
-                        player.right_hand = item_id_to_take
-                        message_to_show = f'You took the {item_data["name"]} in your right hand.'
-                    elif player.left_hand is None:
-                        player.left_hand = item_id_to_take
-                        message_to_show = f'You took the {item_data["name"]} in your left hand.'
-                    else:
-                        player.inventory.append(item_id_to_take)
+                if item_id_to_take in item_manager.room_items(player.location) and item_data and item_data.get("takeable"):
+                    held_in = player.hold_item(item_manager.take(player.location, item_id_to_take, 1))
+                    if held_in == 'backpack':
                         message_to_show = f'You took the {item_data["name"]} and put it in your backpack.'
-                    current_room["items"].remove(item_id_to_take)
+                    else:
+                        message_to_show = f'You took the {item_data["name"]} in your {held_in} hand.'
                     is_item_info = True
                 else:
                     message_to_show = f"You can't take the {item_id_to_take}."
@@ -477,6 +516,14 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                     message_to_show = "Use 'unequip [left/right]'."
                 else:
                     message_to_show = player.unequip_item(target)
+            elif verb == 'drop':
+                item = player.release_item(target) if target else None
+                if item is None:
+                    message_to_show = "Use 'drop [item]' with something you are carrying."
+                else:
+                    item_manager.drop(player.location, item)
+                    message_to_show = f"You dropped the {item_manager.registry.name(item.item_id)}."
+                    is_item_info = True
             elif verb == 'talk':
                 if not npcs_in_room:
                     message_to_show = "There is no one here to talk to."
@@ -493,6 +540,7 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                 actual_npcs_in_room = [npc_info["character"] for npc_info in npcs_in_room]
                 message_to_show, game_over = attack(player, actual_npcs_in_room)
                 is_fatal = game_over
+                npc_manager.defeat_fallen_npcs(current_room_id) # Beaten NPCs stop acting
             elif verb == 'run':
                 # Extract Character objects from the list of dictionaries
                 actual_npcs_in_room = [npc_info["character"] for npc_info in npcs_in_room]
@@ -501,13 +549,16 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
             elif verb == 'lockpick':
                 if not target:
                     message_to_show = "Lockpick what?"
-                elif target not in current_room.get("details", {}):
+                elif target not in current_room.get("details", {}) and target not in current_room.get("exits", {}):
                     message_to_show = f"There's no '{target}' here to lockpick."
                 else:
-                    detail_data = current_room["details"][target]
-                    if not detail_data.get("lockable"):
+                    is_door = target in current_room.get("exits", {}) # "lockpick north" picks the door that way
+                    detail_data = current_room["exits"][target] if is_door else current_room["details"][target]
+                    if is_door and door_manager.get_door_state(player.location, target) != DOOR_LOCKED:
+                        message_to_show = f"The door {target} isn't locked."
+                    elif not is_door and not detail_data.get("lockable"):
                         message_to_show = f"The {target} isn't something you can lockpick."
-                    elif not detail_data.get("locked", True):
+                    elif not is_door and not detail_data.get("locked", True):
                         message_to_show = f"The {target} is already unlocked."
                     else:
                         base_stamina_cost = 10
@@ -519,27 +570,29 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                         else:
                             player.stamina -= stamina_cost
                             
-                            dexterity_for_check = player.attributes['dexterity'] - player.get_debuff(attribute='dexterity')
-                            morale_effect_dex = player.get_morale_effect('dexterity')
-                            dexterity_for_check += morale_effect_dex
+                            dexterity_for_check = player.get_effective_attribute('dexterity') # Injuries, morale, held items
                             
                             lock_difficulty = detail_data.get("lock_difficulty", 5)
                             
                             success_chance = max(0.1, min(0.9, 0.5 + (dexterity_for_check - lock_difficulty) * 0.1))
                             
-                            if random.random() < success_chance:
+                            if action_rng.random() < success_chance:
                                 morale_message = player.change_morale(5)
-                                message_to_show = f"You successfully lockpicked the {target}! It's now unlocked."
+                                if is_door:
+                                    message_to_show = f"You successfully lockpicked the door {target}! It's now unlocked."
+                                    door_manager.unlock_door(player.location, target)
+                                else:
+                                    message_to_show = f"You successfully lockpicked the {target}! It's now unlocked."
+                                    detail_data["locked"] = False
+                                    if "unlocked_description" in detail_data:
+                                        detail_data["description"] = detail_data["unlocked_description"]
                                 if morale_message: message_to_show += f" {morale_message}"
-                                detail_data["locked"] = False
-                                if "unlocked_description" in detail_data:
-                                    detail_data["description"] = detail_data["unlocked_description"]
                             else:
                                 morale_message = player.change_morale(-5)
                                 message_to_show = f"You fumble with the lock on the {target} but fail to open it. It remains locked."
                                 if morale_message: message_to_show += f" {morale_message}"
-                                if random.random() < 0.2:
-                                    injury_msg = player.apply_injury(random.choice(['left_arm', 'right_arm']), 'minor_injury')
+                                if action_rng.random() < 0.2:
+                                    injury_msg = player.apply_injury(action_rng.choice(['left_arm', 'right_arm']), 'minor_injury')
                                     message_to_show += f" {injury_msg}"
     
             if message_to_show:
@@ -548,6 +601,14 @@ def main_loop(stdscr): # Removed debug parameter as it will be read from config
                 else:
                     display_message(stdscr, message_to_show, is_danger=is_fatal, is_dialogue=is_dialogue, is_item_info=is_item_info)
 
+            actions_taken += 1
+            if isinstance(game_map, WorldStore) and actions_taken % checkpoint_actions == 0: # A crash loses at most this many actions
+                game_map.save_world(npc_manager, item_manager, player)
+
+    if isinstance(game_map, WorldStore): # Save where everyone and everything ended up
+        game_map.save_world(npc_manager, item_manager, player)
+        game_map.close()
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,185 @@
+# map_analytics.py
+# Structure of a generated map: chokepoints (articulation points, bridges),
+# depth from the start room and dead ends, found in linear time and used to
+# gate deeper parts of the facility and place SCP containment rooms.
+
+from collections import deque
+from room_graph import RoomGraph
+
+
+class MapAnalysis:
+    """
+    Results of analyze_map over the rooms of a RoomGraph, by room index.
+    Exits are treated as two-way doors:
+    - depth[i]: doors between the start room and room i (-1 if unreachable)
+    - articulation_points: rooms whose loss cuts the map in two
+    - bridges: (near, far) pairs of rooms whose door is the only way
+      between the two sides, near being the side closer to the start
+    - dead_ends: rooms with a single neighbouring room
+    """
+    def __init__(self, graph, depth, articulation_points, bridges, dead_ends):
+        self.graph = graph
+        self.depth = depth
+        self.articulation_points = articulation_points
+        self.bridges = bridges
+        self.dead_ends = dead_ends
+
+
+def _undirected_adjacency(graph):
+    """CSR (indptr, neighbors) of the map as a simple undirected graph: one entry per pair of connected rooms."""
+    n = len(graph)
+    pairs = set()
+    for s, d in zip(graph.source, graph.dest):
+        if s != d:
+            pairs.add((s, d) if s < d else (d, s))
+    degree = [0] * (n + 1)
+    for a, b in pairs:
+        degree[a + 1] += 1
+        degree[b + 1] += 1
+    for i in range(n):
+        degree[i + 1] += degree[i]
+    indptr = degree[:]
+    fill = degree[:-1]
+    neighbors = [0] * (2 * len(pairs))
+    for a, b in pairs:
+        neighbors[fill[a]] = b
+        fill[a] += 1
+        neighbors[fill[b]] = a
+        fill[b] += 1
+    return indptr, neighbors
+
+
+def analyze_map(graph, start_room_id):
+    """
+    Finds depths from start_room_id, articulation points, bridges and dead
+    ends in one BFS and one iterative Tarjan DFS, O(rooms + exits) with no
+    recursion, so it copes with 100k-room maps.
+    """
+    n = len(graph)
+    indptr, neighbors = _undirected_adjacency(graph)
+    start = graph.index[start_room_id]
+
+    depth = [-1] * n
+    depth[start] = 0
+    queue = deque([start])
+    while queue:
+        room = queue.popleft()
+        for i in range(indptr[room], indptr[room + 1]):
+            other = neighbors[i]
+            if depth[other] == -1:
+                depth[other] = depth[room] + 1
+                queue.append(other)
+
+    discovered = [-1] * n
+    low = [0] * n
+    parent = [-1] * n
+    next_edge = indptr[:-1] # Per room, the next neighbor the DFS has yet to look at
+    articulation_points = set()
+    bridges = []
+    time = 0
+    for root in [start] + list(range(n)): # The start's component first, then any others
+        if discovered[root] != -1:
+            continue
+        discovered[root] = low[root] = time
+        time += 1
+        root_children = 0
+        stack = [root]
+        while stack:
+            room = stack[-1]
+            i = next_edge[room]
+            if i < indptr[room + 1]:
+                next_edge[room] = i + 1
+                other = neighbors[i]
+                if discovered[other] == -1:
+                    parent[other] = room
+                    discovered[other] = low[other] = time
+                    time += 1
+                    stack.append(other)
+                    if room == root:
+                        root_children += 1
+                elif other != parent[room] and discovered[other] < low[room]:
+                    low[room] = discovered[other]
+            else:
+                stack.pop()
+                if stack:
+                    up = stack[-1]
+                    if low[room] < low[up]:
+                        low[up] = low[room]
+                    if low[room] > discovered[up]:
+                        bridges.append((up, room))
+                    if up != root and low[room] >= discovered[up]:
+                        articulation_points.add(up)
+        if root_children > 1:
+            articulation_points.add(root)
+
+    dead_ends = [room for room in range(n) if indptr[room + 1] - indptr[room] == 1]
+    return MapAnalysis(graph, depth, articulation_points, bridges, dead_ends)
+
+
+def _raise_door_level(game_map, room_id, other_id, door_level):
+    """Raises every exit from room_id to other_id to at least door_level."""
+    for exit_info in game_map[room_id]["exits"].values():
+        if exit_info.get("destination") == other_id:
+            exit_info["door_level"] = max(exit_info.get("door_level", 0), door_level)
+
+
+def secure_map(game_map, start_room_id, level_depths=(4, 10), containment_count=2, containment_door_level=3):
+    """
+    Gates a generated map from its structure:
+    - every bridge gets a door of level L, L being how many of level_depths
+      the near side's depth reaches, so the only ways into deeper parts of
+      the facility need more clearance (doors near the start stay open);
+    - the deepest dead ends at least two doors from the start become SCP
+      containment rooms, marked "containment": True and tagged
+      "containment", behind a containment_door_level door.
+    Plain string exits are turned into {"destination", "door_level"} dicts;
+    door levels are only ever raised. Returns (MapAnalysis, containment room ids).
+    """
+    graph = RoomGraph(game_map)
+    analysis = analyze_map(graph, start_room_id)
+    room_ids, depth = graph.room_ids, analysis.depth
+    for room_id, room in game_map.items():
+        room["exits"] = {direction: {"destination": exit_info, "door_level": 0} if isinstance(exit_info, str) else exit_info
+                         for direction, exit_info in room.get("exits", {}).items()}
+
+    for near, far in analysis.bridges:
+        level = sum(1 for threshold in level_depths if depth[near] >= threshold)
+        if level:
+            _raise_door_level(game_map, room_ids[near], room_ids[far], level)
+            _raise_door_level(game_map, room_ids[far], room_ids[near], level)
+
+    # Dead ends right next to the start would seal it in on small maps
+    candidates = sorted((room for room in analysis.dead_ends if depth[room] > 1),
+                        key=lambda room: -depth[room])
+    containment_rooms = []
+    for room in candidates[:containment_count]:
+        room_id = room_ids[room]
+        game_map[room_id]["containment"] = True
+        game_map[room_id].setdefault("tags", []).append("containment")
+        containment_rooms.append(room_id)
+        for exit_info in game_map[room_id]["exits"].values():
+            exit_info["door_level"] = max(exit_info.get("door_level", 0), containment_door_level)
+            _raise_door_level(game_map, exit_info["destination"], room_id, containment_door_level)
+    return analysis, containment_rooms
+
+
+if __name__ == "__main__":
+    import time
+    from map_generator import generate_grid_map
+
+    game_map, start_room_id = generate_grid_map(316, 316)
+    # Cut most east-west doors so the grid turns into long corridors joined by a few crossings
+    for x in range(316):
+        for y in range(316):
+            if y % 8 and x < 315:
+                del game_map[f"room_{x}_{y}"]["exits"]["east"]
+                del game_map[f"room_{x + 1}_{y}"]["exits"]["west"]
+    start = time.perf_counter()
+    graph = RoomGraph(game_map)
+    analysis = analyze_map(graph, start_room_id)
+    elapsed = time.perf_counter() - start
+    print(f"{len(game_map)} rooms analyzed in {elapsed:.2f}s: {len(analysis.articulation_points)} articulation points, "
+          f"{len(analysis.bridges)} bridges, {len(analysis.dead_ends)} dead ends, max depth {max(analysis.depth)}")
+    start = time.perf_counter()
+    _, containment_rooms = secure_map(game_map, start_room_id)
+    print(f"Secured in {time.perf_counter() - start:.2f}s; containment rooms: {containment_rooms}")
@@ -1,6 +1,9 @@
 import json
-import random
+from random_streams import get_stream
 import copy
+from door_manager import DoorManager
+from loot import apply_loot, load_loot_tables
+from map_analytics import secure_map
 
 OPPOSITE_DIRECTIONS = {
     "north": "south",
@@ -50,14 +53,18 @@ def find_matching_templates(templates, required_exits, forbidden_exits):
         
     return matching
 
-def generate_map(templates, num_rooms=10):
+def generate_map(templates, num_rooms=10, loot_tables=None):
     """
     Generates a procedural map by connecting rooms from templates.
+    With loot_tables (see loot.load_loot_tables) rooms are stocked with loot.
+    Chokepoint doors and SCP containment rooms are then set by
+    map_analytics.secure_map.
     """
+    rng = get_stream("map")
     grid = {}  # (x, y) -> room_dict
     
     # Start room
-    start_template = random.choice([t for t in templates if "start" in t.get("tags", [])])
+    start_template = rng.choice([t for t in templates if "start" in t.get("tags", [])])
     start_room_id = "room_0_0"
     start_room = copy.deepcopy(start_template)
     grid[(0, 0)] = start_room
@@ -70,7 +77,7 @@ def generate_map(templates, num_rooms=10):
         if exit_dir == "west":  frontier.append((-1, 0, "east"))
 
     while frontier and len(grid) < num_rooms:
-        x, y, required_exit_from_neighbor = frontier.pop(random.randint(0, len(frontier) - 1))
+        x, y, required_exit_from_neighbor = frontier.pop(rng.randint(0, len(frontier) - 1))
 
         if (x, y) in grid:
             continue
@@ -95,7 +102,7 @@ def generate_map(templates, num_rooms=10):
         if not possible_templates:
             continue # Can't find a room that fits, try another frontier
             
-        chosen_template = copy.deepcopy(random.choice(possible_templates))
+        chosen_template = copy.deepcopy(rng.choice(possible_templates))
         
         grid[(x, y)] = chosen_template
         
@@ -128,12 +135,71 @@ def generate_map(templates, num_rooms=10):
         
         room_data["exits"] = final_exits
         final_map[room_id] = room_data
-        
+
+    if loot_tables:
+        apply_loot(final_map, loot_tables)
+    secure_map(final_map, start_room_id)
     return final_map, "room_0_0" # Return map and starting room id
 
+def generate_grid_map(width, height, door_level_weights=None, loot_tables=None):
+    """
+    Generates a fully connected width x height grid of hallways, using the
+    same room_x_y ids and coordinates as generate_map. Used to stress test
+    systems on facilities far larger than the template generator produces.
+    door_level_weights optionally maps door_level -> weight for each connection.
+    """
+    rng = get_stream("map")
+    levels, weights = [0], [1]
+    if door_level_weights:
+        levels, weights = list(door_level_weights.keys()), list(door_level_weights.values())
+
+    final_map = {}
+    for x in range(width):
+        for y in range(height):
+            final_map[f"room_{x}_{y}"] = {
+                "name": "Sterile Hallway",
+                "description": "A long, sterile hallway.",
+                "exits": {},
+                "details": {}
+            }
+    for x in range(width):
+        for y in range(height):
+            room_id = f"room_{x}_{y}"
+            for exit_dir, nx, ny in (("north", x, y + 1), ("east", x + 1, y)):
+                if nx >= width or ny >= height:
+                    continue
+                neighbor_id = f"room_{nx}_{ny}"
+                door_level = rng.choices(levels, weights)[0]
+                final_map[room_id]["exits"][exit_dir] = {"destination": neighbor_id, "door_level": door_level}
+                final_map[neighbor_id]["exits"][OPPOSITE_DIRECTIONS[exit_dir]] = {"destination": room_id, "door_level": door_level}
+    if loot_tables:
+        apply_loot(final_map, loot_tables)
+    return final_map, "room_0_0"
+
+def validate_map(game_map, start_room_id):
+    """
+    Checks a generated map with the reachability index. Returns a list of
+    problems (empty if none): rooms that no clearance level can get to from
+    the start, and a start room that Level 0 (D-Class) cannot leave at all.
+    """
+    door_manager = DoorManager(game_map)
+    if start_room_id not in game_map:
+        return [f"Start room '{start_room_id}' is not in the map."]
+    problems = []
+    everyone = door_manager.graph.max_door_level
+    unreachable = [room_id for room_id in game_map if not door_manager.can_reach(everyone, start_room_id, room_id)]
+    if unreachable:
+        problems.append(f"{len(unreachable)} room(s) cannot be reached from {start_room_id} at any clearance: "
+                        f"{', '.join(unreachable[:10])}{'...' if len(unreachable) > 10 else ''}")
+    if door_manager.reachability.component_size(door_manager.graph.index[start_room_id], 0) == 1 and len(game_map) > 1:
+        problems.append(f"A Level 0 entity cannot leave {start_room_id}.")
+    return problems
+
 if __name__ == '__main__':
     # This part allows testing the generator directly
     templates = load_room_templates()
-    game_map, start_id = generate_map(templates, 15)
+    game_map, start_id = generate_map(templates, 15, loot_tables=load_loot_tables())
     print(json.dumps(game_map, indent=2))
     print(f"\nMap generated with {len(game_map)} rooms. Start at: {start_id}")
+    for problem in validate_map(game_map, start_id):
+        print(f"Warning: {problem}")
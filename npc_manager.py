@@ -1,98 +1,424 @@
-import random
-import datetime
-from character import Character, generate_character # Assuming character.py is in the same directory
+from random_streams import get_stream, get_generator, get_buffer
+from character import Character, generate_character, clearance_for_seed, ROLE_CLEARANCES # Assuming character.py is in the same directory
+from room_graph import RoomGraph, np
+
+# Turns between moves when NPCs are driven by a TurnScheduler
+NPC_MOVE_INTERVALS = {"Guard": 2, "Scientist": 4, "D-class": 3}
 
 class NPCManager:
-    def __init__(self, map_data):
+    """
+    Keeps every NPC as a slot in a struct-of-arrays store: integer columns
+    for role, character seed, location, clearance, last move and whether it
+    has been defeated, so tick_all can move everyone at once and memory per
+    NPC stays small. Defeated NPCs keep their slot (and id) but stay where
+    they fell and are left out of get_npcs_in_room.
+    NPCs are spawned as a (role, seed) pair; the full Character is only
+    generated from it the first time something looks at the NPC, and always
+    comes out the same. NPC ids are derived from the slot ("npc_001" is slot 0).
+    """
+    def __init__(self, map_data, graph=None):
         self.map_data = map_data
-        self._npcs = {} # {npc_id: {"character": Character_obj, "current_room": "room_id", "last_moved_at": datetime_obj}}
-        self._next_npc_id = 1
+        self.turn = 0 # Advanced by tick_all
+
+        # Pass DoorManager.graph to see door level changes made at runtime
+        self._graph = graph if graph is not None else RoomGraph(map_data)
+        self._characters = {} # {slot: Character_obj}, only for NPCs looked at so far
+        self._roles = [] # role code -> role name ("Guard", "D-class", ...)
+        self._role_codes = {} # {role name: role code}
+        self._count = 0
+        self._role_of = self._new_column(16) # role code
+        self._seeds = self._new_column(16) # seed of the NPC's Character
+        self._locations = self._new_column(16) # room index into self._graph
+        self._clearances = self._new_column(16)
+        self._last_moved = self._new_column(16) # turn number of the last move
+        self._defeated = self._new_column(16) # 1 once the NPC is down for good
+        self._random = get_stream("npc")
+        self._rng = get_generator("npc") # Bulk spawning
+        self._buffer = get_buffer("npc") # Pre-drawn floats for batch moves
+
+    @staticmethod
+    def _new_column(size):
+        if np is not None:
+            return np.zeros(size, dtype=np.int32)
+        return [0] * size
+
+    def _grow_columns(self, needed=1):
+        """Doubles the capacity of the per-NPC columns until `needed` more NPCs fit."""
+        capacity = len(self._locations) * 2
+        while capacity < self._count + needed:
+            capacity *= 2
+        for name in ("_role_of", "_seeds", "_locations", "_clearances", "_last_moved", "_defeated"):
+            old = getattr(self, name)
+            if np is not None:
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:len(old)] = old
+            else:
+                new = old + [0] * (capacity - len(old))
+            setattr(self, name, new)
+
+    @staticmethod
+    def _npc_id(slot):
+        return f"npc_{slot + 1:03d}"
+
+    def _slot_of(self, npc_id):
+        """Returns the slot of an NPC id, or None if there is no such NPC."""
+        try:
+            slot = int(npc_id[4:]) - 1
+        except (TypeError, ValueError):
+            return None
+        if 0 <= slot < self._count and self._npc_id(slot) == npc_id:
+            return slot
+        return None
+
+    def _role_code(self, role):
+        role_name = role.capitalize() # Same spelling generate_character gives the role
+        code = self._role_codes.get(role_name)
+        if code is None:
+            code = self._role_codes[role_name] = len(self._roles)
+            self._roles.append(role_name)
+        return code
+
+    def _role(self, slot):
+        return self._roles[self._role_of[slot]]
+
+    def _character(self, slot):
+        """Returns the Character of a slot, generating it from its seed on first use."""
+        character = self._characters.get(slot)
+        if character is None:
+            character = generate_character(self._role(slot), seed=int(self._seeds[slot]))
+            self._characters[slot] = character
+        return character
+
+    def _info(self, slot):
+        """Builds the public info dictionary for an NPC from its columns."""
+        return {
+            "id": self._npc_id(slot),
+            "character": self._character(slot),
+            "current_room": self._graph.room_ids[self._locations[slot]],
+            "last_moved_at": int(self._last_moved[slot])
+        }
+
+    def get_npc_ids(self):
+        return [self._npc_id(slot) for slot in range(self._count)]
 
     def spawn_npc(self, role, initial_room_id):
         if initial_room_id not in self.map_data:
             print(f"Warning: Attempted to spawn NPC in non-existent room: {initial_room_id}")
             return None
 
-        npc_character = generate_character(role)
-        npc_id = f"npc_{self._next_npc_id:03d}"
-        self._next_npc_id += 1
+        if self._count == len(self._locations):
+            self._grow_columns()
+        slot = self._count
+        self._count += 1
+        seed = self._random.getrandbits(31)
+        self._role_of[slot] = self._role_code(role)
+        self._seeds[slot] = seed
+        self._locations[slot] = self._graph.index[initial_room_id]
+        self._clearances[slot] = clearance_for_seed(role, seed)
+        self._last_moved[slot] = self.turn
 
-        self._npcs[npc_id] = {
-            "character": npc_character,
-            "current_room": initial_room_id,
-            "last_moved_at": datetime.datetime.now()
-        }
-        print(f"Spawned {npc_character.name} ({role}) with ID {npc_id} in {initial_room_id}")
+        npc_id = self._npc_id(slot)
+        print(f"Spawned {self._role(slot)} with ID {npc_id} in {initial_room_id}")
         return npc_id
 
+    def restore_npc(self, role, room_id, seed, last_moved_at=0, defeated=False):
+        """
+        Re-creates a saved NPC (see npc_records) with its own seed, so it gets
+        the same Character back. NPCs must be restored in slot order to keep
+        their ids. Returns the NPC id, or None if the room is unknown.
+        """
+        room_index = self._graph.index.get(room_id)
+        if room_index is None:
+            print(f"Warning: Attempted to restore NPC in non-existent room: {room_id}")
+            return None
+        if self._count == len(self._locations):
+            self._grow_columns()
+        slot = self._count
+        self._count += 1
+        self._role_of[slot] = self._role_code(role)
+        self._seeds[slot] = seed
+        self._locations[slot] = room_index
+        self._clearances[slot] = clearance_for_seed(role, seed)
+        self._last_moved[slot] = last_moved_at
+        self._defeated[slot] = int(defeated)
+        return self._npc_id(slot)
+
+    def npc_records(self):
+        """Returns (slot, role, seed, room_id, last_moved_at, defeated) for every NPC, enough for restore_npc."""
+        room_ids = self._graph.room_ids
+        return [(slot, self._role(slot), int(self._seeds[slot]), room_ids[self._locations[slot]], int(self._last_moved[slot]),
+                 int(self._defeated[slot])) for slot in range(self._count)]
+
+    def spawn_npcs(self, role_counts, rooms):
+        """
+        Spawns many NPCs at once, e.g. spawn_npcs({"Guard": 500, "D-Class": 2000}, room_ids),
+        each in a random room from `rooms`. Only the columns are filled in,
+        so this stays fast for hundreds of thousands of NPCs.
+        Returns the new NPC ids.
+        """
+        room_indices = [self._graph.index[room_id] for room_id in rooms if room_id in self.map_data]
+        if not room_indices:
+            print("Warning: Attempted to spawn NPCs with no existing rooms to put them in.")
+            return []
+
+        total = sum(role_counts.values())
+        if self._count + total > len(self._locations):
+            self._grow_columns(total)
+        first = slot = self._count
+        if np is not None:
+            room_indices = np.array(room_indices, dtype=np.int32)
+        for role, count in role_counts.items():
+            code = self._role_code(role)
+            end = slot + count
+            if np is not None:
+                seeds = self._rng.integers(0, 2 ** 31, count)
+                clearances = np.array(ROLE_CLEARANCES.get(role.lower(), (0,)), dtype=np.int32)
+                self._role_of[slot:end] = code
+                self._seeds[slot:end] = seeds
+                self._clearances[slot:end] = clearances[seeds % len(clearances)] # clearance_for_seed, vectorized
+                self._locations[slot:end] = room_indices[self._rng.integers(0, len(room_indices), count)]
+                self._last_moved[slot:end] = self.turn
+            else:
+                for s in range(slot, end):
+                    seed = self._random.getrandbits(31)
+                    self._role_of[s] = code
+                    self._seeds[s] = seed
+                    self._clearances[s] = clearance_for_seed(role, seed)
+                    self._locations[s] = self._random.choice(room_indices)
+                    self._last_moved[s] = self.turn
+            slot = end
+        self._count = slot
+
+        print(f"Spawned {total} NPCs across {len(room_indices)} rooms")
+        return [self._npc_id(s) for s in range(first, slot)]
+
+    def get_character(self, npc_id):
+        """Returns the Character of an NPC (generating it if nobody has looked at it yet), or None."""
+        slot = self._slot_of(npc_id)
+        return self._character(slot) if slot is not None else None
+
     def move_npc(self, npc_id):
-        if npc_id not in self._npcs:
+        slot = self._slot_of(npc_id)
+        if slot is None:
             print(f"Warning: NPC with ID {npc_id} not found for movement.")
             return False
+        if self._defeated[slot]:
+            return False
 
-        npc_info = self._npcs[npc_id]
-        current_room_id = npc_info["current_room"]
+        current = self._locations[slot]
 
-        room_exits = self.map_data.get(current_room_id, {}).get("exits", {})
-        if not room_exits:
-            print(f"NPC {npc_info['character'].name} in {current_room_id} has no exits to move to.")
+        # Only exits the NPC has clearance for
+        indptr, dest = self._graph.for_clearance(self._clearances[slot])
+        start, end = indptr[current], indptr[current + 1]
+        if start == end:
+            print(f"NPC {self._character(slot).name} in {self._graph.room_ids[current]} has no exits to move to.")
             return False
 
         # Choose a random exit
-        destination_room_id = random.choice(list(room_exits.values()))
-        
-        npc_info["current_room"] = destination_room_id
-        npc_info["last_moved_at"] = datetime.datetime.now()
-        # print(f"NPC {npc_info['character'].name} moved to {destination_room_id}")
+        self._locations[slot] = dest[self._random.randrange(start, end)]
+        self._last_moved[slot] = self.turn
+        # print(f"NPC {self._character(slot).name} moved to {self._graph.room_ids[self._locations[slot]]}")
+        return True
+
+    def move_npc_toward(self, npc_id, target_room_id, pathfinder):
+        """
+        Moves an NPC one step along the shortest route to target_room_id that
+        its clearance allows, using a pathfinding.Pathfinder.
+        Returns False if the NPC is already there or has no route.
+        """
+        slot = self._slot_of(npc_id)
+        if slot is None:
+            print(f"Warning: NPC with ID {npc_id} not found for movement.")
+            return False
+
+        if self._defeated[slot]:
+            return False
+
+        current_room_id = self._graph.room_ids[self._locations[slot]]
+        hop = pathfinder.next_hop(current_room_id, target_room_id, self._clearances[slot])
+        if hop is None:
+            return False
+
+        self._locations[slot] = self._graph.index[hop[1]]
+        self._last_moved[slot] = self.turn
         return True
 
+    # --- Slot-level helpers for schedulers that drive NPCs themselves (see lod_simulation.py) ---
+
+    def npc_count(self):
+        return self._count
+
+    def slot_room_index(self, slot):
+        """Returns the room index (into the shared RoomGraph) of the NPC in a slot."""
+        return int(self._locations[slot])
+
+    def slot_clearance(self, slot):
+        return int(self._clearances[slot])
+
+    def place_slot(self, slot, room_index):
+        """Puts the NPC in a slot into a room without walking there (defeated NPCs stay put)."""
+        if not self._defeated[slot]:
+            self._locations[slot] = room_index
+
+    def wander_slot(self, slot, steps=1):
+        """
+        Random walk of up to `steps` moves for the NPC in a slot, through exits
+        its clearance opens. Returns the number of moves made.
+        """
+        if self._defeated[slot]:
+            return 0
+        indptr, dest = self._graph.for_clearance(self._clearances[slot])
+        current = self._locations[slot]
+        moved = 0
+        for _ in range(steps):
+            start, end = indptr[current], indptr[current + 1]
+            if start == end:
+                break
+            current = dest[self._random.randrange(start, end)]
+            moved += 1
+        if moved:
+            self._locations[slot] = current
+            self._last_moved[slot] = self.turn
+        return moved
+
+    def schedule_moves(self, scheduler):
+        """Registers every NPC on a TurnScheduler, spreading first moves over one interval."""
+        for slot in range(self._count):
+            interval = NPC_MOVE_INTERVALS.get(self._role(slot), 3)
+            scheduler.schedule_in(("npc", self._npc_id(slot)), self._random.randint(1, interval))
+
+    def wake_npc(self, npc_id, scheduler):
+        """Moves an NPC woken by the scheduler and books its next move."""
+        slot = self._slot_of(npc_id)
+        if slot is None or self._defeated[slot]:
+            return
+        self.wander_slot(slot)
+        scheduler.schedule_in(("npc", npc_id), NPC_MOVE_INTERVALS.get(self._role(slot), 3))
+
+    def tick_all(self):
+        """
+        Advances the turn and moves every NPC through one random exit it has
+        clearance for, in a single batch over the CSR graph. NPCs with no
+        usable exit stay put. Returns the number of NPCs that moved.
+        """
+        self.turn += 1
+        n = self._count
+        if n == 0:
+            return 0
+        if np is None:
+            moved = 0
+            for slot in range(n):
+                if self._defeated[slot]:
+                    continue
+                indptr, dest = self._graph.for_clearance(self._clearances[slot])
+                current = self._locations[slot]
+                start, end = indptr[current], indptr[current + 1]
+                if start < end:
+                    self._locations[slot] = dest[self._random.randrange(start, end)]
+                    self._last_moved[slot] = self.turn
+                    moved += 1
+            return moved
+
+        locations = self._locations[:n]
+        levels = np.clip(self._clearances[:n], 0, self._graph.max_door_level)
+        standing = self._defeated[:n] == 0
+        moved = 0
+        # One vectorized pass per clearance level present (a handful at most)
+        for level in np.unique(levels):
+            slots = np.flatnonzero((levels == level) & standing)
+            indptr, dest = self._graph.for_clearance(int(level))
+            current = locations[slots]
+            start = indptr[current]
+            degree = indptr[current + 1] - start
+            can_move = degree > 0
+            slots, start, degree = slots[can_move], start[can_move], degree[can_move]
+            offset = self._buffer.integers(degree, len(slots))
+            locations[slots] = dest[start + offset]
+            self._last_moved[slots] = self.turn
+            moved += len(slots)
+        return moved
+
     def get_npc_locations_for_display(self):
         """
         Returns a dictionary suitable for map_visualizer.py, mapping room_id to list of NPC role chars.
         Example: {"room_id": ["G", "S"]}
         """
         display_locations = {}
-        for npc_id, npc_info in self._npcs.items():
-            room_id = npc_info["current_room"]
-            role_char = npc_info["character"].role[0] # Use first letter of role as marker
+        for slot in range(self._count):
+            if self._defeated[slot]:
+                continue
+            room_id = self._graph.room_ids[self._locations[slot]]
+            role_char = self._role(slot)[0] # Use first letter of role as marker
 
             if room_id not in display_locations:
                 display_locations[room_id] = []
             display_locations[room_id].append(role_char)
         return display_locations
 
+    def get_npc_room(self, npc_id):
+        """Returns the id of the room an NPC is in, or None if there is no such NPC."""
+        slot = self._slot_of(npc_id)
+        return self._graph.room_ids[self._locations[slot]] if slot is not None else None
+
     def get_npc_status(self, npc_id=None):
         """
         Returns detailed status for a specific NPC, or all NPCs if npc_id is None.
-        Includes current room and last moved timestamp.
+        Includes current room and the turn it last moved on.
         """
-        if npc_id and npc_id not in self._npcs:
+        slot = self._slot_of(npc_id) if npc_id else None
+        if npc_id and slot is None:
             return f"NPC with ID {npc_id} not found."
         
         if npc_id:
-            npc_info = self._npcs[npc_id]
+            npc_info = self._info(slot)
             char = npc_info['character']
             return (
                 f"{char.name} ({char.role}, ID: {npc_id})\n"
                 f"  Current Room: {npc_info['current_room']}\n"
-                f"  Last Moved: {npc_info['last_moved_at'].strftime('%Y-%m-%d %H:%M:%S')}"
+                f"  Last Moved: Turn {npc_info['last_moved_at']}"
             )
         else:
             all_npc_status = []
-            for id, info in self._npcs.items():
+            for slot in range(self._count):
+                info = self._info(slot)
                 char = info['character']
                 all_npc_status.append(
-                    f"{char.name} ({char.role}, ID: {id}) in {info['current_room']} "
-                    f"(Last Moved: {info['last_moved_at'].strftime('%Y-%m-%d %H:%M:%S')})"
+                    f"{char.name} ({char.role}, ID: {self._npc_id(slot)}) in {info['current_room']} "
+                    f"(Last Moved: Turn {info['last_moved_at']})"
                 )
             return "\n".join(all_npc_status)
 
     def get_npcs_in_room(self, room_id):
         """
         Returns a list of NPC info dictionaries for NPCs in the specified room.
-        Each dictionary contains {"character": Character_obj, "current_room": "room_id", ...}
+        Each dictionary contains {"id": npc_id, "character": Character_obj, "current_room": "room_id", "last_moved_at": turn}.
+        Defeated NPCs are left out.
         """
-        return [info for info in self._npcs.values() if info["current_room"] == room_id]
+        room_index = self._graph.index.get(room_id)
+        if room_index is None:
+            return []
+        if np is not None:
+            slots = np.flatnonzero((self._locations[:self._count] == room_index) & (self._defeated[:self._count] == 0))
+        else:
+            slots = [slot for slot in range(self._count) if self._locations[slot] == room_index and not self._defeated[slot]]
+        return [self._info(slot) for slot in slots]
+
+    def defeat_fallen_npcs(self, room_id):
+        """
+        Marks the NPCs in a room whose Character has no health left (e.g.
+        after combat) as defeated. Returns their ids.
+        """
+        fallen = []
+        for npc_info in self.get_npcs_in_room(room_id):
+            if npc_info["character"].health <= 0:
+                slot = self._slot_of(npc_info["id"])
+                self._defeated[slot] = 1
+                fallen.append(npc_info["id"])
+        return fallen
+
+    def is_defeated(self, npc_id):
+        slot = self._slot_of(npc_id)
+        return slot is not None and bool(self._defeated[slot])
 
 # For testing (can be removed later)
 if __name__ == "__main__":
@@ -121,8 +447,10 @@ if __name__ == "__main__":
         # Simulate some movement
         print("\n--- Simulating NPC Movement ---")
         for _ in range(5): # Move each NPC 5 times
-            for npc_id in list(npc_manager._npcs.keys()): # Iterate over a copy of keys as dict might change
+            for npc_id in npc_manager.get_npc_ids():
                 npc_manager.move_npc(npc_id)
+        for _ in range(5): # And 5 more batch ticks
+            npc_manager.tick_all()
 
         print("\n--- NPC Status After Movement ---")
         print(npc_manager.get_npc_status())
@@ -0,0 +1,156 @@
+# pathfinding.py
+# Clearance-aware routing over the room graph, for NPC pursuit, guard patrols
+# and SCP hunting.
+
+from array import array
+from collections import OrderedDict, deque
+
+
+def shortest_path(graph, from_index, target_index, clearance_level):
+    """
+    Plain single-query BFS over a RoomGraph, stopping as soon as the target is
+    reached. Returns the list of room indices from start to target, or None.
+    """
+    parent_edge = {from_index: -1}
+    queue = deque([from_index])
+    while queue:
+        room_index = queue.popleft()
+        if room_index == target_index:
+            path = [room_index]
+            while parent_edge[room_index] != -1:
+                room_index = graph.source[parent_edge[room_index]]
+                path.append(room_index)
+            path.reverse()
+            return path
+        for e in range(graph.indptr[room_index], graph.indptr[room_index + 1]):
+            to_index = graph.dest[e]
+            if to_index not in parent_edge and graph.door_level[e] <= clearance_level:
+                parent_edge[to_index] = e
+                queue.append(to_index)
+    return None
+
+
+class Pathfinder:
+    """
+    Answers route queries over DoorManager.graph for a given clearance level.
+    For each (target room, clearance level) it builds a BFS tree rooted at the
+    target over the reversed graph and caches it, so next-hop and distance
+    queries from any room are a single array lookup. Cached trees are dropped
+    when a door change affects their clearance level.
+    """
+    def __init__(self, door_manager, max_cached_trees=256):
+        self.door_manager = door_manager
+        self.graph = door_manager.graph
+        self.max_cached_trees = max_cached_trees
+        self._trees = OrderedDict() # {(target_index, level): (next_edge, distance)}, least recently used first
+        door_manager.add_door_listener(self._on_door_changed)
+
+    def _level(self, clearance_level):
+        # Every clearance above the highest door level sees the same graph
+        return min(max(clearance_level, 0), self.graph.max_door_level)
+
+    def _tree(self, target_index, clearance_level):
+        key = (target_index, self._level(clearance_level))
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+
+        graph = self.graph
+        level = key[1]
+        rev_indptr, rev_edges = graph.incoming()
+        source, door_level = graph.source, graph.door_level
+        next_edge = array('i', [-1]) * len(graph) # edge to take from each room, -1 if none
+        distance = array('i', [-1]) * len(graph)  # rooms to go, -1 if unreachable
+        distance[target_index] = 0
+        queue = deque([target_index])
+        while queue:
+            room_index = queue.popleft()
+            hops = distance[room_index] + 1
+            for i in range(rev_indptr[room_index], rev_indptr[room_index + 1]):
+                e = rev_edges[i]
+                from_index = source[e]
+                if distance[from_index] != -1 or door_level[e] > level:
+                    continue
+                distance[from_index] = hops
+                next_edge[from_index] = e
+                queue.append(from_index)
+
+        tree = (next_edge, distance)
+        self._trees[key] = tree
+        if len(self._trees) > self.max_cached_trees:
+            self._trees.popitem(last=False)
+        return tree
+
+    def _on_door_changed(self, room_index, direction, old_level, new_level):
+        # Only clearances that could pass the door before but not now (or the reverse) are affected
+        low, high = sorted((old_level, new_level))
+        for key in [key for key in self._trees if low <= key[1] < high]:
+            del self._trees[key]
+
+    def _indices(self, from_room_id, target_room_id, clearance_level):
+        """
+        Room indices of a query, or (None, None) if either room is unknown or
+        the reachability index already rules out a route (no tree gets built).
+        """
+        from_index, target_index = self.graph.index.get(from_room_id), self.graph.index.get(target_room_id)
+        if from_index is None or target_index is None:
+            return None, None
+        if not self.door_manager.reachability.connected(from_index, target_index, clearance_level):
+            return None, None
+        return from_index, target_index
+
+    def next_hop(self, from_room_id, target_room_id, clearance_level):
+        """
+        Returns (direction, next_room_id) for the first step of a shortest
+        route from from_room_id to target_room_id, or None if already there
+        or no route is open at this clearance level.
+        """
+        from_index, target_index = self._indices(from_room_id, target_room_id, clearance_level)
+        if from_index is None or target_index is None:
+            return None
+        e = self._tree(target_index, clearance_level)[0][from_index]
+        if e == -1:
+            return None
+        return self.graph.directions[e], self.graph.room_ids[self.graph.dest[e]]
+
+    def distance(self, from_room_id, target_room_id, clearance_level):
+        """Returns the number of moves on a shortest route, or None if unreachable."""
+        from_index, target_index = self._indices(from_room_id, target_room_id, clearance_level)
+        if from_index is None or target_index is None:
+            return None
+        hops = self._tree(target_index, clearance_level)[1][from_index]
+        return hops if hops != -1 else None
+
+    def find_path(self, from_room_id, target_room_id, clearance_level):
+        """Returns the list of room ids from start to target (inclusive), or None if unreachable."""
+        from_index, target_index = self._indices(from_room_id, target_room_id, clearance_level)
+        if from_index is None or target_index is None:
+            return None
+        next_edge, distance = self._tree(target_index, clearance_level)
+        if distance[from_index] == -1:
+            return None
+        path = [from_room_id]
+        room_index = from_index
+        while room_index != target_index:
+            room_index = self.graph.dest[next_edge[room_index]]
+            path.append(self.graph.room_ids[room_index])
+        return path
+
+
+if __name__ == "__main__":
+    from map_visualizer import load_map_data
+    from door_manager import DoorManager
+
+    map_data = load_map_data()
+    if map_data:
+        door_manager = DoorManager(map_data)
+        pathfinder = Pathfinder(door_manager)
+
+        for level in range(3):
+            print(f"Clearance {level}, cell -> control_room: {pathfinder.find_path('cell', 'control_room', level)}")
+        print(f"Clearance 2, next hop from hallway_a to control_room: {pathfinder.next_hop('hallway_a', 'control_room', 2)}")
+
+        print("\nLowering the control room door to Level 1...")
+        door_manager.set_door_level("hallway_b", "north", 1)
+        print(f"Clearance 1, cell -> control_room: {pathfinder.find_path('cell', 'control_room', 1)}")
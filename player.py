@@ -1,4 +1,6 @@
-import random
+from character import Attributes
+from items import ItemContainer
+from random_streams import get_stream
 
 # --- Constants for Body Part System ---
 BODY_PARTS = ['head', 'torso', 'left_arm', 'right_arm', 'left_leg', 'right_leg']
@@ -17,21 +19,43 @@ DEBUFF_VALUES = {
     'severe_injury': 3
 }
 
+# Body parts whose injuries weaken each attribute
+INJURY_ATTRIBUTE_PARTS = {
+    'strength': ('torso', 'left_arm', 'right_arm'),
+    'dexterity': ('left_arm', 'right_arm', 'left_leg', 'right_leg'),
+    'intelligence': ('head',)
+}
+# Body parts whose injuries hamper each action, counting double
+INJURY_ACTION_PARTS = {
+    'run': ('left_leg', 'right_leg'), # Legs heavily impact running
+    'attack': ('left_arm', 'right_arm') # Arms heavily impact attacking
+}
+INJURY_ACTION_WEIGHT = 2
+
+# (sanity below, intelligence modifier) from worst to mildest
+SANITY_EFFECTS = [(30, -2), (60, -1)]
+
 class Player:
+    __slots__ = ('location', 'inventory', 'role', 'name', 'clearance_level', 'level',
+                 'left_hand', 'right_hand', 'max_health', 'health', 'max_stamina', 'stamina',
+                 'max_morale', 'morale', 'max_sanity', 'sanity', 'attributes', 'body_parts',
+                 'knowledge', 'origin', 'personality', 'specialty', 'item_modifiers', '_modifiers')
+
     def __init__(self, start_location, name="D-9341", role="D-Class",
                  clearance_level=0, max_health=100, health=None,
                  max_stamina=100, stamina=None, max_morale=100, morale=None,
                  max_sanity=100, sanity=None,
-                 attributes=None, knowledge=None, origin="Unknown", personality="Determined", specialty="Survival"):
+                 attributes=None, knowledge=None, origin="Unknown", personality="Determined", specialty="Survival",
+                 item_registry=None, item_locations=None):
         
         self.location = start_location
-        self.inventory = [] # This is now the backpack
+        self.inventory = ItemContainer(item_registry, item_locations, ("player", "backpack")) # This is now the backpack
         self.role = role
         self.name = name
         self.clearance_level = clearance_level
         self.level = 1 # Added for debug display
         
-        self.left_hand = None
+        self.left_hand = None # ItemInstance or None
         self.right_hand = None
 
         self.max_health = max_health
@@ -45,11 +69,12 @@ class Player:
         self.max_sanity = max_sanity
         self.sanity = sanity if sanity is not None else self.max_sanity
 
-        self.attributes = attributes if attributes is not None else {
-            'strength': random.randint(3, 6),
-            'dexterity': random.randint(3, 6),
-            'intelligence': random.randint(3, 6)
-        }
+        rng = get_stream("npc")
+        self.attributes = Attributes(attributes if attributes is not None else {
+            'strength': rng.randint(3, 6),
+            'dexterity': rng.randint(3, 6),
+            'intelligence': rng.randint(3, 6)
+        })
         
         # Body Part Damage System
         self.body_parts = {part: 'uninjured' for part in BODY_PARTS}
@@ -62,6 +87,63 @@ class Player:
         self.personality = personality
         self.specialty = specialty
 
+        # {item_id: {attribute or action: bonus}} for items that change stats while held,
+        # from the optional "modifiers" key of items.json
+        self.item_modifiers = {}
+        # Cached modifier pipeline, rebuilt on the next stat read after something it depends on changed
+        self._modifiers = None
+
+    def invalidate_modifiers(self):
+        """
+        Drops the cached modifiers. apply_injury, change_morale, change_sanity and
+        the equip methods call this; anything else changing attributes, hands,
+        morale or sanity directly must call it too.
+        """
+        self._modifiers = None
+
+    def _build_modifiers(self):
+        """
+        Stacks injuries, morale, sanity and held items into
+        (injury debuffs, morale effect, effective attributes, action modifiers).
+        Injury debuffs are keyed by attribute and action names alike.
+        """
+        injuries = {}
+        for name, parts in INJURY_ATTRIBUTE_PARTS.items():
+            injuries[name] = sum(DEBUFF_VALUES.get(self.body_parts[part], 0) for part in parts)
+        for name, parts in INJURY_ACTION_PARTS.items():
+            injuries[name] = INJURY_ACTION_WEIGHT * sum(DEBUFF_VALUES.get(self.body_parts[part], 0) for part in parts)
+
+        if self.morale < 30:
+            morale_effect = -2 # Significant debuff
+        elif self.morale < 70:
+            morale_effect = -1 # Minor debuff
+        elif self.morale > 70:
+            morale_effect = 1 # Minor buff
+        else:
+            morale_effect = 0 # No significant effect
+        sanity_effect = next((effect for threshold, effect in SANITY_EFFECTS if self.sanity < threshold), 0)
+
+        item_bonuses = {}
+        for item in (self.left_hand, self.right_hand):
+            for name, bonus in (self.item_modifiers.get(item.item_id, {}) if item is not None else {}).items():
+                item_bonuses[name] = item_bonuses.get(name, 0) + bonus
+
+        attributes = {}
+        for name in INJURY_ATTRIBUTE_PARTS:
+            attributes[name] = self.attributes[name] - injuries[name] + morale_effect + item_bonuses.get(name, 0)
+        attributes['intelligence'] += sanity_effect
+        actions = {name: item_bonuses.get(name, 0) - injuries[name] for name in INJURY_ACTION_PARTS}
+        self._modifiers = (injuries, morale_effect, attributes, actions)
+        return self._modifiers
+
+    def get_effective_attribute(self, attribute):
+        """An attribute after injuries, morale, sanity (intelligence only) and held items."""
+        return (self._modifiers or self._build_modifiers())[2][attribute]
+
+    def get_action_modifier(self, action_type):
+        """Held-item bonuses minus injury debuffs for an action ('run', 'attack'), 0 for other actions."""
+        return (self._modifiers or self._build_modifiers())[3].get(action_type, 0)
+
     def get_description(self, debug=False):
         """Returns a string with the player's details, including stats."""
         details = [
@@ -78,7 +160,8 @@ class Player:
             f"\n  Hands:",
             f"    Left: {self.left_hand if self.left_hand else 'Empty'}",
             f"    Right: {self.right_hand if self.right_hand else 'Empty'}",
-            f"\n  Backpack: {self.inventory if self.inventory else 'Empty'}"
+            f"\n  Backpack: {', '.join(self.inventory.names()) if self.inventory else 'Empty'}",
+            f"  Carrying: {self.carried_weight():g} kg"
         ]
         
         if debug:
@@ -96,6 +179,23 @@ class Player:
 
         return "\n".join(details)
 
+    def set_hand(self, hand, item):
+        """
+        Puts an ItemInstance (or None) in the 'left' or 'right' hand, keeping
+        the modifiers and item locations up to date. Returns what the hand held.
+        """
+        attribute = f"{hand}_hand"
+        previous = getattr(self, attribute)
+        setattr(self, attribute, item)
+        self._modifiers = None
+        locations = self.inventory.locations
+        if locations is not None:
+            if previous is not None:
+                locations.forget(previous)
+            if item is not None:
+                locations.place(item, ("player", attribute))
+        return previous
+
     def equip_item(self, item_name, hand):
         """Moves an item from inventory to a hand."""
         if item_name not in self.inventory:
@@ -104,41 +204,58 @@ class Player:
         if hand == 'left':
             if self.left_hand is not None:
                 return "Your left hand is already full."
-            self.left_hand = item_name
-            self.inventory.remove(item_name)
+            self.set_hand('left', self.inventory.remove(item_name, 1))
             return f"You equipped '{item_name}' in your left hand."
         elif hand == 'right':
             if self.right_hand is not None:
                 return "Your right hand is already full."
-            self.right_hand = item_name
-            self.inventory.remove(item_name)
+            self.set_hand('right', self.inventory.remove(item_name, 1))
             return f"You equipped '{item_name}' in your right hand."
         else:
             return "You can only equip items in your 'left' or 'right' hand."
 
     def unequip_item(self, hand):
         """Moves an item from a hand to inventory."""
-        if hand == 'left':
-            if self.left_hand is None:
-                return "Your left hand is empty."
-            item_name = self.left_hand
-            self.inventory.append(item_name)
-            self.left_hand = None
-            return f"You moved '{item_name}' to your backpack."
-        elif hand == 'right':
-            if self.right_hand is None:
-                return "Your right hand is empty."
-            item_name = self.right_hand
-            self.inventory.append(item_name)
-            self.right_hand = None
-            return f"You moved '{item_name}' to your backpack."
-        else:
+        if hand not in ('left', 'right'):
             return "You can only unequip from your 'left' or 'right' hand."
+        if getattr(self, f"{hand}_hand") is None:
+            return f"Your {hand} hand is empty."
+        item = self.set_hand(hand, None)
+        self.inventory.add(item)
+        return f"You moved '{item.item_id}' to your backpack."
+
+    def hold_item(self, item):
+        """Picks up an ItemInstance into the free right hand, then the left, then the backpack. Returns where it went."""
+        if self.right_hand is None:
+            self.set_hand('right', item)
+            return 'right'
+        if self.left_hand is None:
+            self.set_hand('left', item)
+            return 'left'
+        self.inventory.add(item)
+        return 'backpack'
+
+    def release_item(self, key):
+        """
+        Lets go of an item (by item or instance id) from the hands first, then
+        the backpack, e.g. to drop it. Returns the instance, or None if not carried.
+        """
+        for hand in ('right', 'left'):
+            item = getattr(self, f"{hand}_hand")
+            if item is not None and key in (item.item_id, item.instance_id):
+                return self.set_hand(hand, None)
+        return self.inventory.remove(key, 1)
+
+    def carried_weight(self):
+        """Weight of the backpack and both hands."""
+        return self.inventory.weight + sum(item.weight for item in (self.left_hand, self.right_hand) if item is not None)
     
     def change_morale(self, amount):
         """Adjusts player morale within bounds."""
         old_morale = self.morale
         self.morale = max(0, min(self.max_morale, self.morale + amount))
+        if self.morale != old_morale:
+            self._modifiers = None
         if self.morale > old_morale:
             return f"Your morale improved by {self.morale - old_morale}!"
         elif self.morale < old_morale:
@@ -149,6 +266,8 @@ class Player:
         """Adjusts player sanity within bounds."""
         old_sanity = self.sanity
         self.sanity = max(0, min(self.max_sanity, self.sanity + amount))
+        if self.sanity != old_sanity:
+            self._modifiers = None
         if self.sanity > old_sanity:
             return f"Your sanity improved by {self.sanity - old_sanity}!"
         elif self.sanity < old_sanity:
@@ -156,17 +275,8 @@ class Player:
         return "" # No change
 
     def get_morale_effect(self, stat_type):
-        """Calculates a morale-based modifier for a given stat or action type."""
-        morale_threshold_low = 30
-        morale_threshold_mid = 70
-        
-        if self.morale < morale_threshold_low:
-            return -2 # Significant debuff
-        elif self.morale < morale_threshold_mid:
-            return -1 # Minor debuff
-        elif self.morale > morale_threshold_mid:
-            return 1 # Minor buff
-        return 0 # No significant effect
+        """Morale-based modifier for a given stat or action type (the same for all of them for now). Cached."""
+        return (self._modifiers or self._build_modifiers())[1]
 
     def learn_knowledge(self, knowledge_id):
         """Adds new knowledge to the player's repertoire."""
@@ -192,33 +302,14 @@ class Player:
             for state, level in DAMAGE_STATES.items():
                 if level == new_severity_level:
                     self.body_parts[part] = state
+                    self._modifiers = None
                     return f"Your {part} is now {state.replace('_', ' ')}."
         return f"Your {part} is already {self.body_parts[part].replace('_', ' ')} or worse."
 
     def get_debuff(self, attribute=None, action_type=None):
-        """Calculates total debuff from injuries for an attribute or action."""
-        total_debuff = 0
-        for part, status in self.body_parts.items():
-            if status == 'uninjured':
-                continue
-            
-            severity_value = DEBUFF_VALUES.get(status, 0)
-            
-            if attribute:
-                if attribute == 'strength' and ('arm' in part or 'torso' in part):
-                    total_debuff += severity_value
-                elif attribute == 'dexterity' and ('arm' in part or 'leg' in part):
-                    total_debuff += severity_value
-                elif attribute == 'intelligence' and 'head' in part:
-                    total_debuff += severity_value
-            
-            if action_type:
-                if action_type == 'run' and 'leg' in part:
-                    total_debuff += severity_value * 2 # Legs heavily impact running
-                elif action_type == 'attack' and 'arm' in part:
-                    total_debuff += severity_value * 2 # Arms heavily impact attacking
-        
-        return total_debuff
+        """Total debuff from injuries for an attribute and/or action. Cached, so cheap in combat loops."""
+        injuries = (self._modifiers or self._build_modifiers())[0]
+        return injuries.get(attribute, 0) + injuries.get(action_type, 0)
 
     def get_injury_status(self):
         """Returns a list of strings describing current injuries."""
@@ -0,0 +1,153 @@
+# reachability.py
+# Which rooms are connected at each clearance level, answered without walking
+# the map.
+
+from array import array
+from collections import deque
+
+
+class ReachabilityIndex:
+    """
+    Connected components of the exits of a RoomGraph, one set per clearance
+    level L holding every exit with door_level <= L, so "are these rooms
+    connected at clearance L?" is a comparison of two component labels.
+    A level is built on first use with union-find, then kept up to date as
+    doors change:
+    - a door opening to more clearances merges two components, relabelling
+      the smaller one;
+    - a door closing to some clearances searches outward from both of its
+      rooms at once. If the searches meet, nothing split; otherwise the side
+      that ran out of rooms first becomes a new component. Either way the
+      work is about the size of the smaller side, not of the map, so a
+      lockdown sealing hundreds of doors stays cheap.
+    Exits are treated as two-way. For maps where every exit has a matching
+    exit back (all maps generate_map and generate_grid_map build) the
+    answer is exact; otherwise a False is still always right, so it is
+    safe for rejecting impossible route queries early.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self._labels = {} # {level: array of component label per room}
+        self._members = {} # {level: {label: set(room_index)}}
+        self._next_label = {} # {level: first unused label}
+
+    def _level(self, clearance_level):
+        return min(max(clearance_level, 0), self.graph.max_door_level)
+
+    def _build(self, level):
+        graph = self.graph
+        n = len(graph)
+        parent = array('i', range(n))
+
+        def find(room_index):
+            root = room_index
+            while parent[root] != root:
+                root = parent[root]
+            while parent[room_index] != root: # Path compression
+                parent[room_index], room_index = root, parent[room_index]
+            return root
+
+        for e in range(len(graph.dest)):
+            if graph.door_level[e] <= level:
+                a, b = find(graph.source[e]), find(graph.dest[e])
+                if a != b:
+                    parent[b] = a
+        labels = array('i', [0]) * n
+        members = {}
+        for room_index in range(n):
+            root = find(room_index)
+            labels[room_index] = root
+            members.setdefault(root, set()).add(room_index)
+        self._labels[level] = labels
+        self._members[level] = members
+        self._next_label[level] = n
+
+    def _labels_at(self, level):
+        if level not in self._labels:
+            self._build(level)
+        return self._labels[level]
+
+    def component_of(self, room_index, clearance_level):
+        """Returns the component label of room_index at a clearance level."""
+        return self._labels_at(self._level(clearance_level))[room_index]
+
+    def connected(self, from_index, to_index, clearance_level):
+        labels = self._labels_at(self._level(clearance_level))
+        return labels[from_index] == labels[to_index]
+
+    def component_members(self, room_index, clearance_level):
+        """Returns the room indices connected to room_index at a clearance level (itself included)."""
+        level = self._level(clearance_level)
+        label = self._labels_at(level)[room_index]
+        return list(self._members[level][label])
+
+    def component_size(self, room_index, clearance_level):
+        level = self._level(clearance_level)
+        label = self._labels_at(level)[room_index]
+        return len(self._members[level][label])
+
+    def component_count(self, clearance_level):
+        level = self._level(clearance_level)
+        self._labels_at(level)
+        return len(self._members[level])
+
+    def _merge(self, level, a, b):
+        labels, members = self._labels[level], self._members[level]
+        label_a, label_b = labels[a], labels[b]
+        if label_a == label_b:
+            return
+        if len(members[label_a]) < len(members[label_b]):
+            label_a, label_b = label_b, label_a
+        moved = members.pop(label_b)
+        for room_index in moved:
+            labels[room_index] = label_a
+        members[label_a].update(moved)
+
+    def _two_way_neighbors(self, room_index, level):
+        graph = self.graph
+        rev_indptr, rev_edges = graph.incoming()
+        for e in range(graph.indptr[room_index], graph.indptr[room_index + 1]):
+            if graph.door_level[e] <= level:
+                yield graph.dest[e]
+        for i in range(rev_indptr[room_index], rev_indptr[room_index + 1]):
+            e = rev_edges[i]
+            if graph.door_level[e] <= level:
+                yield graph.source[e]
+
+    def _split_if_cut(self, level, a, b):
+        """After an exit between a and b closed at this level, splits off the side it cut, if any."""
+        labels, members = self._labels[level], self._members[level]
+        if labels[a] != labels[b]:
+            return
+        # Alternate one room at a time between the two searches until they meet or one runs out
+        seen = ({a}, {b})
+        queues = (deque([a]), deque([b]))
+        side = 0
+        while queues[0] and queues[1]:
+            room_index = queues[side].popleft()
+            for other in self._two_way_neighbors(room_index, level):
+                if other in seen[1 - side]:
+                    return # Still connected another way
+                if other not in seen[side]:
+                    seen[side].add(other)
+                    queues[side].append(other)
+            side = 1 - side
+        cut_off = seen[0] if not queues[0] else seen[1]
+        old_label = labels[a]
+        new_label = self._next_label[level]
+        self._next_label[level] += 1
+        for room_index in cut_off:
+            labels[room_index] = new_label
+        members[new_label] = cut_off
+        members[old_label].difference_update(cut_off)
+
+    def door_changed(self, edge, old_level, new_level):
+        """Updates the levels a door change affects. Call after the graph holds new_level."""
+        a, b = self.graph.source[edge], self.graph.dest[edge]
+        for level in list(self._labels):
+            if level > self.graph.max_door_level: # No longer looked up
+                del self._labels[level], self._members[level], self._next_label[level]
+            elif new_level <= level < old_level: # Opened to this level
+                self._merge(level, a, b)
+            elif old_level <= level < new_level: # Closed to this level
+                self._split_if_cut(level, a, b)
@@ -0,0 +1,180 @@
+# room_graph.py
+# Compressed sparse row (CSR) view of the map's exits, for systems that need to
+# walk the room graph many times per turn (batch NPC movement, pathfinding...).
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; callers fall back to the plain lists
+    np = None
+
+# Door level of an exit nobody can pass (a locked door or one under lockdown).
+# It is above every clearance and left out of max_door_level.
+SEALED_DOOR_LEVEL = 1 << 20
+
+
+def exit_destination_and_level(exit_info):
+    """
+    Normalizes an exit entry to a (destination, door_level) tuple.
+    exit_info can be a string (old format) or a dict (new format).
+    """
+    if isinstance(exit_info, str):
+        return exit_info, 0
+    return exit_info.get("destination"), exit_info.get("door_level", 0)
+
+
+class RoomRegistry:
+    """
+    Room ids interned to dense integers 0..n-1 in map order, once at load.
+    Managers built over the same registry (pass it as rooms=...) keep room
+    indices instead of id strings, so their hot loops index lists; ids are
+    only looked up where rooms come in or go out (commands, display, saves).
+    """
+    def __init__(self, room_ids=()):
+        self.room_ids = list(room_ids) # room index -> room id
+        self.index = {room_id: i for i, room_id in enumerate(self.room_ids)} # {room_id: room index}
+
+    def __len__(self):
+        return len(self.room_ids)
+
+    def __contains__(self, room_id):
+        return room_id in self.index
+
+    def get(self, room_id):
+        """Returns the index of a room id, or None if the room is unknown."""
+        return self.index.get(room_id)
+
+    def room_id(self, room_index):
+        return self.room_ids[room_index]
+
+    def indices(self, room_ids):
+        """Returns the indices of the known rooms among room_ids, unknown ones skipped."""
+        index = self.index
+        return [index[room_id] for room_id in room_ids if room_id in index]
+
+
+class RoomGraph:
+    """
+    CSR adjacency of a map. The topology is fixed once built; only door
+    levels can change, through set_door_level. Rooms are numbered 0..n-1 by
+    a RoomRegistry (map order unless one is shared in). The exits of room i are the
+    edges indptr[i]:indptr[i+1] of `dest` (destination room index),
+    `door_level` and `directions`.
+    """
+    def __init__(self, map_data, rooms=None):
+        self.rooms = rooms if rooms is not None else RoomRegistry(map_data)
+        self.room_ids = self.rooms.room_ids
+        self.index = self.rooms.index
+
+        indptr = [0]
+        source = []
+        dest = []
+        door_level = []
+        directions = []
+        for room_id, room in map_data.items(): # One pass in registry (map) order, so a WorldStore pages rooms in
+            for direction, exit_info in room.get("exits", {}).items():
+                destination, level = exit_destination_and_level(exit_info)
+                if destination not in self.index: # Skip exits leading nowhere
+                    continue
+                source.append(self.index[room_id])
+                dest.append(self.index[destination])
+                door_level.append(level)
+                directions.append(direction)
+            indptr.append(len(dest))
+
+        self.indptr = indptr
+        self.source = source
+        self.dest = dest
+        self.door_level = door_level
+        self.directions = directions
+        self._level_counts = {} # {door_level: number of exits}, to keep max_door_level cheap
+        for level in door_level:
+            self._level_counts[level] = self._level_counts.get(level, 0) + 1
+        self.max_door_level = max(door_level, default=0)
+        self._by_clearance = {} # {clearance_level: (indptr, dest)}
+        self._incoming = None # (rev_indptr, rev_edges), built on first use
+
+    def __len__(self):
+        return len(self.room_ids)
+
+    def neighbors(self, room_index):
+        """Returns the destination indices of every exit of a room."""
+        return self.dest[self.indptr[room_index]:self.indptr[room_index + 1]]
+
+    def edge_index(self, room_index, direction):
+        """Returns the edge index of a room's exit in a direction, or None."""
+        for e in range(self.indptr[room_index], self.indptr[room_index + 1]):
+            if self.directions[e] == direction:
+                return e
+        return None
+
+    def incoming(self):
+        """
+        Returns a reverse CSR pair (rev_indptr, rev_edges): the edges entering
+        room i are rev_edges[rev_indptr[i]:rev_indptr[i + 1]] (edge indices).
+        """
+        if self._incoming is None:
+            n = len(self.room_ids)
+            counts = [0] * (n + 1)
+            for d in self.dest:
+                counts[d + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            rev_indptr = counts[:]
+            rev_edges = [0] * len(self.dest)
+            fill = counts[:-1]
+            for room_index in range(n):
+                for e in range(self.indptr[room_index], self.indptr[room_index + 1]):
+                    d = self.dest[e]
+                    rev_edges[fill[d]] = e
+                    fill[d] += 1
+            self._incoming = (rev_indptr, rev_edges)
+        return self._incoming
+
+    def set_door_level(self, edge, door_level):
+        """Updates one edge's door level and drops the per-clearance views it changes."""
+        counts = self._level_counts
+        old_level = self.door_level[edge]
+        counts[old_level] -= 1
+        if not counts[old_level]:
+            del counts[old_level]
+        counts[door_level] = counts.get(door_level, 0) + 1
+        self.door_level[edge] = door_level
+        self.max_door_level = max((level for level in counts if level < SEALED_DOOR_LEVEL), default=0)
+        # Only clearances that could pass the door before but not now (or the reverse) see a different graph
+        low, high = sorted((old_level, door_level))
+        for level in [level for level in self._by_clearance if low <= level < high]:
+            del self._by_clearance[level]
+
+    def for_clearance(self, clearance_level):
+        """
+        Returns an (indptr, dest) CSR pair holding only the exits an entity
+        with clearance_level can open. Clearances above the highest door level
+        in the map all share the unfiltered graph.
+        Arrays are NumPy int arrays when NumPy is available, lists otherwise.
+        """
+        level = min(max(clearance_level, 0), self.max_door_level)
+        if level not in self._by_clearance:
+            indptr = [0]
+            dest = []
+            for i in range(len(self.room_ids)):
+                for e in range(self.indptr[i], self.indptr[i + 1]):
+                    if self.door_level[e] <= level:
+                        dest.append(self.dest[e])
+                indptr.append(len(dest))
+            if np is not None:
+                indptr = np.asarray(indptr, dtype=np.int64)
+                dest = np.asarray(dest, dtype=np.int32)
+            self._by_clearance[level] = (indptr, dest)
+        return self._by_clearance[level]
+
+
+if __name__ == "__main__":
+    from map_visualizer import load_map_data
+
+    map_data = load_map_data()
+    if map_data:
+        graph = RoomGraph(map_data)
+        print(f"{len(graph)} rooms, {len(graph.dest)} exits, max door level {graph.max_door_level}")
+        for level in range(graph.max_door_level + 1):
+            indptr, dest = graph.for_clearance(level)
+            print(f"Clearance {level}: {len(dest)} usable exits")
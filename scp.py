@@ -5,6 +5,14 @@ class SCP:
     Base class for all SCP entities.
     Provides common properties and placeholder methods for unique abilities.
     """
+    # Turns between on_turn_start/on_turn_end calls when woken by a TurnScheduler.
+    # None means the SCP has no timed behavior and is never scheduled.
+    wake_interval = None
+
+    # Event hooks whose base implementation does nothing. SCPManager only
+    # dispatches these to SCPs whose class overrides them.
+    passive_hooks = ("on_player_enter_room", "on_player_observe", "on_turn_start", "on_turn_end")
+
     def __init__(self, scp_id, name, object_class, initial_room):
         self.id = scp_id
         self.name = name
@@ -1,16 +1,33 @@
 # scp_manager.py
-import importlib
 import json
 from scp import SCP # Import the base SCP class
+from scps import get_scp_class
+from room_graph import RoomRegistry
+
+# Events that only concern the SCPs in one room, and the keyword argument holding that room
+ROOM_SCOPED_EVENTS = {"on_player_enter_room": "player_location"}
 
 class SCPManager:
-    def __init__(self, map_data):
+    def __init__(self, map_data, rooms=None):
         self.map_data = map_data
+        self.rooms = rooms if rooms is not None else RoomRegistry(map_data) # Shared with the DoorManager's graph in the game
         self._scps = {} # {scp_id: SCP_instance}
+        # Kept up to date by move_scp, breach_scp and contain_scp, so room queries only touch occupants
+        self._rooms = {} # {room_index: {scp_id: SCP_instance}}
+        self._room_of = {} # {scp_id: room_index}, None for SCPs in rooms missing from the map
+        self._display_locations = {} # {room_id: [marker, ...]}
+        self._markers = {} # {scp_id: marker}
+        self._containment_rooms = {} # {scp_id: room_index} where each SCP was loaded
+        self._breached = {} # {scp_id: SCP_instance} for SCPs out of containment
+        # Hook registry, so trigger_event only reaches SCPs that handle the event
+        self._subscribers = {} # {event_name: {scp_id: SCP_instance}}
+        self._build_hook_registry()
 
     def load_scps_from_definitions(self, definitions_file):
         """
         Loads SCP definitions from a JSON file and instantiates SCP objects.
+        'class_name' is looked up in the scps package registry (scps/registry.json);
+        only the modules of classes that are actually referenced get imported.
         The JSON should map scp_id to a dictionary containing 'class_name', 'name',
         'object_class', 'initial_room', and other properties.
         Example:
@@ -32,6 +49,9 @@ class SCPManager:
             print(f"Error: SCP definitions file '{definitions_file}' not found.")
             return
 
+        # Containment rooms of a generated map (see map_analytics.secure_map) take SCPs whose room is missing
+        free_containment = [room_id for room_id, room in self.map_data.items()
+                            if room.get("containment") and self.rooms.get(room_id) not in self._rooms]
         for scp_id, def_data in scp_defs.items():
             class_name = def_data.get("class_name")
             if not class_name:
@@ -39,19 +59,12 @@ class SCPManager:
                 continue
 
             try:
-                # Dynamically import the SCP class. Assumes classes are in 'scps' subdirectory
-                # For now, let's assume specific SCP classes are defined in this file for simplicity,
-                # or in separate modules that can be imported directly.
-                # A more robust system would import from a specific scps package.
-                # For this example, let's assume SCP173, etc. are defined in scp.py or individual files.
-                # If they are in the same file, we can just use globals().
-                # If they are in 'scp_classes' module for example:
-                # module = importlib.import_module(f"scp_classes.{class_name.lower()}")
-                # scp_class = getattr(module, class_name)
-                
-                # As a placeholder, create a base SCP instance
-                # This will be replaced once specific SCP classes are created
-                scp_instance = SCP(
+                # Behavior classes live in the scps package and are imported on first reference
+                scp_class = get_scp_class(class_name)
+                if scp_class is None:
+                    print(f"Warning: No SCP class registered as '{class_name}' for {scp_id}. Using the base SCP.")
+                    scp_class = SCP
+                scp_instance = scp_class(
                     scp_id=scp_id,
                     name=def_data.get("name", scp_id),
                     object_class=def_data.get("object_class", "Euclid"),
@@ -62,51 +75,183 @@ class SCPManager:
                 
                 # Check if the room exists in map_data
                 if scp_instance.current_room not in self.map_data:
-                    print(f"Warning: SCP {scp_id} defined with initial_room '{scp_instance.current_room}' which does not exist in map data.")
+                    if free_containment:
+                        scp_instance.current_room = free_containment.pop(0)
+                    else:
+                        print(f"Warning: SCP {scp_id} defined with initial_room '{scp_instance.current_room}' which does not exist in map data.")
 
-
-                self._scps[scp_id] = scp_instance
+                self.add_scp(scp_instance)
                 print(f"Loaded {scp_instance.name} ({scp_id}) into {scp_instance.current_room}.")
 
             except Exception as e:
                 print(f"Error loading SCP {scp_id} (class: {class_name}): {e}")
 
+    def add_scp(self, scp_instance):
+        """Registers an SCP instance (replacing any SCP with the same id) in its current room."""
+        scp_id = scp_instance.id
+        if scp_id in self._scps:
+            self._remove_from_room(self._scps[scp_id])
+            for subscribers in self._subscribers.values():
+                subscribers.pop(scp_id, None)
+        self._scps[scp_id] = scp_instance
+        self._markers[scp_id] = scp_id.split('_')[1] if '_' in scp_id else scp_id # e.g., '173' from 'scp_173'
+        self._add_to_room(scp_instance)
+        self._containment_rooms[scp_id] = self._room_of[scp_id]
+        self._track_containment(scp_instance)
+        for event_name, subscribers in self._subscribers.items():
+            if self._handles(scp_instance, event_name):
+                subscribers[scp_id] = scp_instance
+
+    def _handles(self, scp, event_name):
+        """True if dispatching event_name to this SCP could do anything."""
+        if not callable(getattr(scp, event_name, None)):
+            return False
+        if event_name in scp.passive_hooks and event_name not in vars(scp):
+            return getattr(type(scp), event_name) is not getattr(SCP, event_name)
+        return True
+
+    def _subscribe(self, event_name):
+        subscribers = {scp_id: scp for scp_id, scp in self._scps.items() if self._handles(scp, event_name)}
+        self._subscribers[event_name] = subscribers
+        return subscribers
+
+    def _build_hook_registry(self):
+        """Works out which SCPs handle each event hook of the base SCP class."""
+        self._subscribers.clear()
+        for event_name in dir(SCP):
+            if event_name.startswith("on_"):
+                self._subscribe(event_name)
+
     def get_scp_by_id(self, scp_id):
         return self._scps.get(scp_id)
 
+    def _add_to_room(self, scp):
+        room_index = self._room_of[scp.id] = self.rooms.get(scp.current_room)
+        if room_index is not None:
+            self._rooms.setdefault(room_index, {})[scp.id] = scp
+        self._display_locations.setdefault(scp.current_room, []).append(self._markers[scp.id])
+
+    def _remove_from_room(self, scp):
+        room_index = self._room_of.pop(scp.id)
+        if room_index is not None:
+            occupants = self._rooms[room_index]
+            del occupants[scp.id]
+            if not occupants:
+                del self._rooms[room_index]
+        markers = self._display_locations[scp.current_room]
+        markers.remove(self._markers[scp.id])
+        if not markers:
+            del self._display_locations[scp.current_room]
+
+    def _relocate(self, scp, room_index):
+        self._remove_from_room(scp)
+        scp.current_room = self.rooms.room_ids[room_index]
+        self._add_to_room(scp)
+
+    def _track_containment(self, scp):
+        if scp.is_contained:
+            self._breached.pop(scp.id, None)
+        else:
+            self._breached[scp.id] = scp
+
     def get_scps_in_room(self, room_id):
-        return [scp for scp in self._scps.values() if scp.current_room == room_id]
+        return list(self._rooms.get(self.rooms.get(room_id), {}).values())
+
+    def get_breached_scps(self):
+        return list(self._breached.values())
 
     def move_scp(self, scp_id, target_room_id):
+        """Moves an SCP to another room. SCPs must be moved through here to keep the room index right."""
         scp = self._scps.get(scp_id)
-        if scp and target_room_id in self.map_data:
+        room_index = self.rooms.get(target_room_id)
+        if scp and room_index is not None:
             print(f"Moving {scp.name} from {scp.current_room} to {target_room_id}")
-            scp.current_room = target_room_id
+            self._relocate(scp, room_index)
             return True
         print(f"Failed to move SCP {scp_id} to {target_room_id}.")
         return False
 
+    def breach_scp(self, scp_id, game_state=None, target_room_id=None):
+        """Breaks an SCP out of containment, optionally straight into another room."""
+        scp = self._scps.get(scp_id)
+        if scp is None:
+            print(f"Warning: SCP with ID {scp_id} not found for breach.")
+            return False
+        scp.on_breach(game_state)
+        self._track_containment(scp)
+        room_index = self.rooms.get(target_room_id) if target_room_id is not None else None
+        if room_index is not None:
+            self._relocate(scp, room_index)
+        return True
+
+    def contain_scp(self, scp_id, game_state=None):
+        """Re-contains an SCP and puts it back in the room it was loaded into."""
+        scp = self._scps.get(scp_id)
+        if scp is None:
+            print(f"Warning: SCP with ID {scp_id} not found for containment.")
+            return False
+        scp.on_contain(game_state)
+        self._track_containment(scp)
+        containment_room = self._containment_rooms[scp_id]
+        if containment_room is not None and self._room_of[scp_id] != containment_room:
+            self._relocate(scp, containment_room)
+        return True
+
     def trigger_event(self, event_name, **kwargs):
-        """Dispatches an event to all active SCPs."""
-        for scp in self._scps.values():
-            event_method = getattr(scp, event_name, None)
-            if callable(event_method):
-                event_method(**kwargs)
+        """
+        Dispatches an event to the SCPs that handle it. Room-scoped events
+        (ROOM_SCOPED_EVENTS) only reach the SCPs in the event's room.
+        """
+        subscribers = self._subscribers.get(event_name)
+        if subscribers is None: # Not a base SCP hook; work out who handles it once
+            subscribers = self._subscribe(event_name)
+        room_arg = ROOM_SCOPED_EVENTS.get(event_name)
+        if room_arg is not None and room_arg in kwargs:
+            occupants = self._rooms.get(self.rooms.get(kwargs[room_arg]), {})
+            targets = [scp for scp_id, scp in occupants.items() if scp_id in subscribers]
+        else:
+            targets = list(subscribers.values())
+        for scp in targets:
+            getattr(scp, event_name)(**kwargs)
+        if event_name in ("on_breach", "on_contain"):
+            for scp in targets:
+                self._track_containment(scp)
+
+    def update_observation(self, visibility, observer_room_ids, game_state=None):
+        """
+        Tells every SCP that handles on_player_observe whether anyone in
+        observer_room_ids can see it, using a visibility.Visibility over
+        the same rooms.
+        """
+        observers = visibility.observer_masks(self.rooms.indices(observer_room_ids))
+        for scp in list(self._subscribers["on_player_observe"].values()):
+            room_index = self._room_of[scp.id]
+            observed = room_index is not None and visibility.is_observed(room_index, observers)
+            scp.on_player_observe(player_is_observing=observed, game_state=game_state)
+
+    def schedule_turn_hooks(self, scheduler):
+        """Registers every SCP that has a wake_interval on a TurnScheduler."""
+        for scp_id, scp in self._scps.items():
+            if scp.wake_interval is not None:
+                scheduler.schedule_in(("scp", scp_id), scp.wake_interval)
+
+    def wake_scp(self, scp_id, scheduler, game_state):
+        """Runs the turn hooks of an SCP woken by the scheduler and books its next wake-up."""
+        scp = self._scps.get(scp_id)
+        if scp is None:
+            return
+        scp.on_turn_start(game_state)
+        scp.on_turn_end(game_state)
+        if scp.wake_interval is not None:
+            scheduler.schedule_in(("scp", scp_id), scp.wake_interval)
 
     def get_scp_locations_for_display(self):
         """
         Returns a dictionary mapping room_id to a list of SCP IDs or markers for display.
         Example: {"room_id": ["SCP-173", "SCP-049"]} or {"room_id": ["173", "049"]}
+        The marker lists are maintained incrementally and shared; treat them as read-only.
         """
-        display_locations = {}
-        for scp_id, scp_instance in self._scps.items():
-            room_id = scp_instance.current_room
-            marker = scp_instance.id.split('_')[1] # e.g., '173' from 'scp_173'
-            
-            if room_id not in display_locations:
-                display_locations[room_id] = []
-            display_locations[room_id].append(marker)
-        return display_locations
+        return dict(self._display_locations)
 
 
 # For testing purposes (will be integrated into main.py later)
@@ -0,0 +1,35 @@
+# scps/__init__.py
+# Behavior classes for individual SCPs, one module per SCP. registry.json maps
+# each class name to its module, so a module is only imported once an SCP
+# definition asks for its class.
+
+import importlib
+import json
+import os
+
+REGISTRY_FILE = os.path.join(os.path.dirname(__file__), "registry.json")
+
+_registry = None # {class_name: module_name}, read on first use
+_classes = {} # {class_name: class}, for modules imported so far
+
+def load_registry():
+    """Returns the {class_name: module_name} manifest, reading it once."""
+    global _registry
+    if _registry is None:
+        with open(REGISTRY_FILE, 'r') as f:
+            _registry = json.load(f)
+    return _registry
+
+def get_scp_class(class_name):
+    """
+    Returns the SCP class registered under class_name, importing its module
+    on first use, or None if the manifest has no such class.
+    """
+    scp_class = _classes.get(class_name)
+    if scp_class is None:
+        module_name = load_registry().get(class_name)
+        if module_name is None:
+            return None
+        module = importlib.import_module(f"{__name__}.{module_name}")
+        scp_class = _classes[class_name] = getattr(module, class_name)
+    return scp_class
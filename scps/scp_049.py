@@ -0,0 +1,7 @@
+# scps/scp_049.py
+from scp import SCP
+
+class SCP049(SCP):
+    """The Plague Doctor: speaks to anyone who comes near."""
+    def on_player_enter_room(self, player_location, game_state):
+        print(f"{self.name} turns towards you. \"I sense the Pestilence in you.\"")
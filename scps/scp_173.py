@@ -0,0 +1,14 @@
+# scps/scp_173.py
+from scp import SCP
+
+class SCP173(SCP):
+    """The Sculpture: can only move while nobody is looking at it."""
+    def __init__(self, scp_id, name, object_class, initial_room):
+        super().__init__(scp_id, name, object_class, initial_room)
+        self.is_observed = False
+
+    def on_player_enter_room(self, player_location, game_state):
+        print(f"{self.name} stands motionless in the corner. Don't blink.")
+
+    def on_player_observe(self, player_is_observing, game_state):
+        self.is_observed = player_is_observing
@@ -0,0 +1,155 @@
+# sound_field.py
+# Noise spreading through the facility from SCPs, combat, running..., so NPCs
+# can react to it and room descriptions can say how loud things are.
+
+import heapq
+from collections import OrderedDict
+
+# Extra loss through a door per door level: heavier security doors muffle more
+DOOR_MUFFLING = 1
+
+# (minimum loudness, wording) from loudest to faintest, for describe_sounds
+LOUDNESS_WORDS = [
+    (8, "deafening"),
+    (5, "loud"),
+    (2, "nearby"),
+    (1, "faint"),
+]
+
+
+def sound_levels(graph, start_index, volume):
+    """
+    Bounded Dijkstra from a noise source. Passing through an exit costs 1
+    plus DOOR_MUFFLING per door level. Returns {room_index: loudness} for
+    every room the sound reaches with loudness above 0.
+    """
+    indptr, dest, door_level = graph.indptr, graph.dest, graph.door_level
+    loss = {start_index: 0}
+    heap = [(0, start_index)]
+    while heap:
+        cost, room_index = heapq.heappop(heap)
+        if cost > loss[room_index]:
+            continue
+        for e in range(indptr[room_index], indptr[room_index + 1]):
+            new_cost = cost + 1 + door_level[e] * DOOR_MUFFLING
+            other = dest[e]
+            if new_cost < volume and new_cost < loss.get(other, volume):
+                loss[other] = new_cost
+                heapq.heappush(heap, (new_cost, other))
+    return {room_index: volume - cost for room_index, cost in loss.items()}
+
+
+class SoundField:
+    """
+    Total noise per room from every active source, kept up to date
+    incrementally: adding, moving or removing a source only subtracts its
+    old levels and adds its new ones, so noise_at is a dict lookup.
+    Levels of each (room, volume) are cached, least recently used first, so
+    sources pacing between a few rooms don't rerun Dijkstra. Door changes
+    drop cached levels around the door and refresh the sources they reach.
+    """
+    def __init__(self, door_manager, max_cached_fields=1024):
+        self.graph = door_manager.graph
+        self.max_cached_fields = max_cached_fields
+        self._sources = {} # {source_id: (room_index, volume, label, levels)}
+        self._noise = {} # {room_index: summed loudness}
+        self._fields = OrderedDict() # {(room_index, volume): {room_index: loudness}}
+        door_manager.add_door_listener(self._on_door_changed)
+
+    def _levels(self, room_index, volume):
+        key = (room_index, volume)
+        levels = self._fields.get(key)
+        if levels is None:
+            levels = self._fields[key] = sound_levels(self.graph, room_index, volume)
+            if len(self._fields) > self.max_cached_fields:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(key)
+        return levels
+
+    def _apply(self, levels, sign):
+        noise = self._noise
+        for room_index, loudness in levels.items():
+            total = noise.get(room_index, 0) + sign * loudness
+            if total:
+                noise[room_index] = total
+            else:
+                del noise[room_index]
+
+    def set_source(self, source_id, room_id, volume, label="noise"):
+        """
+        Adds a noise source, or moves/changes an existing one. volume is the
+        loudness in its own room; it drops by at least 1 per room away.
+        label names the sound in describe_sounds ("scraping", "gunfire"...).
+        """
+        room_index = self.graph.index.get(room_id)
+        if room_index is None:
+            print(f"Warning: Attempted to place a noise source in non-existent room: {room_id}")
+            return False
+        self.remove_source(source_id)
+        levels = self._levels(room_index, volume)
+        self._sources[source_id] = (room_index, volume, label, levels)
+        self._apply(levels, 1)
+        return True
+
+    def move_source(self, source_id, room_id):
+        source = self._sources.get(source_id)
+        if source is None:
+            return False
+        return self.set_source(source_id, room_id, source[1], source[2])
+
+    def remove_source(self, source_id):
+        source = self._sources.pop(source_id, None)
+        if source is None:
+            return False
+        self._apply(source[3], -1)
+        return True
+
+    def _on_door_changed(self, room_index, direction, old_level, new_level):
+        # Only fields that reach the door's room can route sound through it
+        for key in [key for key, levels in self._fields.items() if room_index in levels]:
+            del self._fields[key]
+        for source_id, (source_room, volume, label, levels) in list(self._sources.items()):
+            if room_index in levels:
+                self.set_source(source_id, self.graph.room_ids[source_room], volume, label)
+
+    def noise_at(self, room_id):
+        """Total loudness heard in a room (0 for silence)."""
+        room_index = self.graph.index.get(room_id)
+        return self._noise.get(room_index, 0) if room_index is not None else 0
+
+    def sounds_at(self, room_id):
+        """Returns [(label, loudness), ...] for every source heard in a room, loudest first."""
+        room_index = self.graph.index.get(room_id)
+        if room_index is None or room_index not in self._noise:
+            return []
+        heard = [(label, levels[room_index]) for _, _, label, levels in self._sources.values() if room_index in levels]
+        return sorted(heard, key=lambda sound: -sound[1])
+
+    def describe_sounds(self, room_id):
+        """A sentence for the room description, e.g. "You hear loud scraping.", or "" for silence."""
+        parts = []
+        for label, loudness in self.sounds_at(room_id):
+            word = next(word for threshold, word in LOUDNESS_WORDS if loudness >= threshold)
+            parts.append(f"{word} {label}")
+        if not parts:
+            return ""
+        return f"You hear {', '.join(parts)}."
+
+
+if __name__ == "__main__":
+    from door_manager import DoorManager
+    from map_visualizer import load_map_data
+
+    map_data = load_map_data()
+    if map_data:
+        door_manager = DoorManager(map_data)
+        sound_field = SoundField(door_manager)
+        sound_field.set_source("scp_173", "hallway_b", 5, "scraping")
+        for room_id in map_data:
+            print(f"{room_id}: noise {sound_field.noise_at(room_id)}. {sound_field.describe_sounds(room_id)}")
+
+        print("\nSCP-173 moves to the storage room...")
+        sound_field.move_source("scp_173", "storage_room")
+        for room_id in map_data:
+            print(f"{room_id}: noise {sound_field.noise_at(room_id)}. {sound_field.describe_sounds(room_id)}")
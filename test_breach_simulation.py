@@ -0,0 +1,67 @@
+# test_breach_simulation.py
+
+from breach_simulation import BreachSimulator
+from door_manager import DoorManager, DOOR_LOCKDOWN
+from map_visualizer import load_map_data
+
+def run_breach_tests():
+    print("--- Running Breach Simulation Tests ---")
+
+    map_data = load_map_data()
+    if not map_data:
+        print("Error: Could not load map data for breach tests.")
+        return
+
+    door_manager = DoorManager(map_data)
+    simulator = BreachSimulator(door_manager)
+    simulator.start_breach("scp_173", "hallway_b", 1) # Can force L0 and L1 doors, not the L2 control room door
+    simulator.lockdown("storage_room")
+    shared_lockdown = (door_manager.get_door_state("storage_room", "west") == DOOR_LOCKDOWN
+                       and "#" in simulator.get_breach_locations_for_display()["storage_room"])
+
+    simulator.tick()
+    after_one = set(simulator.get_breach_rooms("scp_173"))
+    for _ in range(5):
+        simulator.tick()
+    settled = set(simulator.get_breach_rooms("scp_173"))
+
+    simulator.lift_lockdown("storage_room")
+    simulator.tick()
+    after_lift = simulator.is_threatened("storage_room")
+
+    door_manager.set_door_level("hallway_b", "north", 1)
+    simulator.tick()
+    after_door = simulator.is_threatened("control_room")
+
+    simulator.end_breach("scp_173")
+
+    # Lockdowns started on the DoorManager directly hold breaches back too
+    door_manager.start_lockdown(["hallway_a"], min_door_level=0)
+    simulator.start_breach("scp_049", "storage_room", 2)
+    for _ in range(3):
+        simulator.tick()
+    held_back = set(simulator.get_breach_rooms("scp_049")) == {"storage_room", "hallway_b", "control_room"}
+    door_manager.lift_lockdown(["hallway_a"])
+    simulator.tick()
+    released = simulator.is_threatened("hallway_a")
+    simulator.end_breach("scp_049")
+
+    test_cases = [
+        ("A breach spreads one door per turn", after_one == {"hallway_b", "hallway_a"}),
+        ("A breach stops at higher doors and lockdowns", settled == {"hallway_b", "hallway_a", "cell"}),
+        ("Lifting a lockdown lets the breach in", after_lift),
+        ("Lowering a door lets the breach through", after_door),
+        ("Breach lockdowns are DoorManager lockdowns", shared_lockdown),
+        ("DoorManager lockdowns stop breaches until lifted", held_back and released),
+        ("Ending a breach clears its threat", simulator.get_breach_locations_for_display() == {}),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Breach Simulation Tests Complete ---")
+
+if __name__ == "__main__":
+    run_breach_tests()
@@ -0,0 +1,117 @@
+# test_combat.py
+
+import contextlib
+import io
+
+import actions
+import combat
+from combat import CombatEngine, load_combat_rules
+from character import generate_character
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+from player import Player
+from scp import SCP
+
+def run_combat_tests():
+    print("--- Running Combat Engine Tests ---")
+
+    rules = load_combat_rules()
+
+    # Sure hits and fixed damage make rounds predictable
+    sure_rules = dict(rules, hit_chance={"base": 1.0, "per_dexterity": 0.0, "min": 1.0, "max": 1.0})
+    sure_rules["fighters"] = dict(rules["fighters"], guard={"health": 100, "damage": [40, 40]},
+                                  keter={"health": 500, "damage": [10, 10]})
+    engine = CombatEngine(sure_rules, seed=5)
+    player = Player("cell", attributes={"strength": 5, "dexterity": 5, "intelligence": 5})
+    player.apply_injury('left_arm', 'minor_injury') # Attack modifier -2: deals 10 less damage per hit
+    guard = generate_character("Guard", seed=1)
+    guard_health = guard.health
+    engine.add_player(player)
+    engine.add_character("guard", guard, "cell")
+    first = engine.resolve_tick()
+    duplicate_rejected = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        duplicate_rejected = not engine.add_player(player)
+
+    # Many encounters at once: same-side fighters never hit each other
+    breach = CombatEngine(sure_rules, seed=9)
+    for room in range(50):
+        for i in range(3):
+            breach.add_character(f"guard_{room}_{i}", generate_character("Guard", seed=room * 3 + i), f"room_{room}")
+        breach.add_scp(SCP(f"scp_{room}", "SCP", "Keter", f"room_{room}"))
+    tick = breach.resolve_tick()
+    per_room = all(tick["damage"].get(f"scp_{room}") == 120 for room in range(50))
+    guards_hit = sum(1 for fighter_id in tick["damage"] if fighter_id.startswith("guard"))
+    lone = CombatEngine(sure_rules, seed=9)
+    lone.add_character("guard_a", generate_character("Guard", seed=1), "room_x")
+    lone.add_character("guard_b", generate_character("Guard", seed=2), "room_x")
+    quiet = lone.resolve_tick()["hits"] == 0 and lone.active_encounters() == []
+
+    rounds = 0
+    while breach.active_encounters() and rounds < 50:
+        breach.resolve_tick()
+        rounds += 1
+    removed = breach.end_encounter("room_0")
+
+    # The pure-Python fallback resolves the same rules
+    fallback = CombatEngine(sure_rules, seed=3)
+    fallback.add_scp(SCP("scp_a", "SCP", "Keter", "room_y"))
+    fallback.add_character("guard", generate_character("Guard", seed=4), "room_y")
+    numpy_module, combat.np = combat.np, None
+    try:
+        fallback_tick = fallback.resolve_tick()
+    finally:
+        combat.np = numpy_module
+
+    # Player attacks all go through one engine, which reads combat_rules.json once
+    attacker = Player("cell", health=10000, attributes={"strength": 5, "dexterity": 5, "intelligence": 5})
+    sparring_guard = generate_character("Guard", seed=2)
+    actions.attack(attacker, [sparring_guard])
+    shared_engine = actions.combat_engine()
+    actions.attack(attacker, [sparring_guard])
+    engine_reused = actions.combat_engine() is shared_engine and not shared_engine._ids
+
+    # A guard beaten down is marked defeated: it stays where it fell and is no longer in the room's NPCs
+    arena, _ = generate_grid_map(3, 3)
+    arena_npcs = NPCManager(arena)
+    with contextlib.redirect_stdout(io.StringIO()):
+        doomed_id = arena_npcs.spawn_npc("Guard", "room_1_1")
+    doomed = arena_npcs.get_character(doomed_id)
+    doomed.health = 1
+    fighter = Player("room_1_1", health=10000, attributes={"strength": 5, "dexterity": 5, "intelligence": 5})
+    for _ in range(50):
+        message, _ = actions.attack(fighter, [info["character"] for info in arena_npcs.get_npcs_in_room("room_1_1")])
+        if doomed.health <= 0:
+            break
+    fallen = arena_npcs.defeat_fallen_npcs("room_1_1")
+    arena_npcs.tick_all()
+    stays_down = (fallen == [doomed_id] and arena_npcs.is_defeated(doomed_id)
+                  and arena_npcs.get_npc_room(doomed_id) == "room_1_1" and not arena_npcs.get_npcs_in_room("room_1_1"))
+    no_second_fight = actions.attack(fighter, [doomed])[0].startswith("You swing wildly")
+
+    test_cases = [
+        ("The attack modifier lowers damage dealt, not taken",
+         0 <= first["damage"].get("guard", 0) <= 5 and first["damage"].get("player") == 40),
+        ("Damage is written back to holders", guard_health - guard.health == first["damage"].get("guard", 0) and player.health == 60),
+        ("Heavy hits injure the player", len(first["injuries"]) == 1),
+        ("A fighter can only be in one encounter", duplicate_rejected),
+        ("Every encounter is resolved in the same tick", per_room and guards_hit == 50),
+        ("Fighters on one side don't fight each other", quiet),
+        ("Encounters end when one side is left", rounds < 50 and breach.active_encounters() == []),
+        ("end_encounter removes its fighters", removed == 4 and breach.get_health("scp_0") is None and breach.get_health("scp_1") is not None),
+        ("Pure-Python fallback resolves the same rules", fallback_tick["damage"] == {"scp_a": 40, "guard": 10}),
+        ("Attacks reuse one engine and leave no fighters behind", engine_reused),
+        ("A beaten guard is told to collapse", "collapses" in message),
+        ("Defeated NPCs stay down and leave the room's NPC list", stays_down),
+        ("Defeated guards can't be attacked again", no_second_fight),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Combat Engine Tests Complete ---")
+
+if __name__ == "__main__":
+    run_combat_tests()
@@ -1,7 +1,30 @@
 # test_door_system.py
 
+import random
+from collections import deque
+
 from map_visualizer import load_map_data
-from door_manager import DoorManager
+from map_generator import generate_grid_map
+from door_manager import DoorManager, DOOR_LOCKED, DOOR_OPEN
+from navigation import move
+from pathfinding import Pathfinder
+from player import Player
+from room_graph import RoomGraph, RoomRegistry
+from scp import SCP
+from scp_manager import SCPManager
+
+def reachable_by_search(door_manager, clearance_level, start_room_id):
+    """Rooms reachable from start_room_id, found by walking the door table (the slow, obvious way)."""
+    seen = {start_room_id}
+    queue = deque([start_room_id])
+    while queue:
+        room_id = queue.popleft()
+        for direction in door_manager.map_data[room_id]["exits"]:
+            destination = door_manager.get_destination(room_id, direction)
+            if door_manager.check_access(clearance_level, room_id, direction) and destination not in seen:
+                seen.add(destination)
+                queue.append(destination)
+    return seen
 
 def run_door_tests():
     print("--- Running Door Management System Tests ---")
@@ -50,6 +73,95 @@ def run_door_tests():
         if status_access == "FAIL" or status_dest == "FAIL":
             print(f"  !!! TEST FAILED: {desc}")
 
+    # Door changes update the compiled door table
+    door_manager.set_door_level("hallway_b", "north", 1)
+    passed = door_manager.check_access(1, "hallway_b", "north") and door_manager.get_door_level("hallway_b", "north") == 1
+    print(f"\nTest: Lowered door is reflected in access checks [{'PASS' if passed else 'FAIL'}]")
+    if not passed:
+        print("  !!! TEST FAILED: Lowered door is reflected in access checks")
+
+    # Runtime door states
+    door_manager.lock_door("cell", "east")
+    player = Player("cell", clearance_level=3)
+    locked_message = move(player, "east", map_data, door_manager)[1]
+    locked_both_sides = door_manager.get_door_state("hallway_a", "west") == DOOR_LOCKED
+    cell_cut_off = not door_manager.can_reach(5, "hallway_b", "cell")
+    door_manager.unlock_door("hallway_a", "west")
+    unlocked = door_manager.check_access(1, "cell", "east") and door_manager.can_reach(1, "hallway_b", "cell")
+    door_manager.destroy_door("hallway_b", "north")
+    destroyed = door_manager.check_access(0, "hallway_b", "north") and door_manager.get_door_level("hallway_b", "north") == 1
+
+    # A lockdown splits reachability and lifting it restores it; cached routes follow
+    grid_map, _ = generate_grid_map(12, 12, door_level_weights={0: 3, 1: 1})
+    grid_doors = DoorManager(grid_map)
+    pathfinder = Pathfinder(grid_doors)
+    route_before = pathfinder.find_path("room_0_0", "room_11_11", 1)
+    components_before = grid_doors.reachability.component_count(1)
+    sealed = grid_doors.start_lockdown(min_door_level=0)
+    during = not grid_doors.can_reach(1, "room_0_0", "room_11_11") and pathfinder.find_path("room_0_0", "room_11_11", 1) is None
+    reopened = grid_doors.lift_lockdown()
+    after = (reopened == sealed and grid_doors.reachability.component_count(1) == components_before
+             and pathfinder.find_path("room_0_0", "room_11_11", 1) == route_before)
+
+    # Random lock/unlock/destroy sequences agree with a plain search
+    rng = random.Random(7)
+    doors = [(room_id, direction) for room_id in grid_map for direction in grid_map[room_id]["exits"]]
+    agrees = True
+    for _ in range(60):
+        room_id, direction = rng.choice(doors)
+        grid_doors.set_door_state(room_id, direction, rng.choice([DOOR_LOCKED, DOOR_LOCKED, DOOR_OPEN, "destroyed"]))
+        start_room_id = rng.choice(list(grid_map))
+        for clearance_level in (0, 1):
+            expected = reachable_by_search(grid_doors, clearance_level, start_room_id)
+            agrees = agrees and set(grid_doors.get_reachable_rooms(clearance_level, start_room_id)) == expected
+
+    # Managers sharing one registry hold the same room indices; listeners get indices, not ids
+    rooms = RoomRegistry(grid_map)
+    shared_doors = DoorManager(grid_map, rooms=rooms)
+    scp_manager = SCPManager(grid_map, rooms=rooms)
+    scp_manager.add_scp(SCP("scp_901", "SCP-901", "Euclid", "room_3_4"))
+    heard = []
+    shared_doors.add_door_listener(lambda *change: heard.append(change[:2]))
+    shared_doors.add_door_state_listener(lambda *change: heard.append(change[:2]))
+    shared_doors.lock_door("room_3_4", "east")
+    room_index = rooms.get("room_3_4")
+    shared = (shared_doors.graph.rooms is rooms and scp_manager._room_of["scp_901"] == room_index
+              and shared_doors.exit_at(room_index, "east") == shared_doors.get_exit("room_3_4", "east"))
+    sealed_rooms = shared_doors.start_lockdown(["room_0_0", "no_such_room"], min_door_level=0)
+
+    # Door levels change on both sides; cached clearance views are only dropped where they differ
+    level_doors = DoorManager(generate_grid_map(6, 6, door_level_weights={0: 3, 1: 1, 2: 1})[0])
+    level_doors.set_door_level("room_0_0", "east", 2) # So clearances 0-2 each have their own view
+    level_doors.set_door_level("room_2_2", "east", 0)
+    graph = level_doors.graph
+    views = [graph.for_clearance(level) for level in range(3)]
+    level_doors.set_door_level("room_2_2", "east", 1)
+    both_sides = level_doors.get_door_level("room_3_2", "west") == 1
+    kept_view = graph.for_clearance(0) is not views[0] and graph.for_clearance(1) is views[1] and graph.for_clearance(2) is views[2]
+    fresh = RoomGraph(level_doors.map_data)
+    views_match = all([list(a) for a in graph.for_clearance(level)] == [list(b) for b in fresh.for_clearance(level)]
+                      for level in range(3))
+
+    state_tests = [
+        ("Locked doors stop any clearance with their own message", locked_message == "The door is locked." and player.location == "cell"),
+        ("Locking a door locks both of its sides", locked_both_sides),
+        ("Locked doors cut reachability", cell_cut_off),
+        ("Unlocking restores access and reachability", unlocked),
+        ("Destroyed doors let anyone through but keep their level", destroyed),
+        ("Lockdown splits reachability and invalidates routes", sealed > 0 and during),
+        ("Lifting a lockdown restores components and routes", after),
+        ("Incremental reachability matches a full search", agrees),
+        ("Door levels change on both sides of a door", both_sides),
+        ("Door changes keep the clearance views they don't affect", kept_view and views_match),
+        ("Managers share one room registry", shared),
+        ("Door listeners are told room indices", heard[:2] == [(room_index, "east")] * 2 and (rooms.get("room_4_4"), "west") in heard),
+        ("Lockdowns of listed rooms skip unknown ids", sealed_rooms == 2),
+    ]
+    for desc, passed in state_tests:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
     print("\n--- Door Management System Tests Complete ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+# test_items.py
+
+import json
+
+from items import ItemContainer, ItemManager, ItemRegistry
+from map_visualizer import load_map_data
+from player import Player
+
+def run_item_tests():
+    print("--- Running Item Container Tests ---")
+
+    with open("items.json", "r") as f:
+        definitions = json.load(f)
+    definitions["battery"] = {"name": "Battery", "weight": 0.1, "stackable": True, "takeable": True}
+    registry = ItemRegistry(definitions)
+
+    backpack = ItemContainer(registry)
+    first_card = backpack.add_item("keycard_l1")
+    second_card = backpack.add_item("keycard_l1")
+    batteries = backpack.add_item("battery", 3)
+    merged = backpack.add_item("battery", 2)
+    split_off = backpack.remove("battery", 4)
+    removed_card = backpack.remove(first_card.instance_id)
+
+    storage = ItemContainer(registry)
+    for _ in range(5000):
+        storage.add_item("coffee_cup")
+    for _ in range(4999):
+        storage.remove("coffee_cup")
+
+    map_data = load_map_data()
+    item_manager = ItemManager(map_data, definitions)
+    player = Player("control_room", item_registry=item_manager.registry, item_locations=item_manager.locations)
+    start_location = item_manager.locate("keycard_l1")
+    taken = item_manager.take("control_room", "keycard_l1")
+    player.hold_item(taken)
+    player.hold_item(item_manager.take("cell", "coffee_cup"))
+    nothing_left = item_manager.take("cell", "coffee_cup") is None
+    player.unequip_item("right")
+    in_backpack = item_manager.locate(taken.instance_id)
+    equip_message = player.equip_item("keycard_l1", "right")
+    in_hand = item_manager.locate("keycard_l1")
+    hands_full = player.right_hand is taken and player.left_hand is not None
+    carried_weight = player.carried_weight()
+
+    # Dropping, NPCs carrying things, and stacks split between holders
+    item_manager.drop("storage_room", player.release_item("coffee_cup"))
+    dropped = item_manager.locate("coffee_cup")
+    guard_items = item_manager.npc_items("npc_001")
+    guard_items.add(item_manager.take("storage_room", "coffee_cup"))
+    carried = item_manager.locate("coffee_cup")
+    item_manager.room_items("cell").add_item("battery", 5)
+    guard_items.add(item_manager.take("cell", "battery", 2))
+    battery_holders = sorted(holder for _, holder in item_manager.locate_all("battery"))
+
+    test_cases = [
+        ("Instances get unique ids", first_card.instance_id != second_card.instance_id),
+        ("Stackable items merge into one stack", merged is batteries and backpack.count("battery") == 1 and len(backpack) == 2),
+        ("Removing part of a stack splits it off", split_off.count == 4 and split_off is not batteries),
+        ("Removing by instance id takes that instance", removed_card is first_card and backpack.find("keycard_l1") is second_card),
+        ("Weight follows adds and removes", abs(backpack.weight - (0.02 + 0.1)) < 1e-9),
+        ("Display names show stacks", backpack.names() == ["Level 1 Keycard", "Battery"]),
+        ("Large containers stay consistent", len(storage) == 1 and abs(storage.weight - 0.4) < 1e-9),
+        ("Rooms are filled from the map's item lists", "terminal" in item_manager.room_items("control_room")),
+        ("Taking an item removes it from its room", taken is not None and "keycard_l1" not in item_manager.room_items("control_room")),
+        ("Taking an item that isn't there gives None", nothing_left),
+        ("Equip and unequip move instances between hands and backpack",
+         hands_full and equip_message.startswith("You equipped")),
+        ("Carried weight counts hands and backpack", abs(carried_weight - 0.42) < 1e-9),
+        ("Map items are located in their rooms", start_location == ("room", "control_room")),
+        ("Taking and unequipping move the location", in_backpack == ("player", "backpack") and in_hand == ("player", "right_hand")),
+        ("Dropping locates the item in the room", dropped == ("room", "storage_room")),
+        ("NPCs can hold items", carried == ("npc", "npc_001") and player.release_item("coffee_cup") is None),
+        ("Split stacks are located in both holders", battery_holders == [("npc", "npc_001"), ("room", "cell")]),
+        ("Items nowhere are not located", item_manager.locate("broom_closet_key") is None),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Item Container Tests Complete ---")
+
+if __name__ == "__main__":
+    run_item_tests()
@@ -0,0 +1,65 @@
+# test_lod_simulation.py
+
+import contextlib
+import io
+
+from door_manager import DoorManager
+from lod_simulation import LODScheduler
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+from random_streams import set_world_seed
+
+def run_lod_simulation_tests():
+    print("--- Running LOD Simulation Tests ---")
+
+    set_world_seed(30)
+    game_map, start_room_id = generate_grid_map(40, 40, door_level_weights={0: 6, 1: 2, 2: 1})
+    door_manager = DoorManager(game_map)
+    npc_manager = NPCManager(game_map, graph=door_manager.graph)
+    with contextlib.redirect_stdout(io.StringIO()):
+        near = npc_manager.spawn_npc("Guard", "room_1_0")
+        mid = npc_manager.spawn_npc("D-Class", "room_5_0")
+        far = npc_manager.spawn_npc("Scientist", "room_39_39")
+    npc_manager.spawn_npcs({"D-Class": 300}, [f"room_{x}_{y}" for x in range(32, 40) for y in range(32, 40)])
+    npc_manager.spawn_npcs({"Guard": 300, "Scientist": 300}, [f"room_{x}_{y}" for x in range(10) for y in range(10)])
+    total = npc_manager.npc_count()
+
+    scheduler = LODScheduler(npc_manager, near_radius=2, mid_radius=6, mid_interval=4,
+                             far_interval=10, zone_size=8, door_manager=door_manager)
+    turns = [scheduler.tick(start_room_id) for _ in range(10)]
+    far_room = npc_manager.slot_room_index(2)
+
+    # Raising a door above every other moves the cap on clearances, so NPCs are filed again
+    door_manager.set_door_level("room_3_3", "east", 5)
+    after_raise = [scheduler.tick(start_room_id) for _ in range(10)]
+    raised_levels = all(scheduler._slot_levels[slot] == min(npc_manager.slot_clearance(slot), 5)
+                        for slot in range(total))
+    door_manager.set_door_level("room_3_3", "east", 0)
+    after_lower = [scheduler.tick(start_room_id) for _ in range(10)]
+    lowered_levels = all(scheduler._slot_levels[slot] == min(npc_manager.slot_clearance(slot), 2)
+                         for slot in range(total))
+    filed_once = sorted(slot for members in scheduler._members.values() for slot in members) == list(range(total))
+    positions_kept = all(members[scheduler._positions[slot]] == slot
+                         for members in scheduler._members.values() for slot in members)
+
+    test_cases = [
+        ("The near NPC moves on the first turn", turns[0]["near"] >= 1 and turns[0]["mid"] == 0),
+        ("Mid NPCs wait for their interval", all(stats["mid"] == 0 for stats in turns[:4]) and turns[4]["mid"] >= 1),
+        ("Far zones only move by flows", turns[9]["far_flows"] > 0 and all(stats["far_flows"] == 0 for stats in turns[:9])),
+        ("Far NPCs are not stepped room by room", far_room == npc_manager._graph.index["room_39_39"]),
+        ("Zone populations add up to every NPC", sum(scheduler.zone_populations().values()) == total),
+        ("Ticks keep running after the highest door is raised", len(after_raise) == 10 and raised_levels),
+        ("Ticks keep running after it is lowered again", len(after_lower) == 10 and lowered_levels),
+        ("Every NPC stays filed exactly once", filed_once),
+        ("Each NPC knows its place in its zone's list", positions_kept),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- LOD Simulation Tests Complete ---")
+
+if __name__ == "__main__":
+    run_lod_simulation_tests()
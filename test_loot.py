@@ -0,0 +1,78 @@
+# test_loot.py
+
+from collections import Counter
+
+import loot
+from loot import AliasTable, apply_loot, load_loot_tables, zone_tables_by_depth
+from map_generator import generate_grid_map
+from random_streams import RandomStreams, set_world_seed
+
+def stocked_grid(world_seed, loot_tables):
+    set_world_seed(world_seed)
+    game_map, _ = generate_grid_map(40, 40, loot_tables=loot_tables)
+    return game_map
+
+def run_loot_tests():
+    print("--- Running Loot Table Tests ---")
+
+    loot_tables = load_loot_tables()
+    weights = {"a": 1, "b": 2, "c": 7}
+    table = AliasTable(weights)
+    rng = RandomStreams(5).stream("loot")
+    counts = Counter(table.draw(rng) for _ in range(50000))
+    close_to_weights = all(abs(counts[choice] / 50000 - weight / 10) < 0.01 for choice, weight in weights.items())
+    mass = list(table.probability) # Each choice's share of the columns: its own part plus what it fills in as an alias
+    for column, alias in enumerate(table.alias):
+        mass[alias] += 1 - table.probability[column]
+    columns_exact = all(abs(mass[i] - weights[choice] * len(weights) / 10) < 1e-9 for i, choice in enumerate(table.choices))
+    generator = RandomStreams(5).generator("loot")
+    vector_counts = Counter(table.draw_indices(generator.random(50000)).tolist())
+    vector_close = all(abs(vector_counts[i] / 50000 - weights[choice] / 10) < 0.01 for i, choice in enumerate(table.choices))
+    single = AliasTable({"only": 3})
+
+    by_depth, beyond = zone_tables_by_depth(loot_tables["zones"])
+
+    first, replay = stocked_grid(21, loot_tables), stocked_grid(21, loot_tables)
+    rolls = {name: table["rolls"] for name, table in loot_tables["tables"].items()}
+    within_rolls = all(rolls["entrance"][0] <= len(room.get("items", [])) <= rolls["entrance"][1]
+                       for room_id, room in first.items() if sum(map(int, room_id.split("_")[1:])) <= 5)
+    pools = {name: set(table["items"]) for name, table in loot_tables["tables"].items()}
+    deep_items = {item for room_id, room in first.items() for item in room.get("items", [])
+                  if sum(map(int, room_id.split("_")[1:])) > 40}
+
+    templated = {"room_0_0": {"loot_table": "office", "exits": {}}, "room_9_9": {"exits": {}}}
+    apply_loot(templated, loot_tables)
+
+    # Pure-Python fallback
+    numpy_module, loot.np = loot.np, None
+    try:
+        fallback = AliasTable(weights)
+        fallback_map = {f"room_{i}_0": {"exits": {}} for i in range(200)}
+        fallback_placed = apply_loot(fallback_map, loot_tables)
+    finally:
+        loot.np = numpy_module
+
+    test_cases = [
+        ("Alias columns split exactly by weight", columns_exact),
+        ("Alias draws follow the weights", close_to_weights),
+        ("Vectorized alias draws follow the weights", vector_close),
+        ("A single choice is always drawn", all(single.draw(rng) == "only" for _ in range(100))),
+        ("Zones map depths to tables", by_depth[0] == "entrance" and by_depth[6] == "light_containment" and beyond == "heavy_containment"),
+        ("The same world seed stocks the same loot", first == replay),
+        ("Rooms get between min and max rolls of items", within_rolls),
+        ("Deep rooms draw from their zone's pool", deep_items and deep_items <= pools["heavy_containment"]),
+        ("Template tables win over zones", 1 <= len(templated["room_0_0"]["items"]) <= 3
+         and set(templated["room_0_0"]["items"]) <= pools["office"]),
+        ("Pure-Python fallback stocks rooms too", fallback_placed == sum(len(r.get("items", [])) for r in fallback_map.values())
+         and fallback.draw(rng) in weights),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Loot Table Tests Complete ---")
+
+if __name__ == "__main__":
+    run_loot_tests()
@@ -0,0 +1,128 @@
+# test_map_analytics.py
+
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+
+from map_analytics import analyze_map, secure_map
+from map_generator import generate_grid_map, generate_map, load_room_templates, validate_map
+from random_streams import set_world_seed
+from room_graph import RoomGraph
+from scp_manager import SCPManager
+
+DIRECTIONS = ("north", "south", "east", "west", "up", "down")
+
+def random_map(rng, num_rooms, num_doors):
+    """Rooms joined by random two-way doors, with no more than one door per direction."""
+    game_map = {f"r{i}": {"exits": {}} for i in range(num_rooms)}
+    for _ in range(num_doors):
+        a, b = rng.sample(range(num_rooms), 2)
+        free = [d for d in DIRECTIONS if d not in game_map[f"r{a}"]["exits"] and d not in game_map[f"r{b}"]["exits"]]
+        if free:
+            direction = rng.choice(free)
+            game_map[f"r{a}"]["exits"][direction] = f"r{b}"
+            game_map[f"r{b}"]["exits"][direction] = f"r{a}"
+    return game_map
+
+def components(pairs, num_rooms, removed_room=None):
+    parent = list(range(num_rooms))
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+    for a, b in pairs:
+        if removed_room not in (a, b):
+            parent[find(a)] = find(b)
+    return len({find(x) for x in range(num_rooms) if x != removed_room})
+
+def brute_force(graph):
+    """Articulation points and bridges by deleting each room and door in turn."""
+    n = len(graph)
+    pairs = {(min(s, d), max(s, d)) for s, d in zip(graph.source, graph.dest) if s != d}
+    base = components(pairs, n)
+    isolated = {x for x in range(n) if not any(x in pair for pair in pairs)}
+    cut_rooms = {x for x in range(n) if x not in isolated and components(pairs, n, x) > base}
+    bridges = {pair for pair in pairs if components(pairs - {pair}, n) > base}
+    return cut_rooms, bridges
+
+def run_map_analytics_tests():
+    print("--- Running Map Analytics Tests ---")
+
+    rng = random.Random(48)
+    matches = True
+    for trial in range(60):
+        game_map = random_map(rng, rng.randint(2, 14), rng.randint(1, 20))
+        graph = RoomGraph(game_map)
+        analysis = analyze_map(graph, "r0")
+        cut_rooms, bridges = brute_force(graph)
+        if analysis.articulation_points != cut_rooms or {tuple(sorted(b)) for b in analysis.bridges} != bridges:
+            matches = False
+
+    # A corridor room_0 - room_1 - room_2 with a loop room_2 - room_3 - room_4 - room_2 and a dead end room_5 off room_3
+    corridor = {"room_0": {"exits": {"east": "room_1"}},
+                "room_1": {"exits": {"west": "room_0", "east": "room_2"}},
+                "room_2": {"exits": {"west": "room_1", "east": "room_3", "south": "room_4"}},
+                "room_3": {"exits": {"west": "room_2", "south": "room_4", "east": "room_5"}},
+                "room_4": {"exits": {"north": "room_2", "east": "room_3"}},
+                "room_5": {"exits": {"west": "room_3"}},
+                "room_6": {"exits": {}}}
+    graph = RoomGraph(corridor)
+    analysis = analyze_map(graph, "room_0")
+    named = lambda rooms: {graph.room_ids[r] for r in rooms}
+    depths = {graph.room_ids[r]: d for r, d in enumerate(analysis.depth)}
+    near_sides = {graph.room_ids[near] for near, _ in analysis.bridges}
+
+    secured, containment_rooms = secure_map(corridor, "room_0", level_depths=(1, 2), containment_count=1)
+    levels = {(room_id, d): e["door_level"] for room_id, room in corridor.items() for d, e in room["exits"].items()}
+
+    set_world_seed(48)
+    templates = load_room_templates()
+    generated = [generate_map(templates, 15) for _ in range(20)]
+    start_ok = all(not validate_map(game_map, start_room_id) for game_map, start_room_id in generated)
+    containment_ok = all(room.get("containment") is None or
+                         all(e["door_level"] >= 3 for e in room["exits"].values()) and room_id != "room_0_0"
+                         for game_map, _ in generated for room_id, room in game_map.items())
+
+    grid_map, _ = generate_grid_map(20, 20)
+    grid_analysis = analyze_map(RoomGraph(grid_map), "room_0_0")
+
+    # SCPs whose room is not on a generated map go to its containment rooms
+    definitions = {"scp_173": {"class_name": "SCP173", "initial_room": "hallway_a"},
+                   "scp_049": {"class_name": "SCP049", "initial_room": "control_room"}}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(definitions, f)
+    scp_manager = SCPManager(corridor)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scp_manager.load_scps_from_definitions(f.name)
+    os.remove(f.name)
+
+    test_cases = [
+        ("Articulation points and bridges match brute force on random maps", matches),
+        ("Articulation points are the corridor rooms and the loop's exit", named(analysis.articulation_points) == {"room_1", "room_2", "room_3"}),
+        ("Bridges are found from the side nearer the start", near_sides == {"room_0", "room_1", "room_3"}),
+        ("Depth counts doors from the start, -1 when unreachable",
+         depths == {"room_0": 0, "room_1": 1, "room_2": 2, "room_3": 3, "room_4": 3, "room_5": 4, "room_6": -1}),
+        ("Dead ends have a single neighbour", named(analysis.dead_ends) == {"room_0", "room_5"}),
+        ("Bridges are gated by depth, both ways", levels[("room_0", "east")] == 0 and levels[("room_1", "east")] == 1
+         and levels[("room_2", "west")] == 1 and levels[("room_2", "east")] == 0),
+        ("The deepest dead end becomes a containment room", containment_rooms == ["room_5"] and corridor["room_5"]["containment"]
+         and levels[("room_5", "west")] == 3 and levels[("room_3", "east")] == 3),
+        ("Generated maps still let Level 0 leave the start", start_ok),
+        ("Generated containment rooms are sealed away from the start", containment_ok),
+        ("A full grid has no chokepoints", not grid_analysis.articulation_points and not grid_analysis.bridges),
+        ("SCPs missing from the map are placed in containment", scp_manager.get_scp_by_id("scp_173").current_room == "room_5"
+         and scp_manager.get_scp_by_id("scp_049").current_room == "control_room"),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Map Analytics Tests Complete ---")
+
+if __name__ == "__main__":
+    run_map_analytics_tests()
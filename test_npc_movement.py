@@ -0,0 +1,64 @@
+# test_npc_movement.py
+
+import contextlib
+import io
+
+from map_visualizer import load_map_data
+from npc_manager import NPCManager
+
+def run_npc_movement_tests():
+    print("--- Running NPC Movement Tests ---")
+
+    map_data = load_map_data()
+    if not map_data:
+        print("Error: Could not load map data for NPC movement tests.")
+        return
+
+    npc_manager = NPCManager(map_data)
+    with contextlib.redirect_stdout(io.StringIO()):
+        d_class_id = npc_manager.spawn_npc("D-Class", "cell")
+        guard_ids = [npc_manager.spawn_npc("Guard", "hallway_b") for _ in range(50)]
+
+    # Guards are generated with clearance 1 or 2, so only the L2 ones may enter the control room
+    guards = npc_manager.get_npcs_in_room("hallway_b")
+    level_one_guards = [g for g, info in zip(guard_ids, guards) if info["character"].clearance_level < 2]
+
+    failures = 0
+    for _ in range(20):
+        npc_manager.tick_all()
+        rooms = {npc_id: npc_manager.get_npc_status(npc_id) for npc_id in [d_class_id] + level_one_guards}
+        for npc_id, status in rooms.items():
+            if "control_room" in status or (npc_id == d_class_id and "Current Room: cell" not in status):
+                failures += 1
+
+    located = sum(len(npc_manager.get_npcs_in_room(room_id)) for room_id in map_data)
+
+    # Bulk-spawned NPCs only get a Character when looked at, and the same one every time
+    bulk = NPCManager(map_data)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bulk_ids = bulk.spawn_npcs({"Guard": 300, "Scientist": 300}, list(map_data))
+    untouched = len(bulk._characters) == 0
+    first_look = [bulk.get_character(npc_id) for npc_id in bulk_ids]
+    bulk._characters.clear() # Forget them; they must come back the same
+    same_characters = all(a.name == b.name and a.attributes.to_dict() == b.attributes.to_dict()
+                          for a, b in zip(first_look, map(bulk.get_character, bulk_ids)))
+    clearances_match = all(c.clearance_level == bulk.slot_clearance(slot) for slot, c in enumerate(first_look))
+
+    test_cases = [
+        ("No NPC passed a door above its clearance", failures == 0),
+        ("Every NPC is in exactly one room", located == 51),
+        ("D-Class is still in the cell", npc_manager.get_npcs_in_room("cell")[0]["character"].role == "D-class"),
+        ("spawn_npcs generates no Characters up front", untouched and len(bulk_ids) == 600),
+        ("Characters regenerate identically from (role, seed)", same_characters),
+        ("Spawn-time clearance matches the generated Character", clearances_match),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- NPC Movement Tests Complete ---")
+
+if __name__ == "__main__":
+    run_npc_movement_tests()
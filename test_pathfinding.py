@@ -0,0 +1,91 @@
+# test_pathfinding.py
+
+import random
+
+from map_visualizer import load_map_data
+from door_manager import DoorManager
+from hierarchical_pathfinding import HierarchicalPathfinder
+from map_generator import generate_grid_map
+from pathfinding import Pathfinder, shortest_path
+from random_streams import set_world_seed
+
+def compare_with_flat_search(seed, size=24, chunk_size=4):
+    """
+    Counts queries where the hierarchical pathfinder disagrees with a flat
+    BFS on a grid with one-way doors, while door levels keep changing.
+    """
+    rng = random.Random(seed)
+    set_world_seed(seed)
+    game_map, _ = generate_grid_map(size, size, door_level_weights={0: 6, 1: 2, 2: 1})
+    for _ in range(size * size // 4): # One side of a door only, so exits are directed
+        exits = game_map[f"room_{rng.randrange(size)}_{rng.randrange(size)}"]["exits"]
+        exits[rng.choice(list(exits))]["door_level"] = rng.choice((0, 1, 2))
+    door_manager = DoorManager(game_map)
+    graph = door_manager.graph
+    hierarchical = HierarchicalPathfinder(door_manager, chunk_size=chunk_size)
+    mismatches = 0
+    for _ in range(40):
+        room_id = rng.choice(graph.room_ids)
+        door_manager.set_door_level(room_id, rng.choice(list(game_map[room_id]["exits"])), rng.choice((0, 1, 2)))
+        for _ in range(10):
+            a, b, level = rng.randrange(len(graph)), rng.randrange(len(graph)), rng.choice((0, 1, 2))
+            flat = shortest_path(graph, a, b, level)
+            path = hierarchical.find_path(graph.room_ids[a], graph.room_ids[b], level)
+            hop = hierarchical.next_hop(graph.room_ids[a], graph.room_ids[b], level)
+            valid = path is None or (path[0] == graph.room_ids[a] and path[-1] == graph.room_ids[b] and all(
+                any(exit_data["destination"] == to_id and exit_data["door_level"] <= level
+                    for exit_data in game_map[from_id]["exits"].values())
+                for from_id, to_id in zip(path, path[1:])))
+            if (flat is None) != (path is None) or (flat is None) != (hop is None and a != b) or not valid:
+                mismatches += 1
+    return mismatches
+
+def run_pathfinding_tests():
+    print("--- Running Pathfinding Tests ---")
+
+    map_data = load_map_data()
+    if not map_data:
+        print("Error: Could not load map data for pathfinding tests.")
+        return
+
+    door_manager = DoorManager(map_data)
+    pathfinder = Pathfinder(door_manager)
+
+    test_cases = [
+        # (description, actual, expected)
+        ("L0 cannot leave the cell", pathfinder.find_path("cell", "storage_room", 0), None),
+        ("L1 reaches the storage room", pathfinder.find_path("cell", "storage_room", 1),
+         ["cell", "hallway_a", "hallway_b", "storage_room"]),
+        ("L1 cannot reach the control room", pathfinder.distance("cell", "control_room", 1), None),
+        ("L2 distance to the control room", pathfinder.distance("cell", "control_room", 2), 3),
+        ("L2 next hop from hallway_b", pathfinder.next_hop("hallway_b", "control_room", 2), ("north", "control_room")),
+        ("No next hop when already there", pathfinder.next_hop("control_room", "control_room", 2), None),
+        ("Reachability: L1 cannot reach the control room", door_manager.can_reach(1, "cell", "control_room"), False),
+        ("Reachability: rooms open to L0 from hallway_a", sorted(door_manager.get_reachable_rooms(0, "hallway_a")),
+         ["hallway_a", "hallway_b", "storage_room"]),
+        ("Impossible queries build no tree", len(pathfinder._trees), 2),
+    ]
+
+    # Cached L1 tree must be dropped once the control room door opens up to L1
+    door_manager.set_door_level("hallway_b", "north", 1)
+    test_cases.append(("L1 reaches the control room after door change", pathfinder.distance("cell", "control_room", 1), 3))
+    test_cases.append(("Reachability follows door changes", door_manager.can_reach(1, "cell", "control_room"), True))
+    door_manager.set_door_level("hallway_a", "east", 3)
+    test_cases.append(("L2 blocked after hallway door raised", pathfinder.find_path("cell", "control_room", 2), None))
+    test_cases.append(("L3 still passes the raised door", pathfinder.distance("cell", "control_room", 3), 3))
+
+    # Chunked routes must exist exactly when a flat search finds one, even with one-way doors
+    test_cases.append(("Hierarchical routes agree with flat BFS across door changes",
+                       sum(compare_with_flat_search(seed) for seed in range(3, 9)), 0))
+
+    for desc, actual, expected in test_cases:
+        status = "PASS" if actual == expected else "FAIL"
+        print(f"\nTest: {desc}")
+        print(f"  Expected={expected}, Actual={actual} [{status}]")
+        if status == "FAIL":
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Pathfinding Tests Complete ---")
+
+if __name__ == "__main__":
+    run_pathfinding_tests()
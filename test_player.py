@@ -0,0 +1,78 @@
+# test_player.py
+
+import random
+
+from player import Player, BODY_PARTS, DEBUFF_VALUES
+
+def debuff_by_walking(player, attribute=None, action_type=None):
+    """The injury debuff worked out the long way, walking every body part on each call."""
+    total_debuff = 0
+    for part, status in player.body_parts.items():
+        severity_value = DEBUFF_VALUES.get(status, 0)
+        if attribute == 'strength' and ('arm' in part or 'torso' in part):
+            total_debuff += severity_value
+        elif attribute == 'dexterity' and ('arm' in part or 'leg' in part):
+            total_debuff += severity_value
+        elif attribute == 'intelligence' and 'head' in part:
+            total_debuff += severity_value
+        if action_type == 'run' and 'leg' in part:
+            total_debuff += severity_value * 2
+        elif action_type == 'attack' and 'arm' in part:
+            total_debuff += severity_value * 2
+    return total_debuff
+
+def run_player_tests():
+    print("--- Running Player Modifier Tests ---")
+
+    rng = random.Random(3)
+    player = Player("cell", attributes={"strength": 5, "dexterity": 5, "intelligence": 5})
+    player.item_modifiers = {"crowbar": {"strength": 2, "attack": 1}}
+    matches = True
+    for _ in range(40):
+        player.apply_injury(rng.choice(BODY_PARTS), rng.choice(['minor_injury', 'major_injury', 'severe_injury']))
+        for attribute, action_type in (('strength', None), ('dexterity', 'run'), (None, 'attack'), ('intelligence', None)):
+            matches = matches and player.get_debuff(attribute, action_type) == debuff_by_walking(player, attribute, action_type)
+
+    fresh = Player("cell", attributes={"strength": 5, "dexterity": 5, "intelligence": 5})
+    fresh.item_modifiers = {"crowbar": {"strength": 2, "attack": 1}}
+    cached_before = fresh.get_effective_attribute('strength')
+    fresh.apply_injury('torso', 'major_injury')
+    after_injury = fresh.get_effective_attribute('strength')
+    fresh.change_morale(-50) # 100 -> 50: minor debuff instead of minor buff
+    after_morale = fresh.get_effective_attribute('strength'), fresh.get_morale_effect('run')
+    fresh.change_sanity(-80)
+    after_sanity = fresh.get_effective_attribute('intelligence')
+    fresh.inventory.add_item("crowbar")
+    fresh.equip_item("crowbar", "left")
+    equipped = fresh.get_effective_attribute('strength'), fresh.get_action_modifier('attack')
+    fresh.unequip_item("left")
+    unequipped = fresh.get_effective_attribute('strength'), fresh.get_action_modifier('attack')
+    held_in = [fresh.hold_item(fresh.inventory.registry.create(item)) for item in ("crowbar", "keycard_l1", "coffee_cup")]
+    picked_up = fresh.get_effective_attribute('strength')
+
+    # Attributes past a signed byte are kept; absurd ones are clamped instead of raising
+    strong = Player("cell", attributes={"strength": 200, "dexterity": 5, "intelligence": 100000})
+    strong.attributes['dexterity'] = 130
+    big_attributes = strong.attributes.to_dict()
+
+    test_cases = [
+        ("Cached injury debuffs match walking every body part", matches),
+        ("Healthy, high-morale player gets the morale buff", cached_before == 6),
+        ("apply_injury invalidates the cache", after_injury == 4),
+        ("change_morale invalidates the cache", after_morale == (2, -1)),
+        ("change_sanity invalidates the cache", after_sanity == 2),
+        ("equip_item applies held-item modifiers", equipped == (4, 1)),
+        ("unequip_item removes them", unequipped == (2, 0)),
+        ("hold_item fills the right hand, the left, then the backpack", held_in == ['right', 'left', 'backpack'] and picked_up == 4),
+        ("Attributes above 127 are stored", big_attributes == {"strength": 200, "dexterity": 130, "intelligence": 32767}),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Player Modifier Tests Complete ---")
+
+if __name__ == "__main__":
+    run_player_tests()
@@ -0,0 +1,65 @@
+# test_random_streams.py
+
+import contextlib
+import io
+
+from random_streams import RandomStreams, get_stream, set_world_seed
+from character import generate_character
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+
+def play_out(world_seed, chatter=0):
+    """Builds a small world from a seed and runs it a few turns. chatter draws dialogue lines along the way."""
+    set_world_seed(world_seed)
+    game_map, _ = generate_grid_map(8, 8, door_level_weights={0: 3, 1: 1})
+    npc_manager = NPCManager(game_map)
+    with contextlib.redirect_stdout(io.StringIO()):
+        npc_ids = npc_manager.spawn_npcs({"Guard": 20, "D-Class": 40}, list(game_map))
+    for _ in range(chatter):
+        get_stream("dialogue").random()
+    for _ in range(5):
+        npc_manager.tick_all()
+    doors = [exit_info["door_level"] for room in game_map.values() for exit_info in room["exits"].values()]
+    return doors, [npc_manager.get_npc_room(npc_id) for npc_id in npc_ids], generate_character("Scientist").name
+
+def run_random_streams_tests():
+    print("--- Running Random Stream Tests ---")
+
+    first, replay, other_seed = play_out(42), play_out(42), play_out(43)
+    talkative = play_out(42, chatter=100)
+
+    streams = RandomStreams(7)
+    npc_stream = streams.stream("npc")
+    before = [npc_stream.random() for _ in range(3)]
+    streams.reseed(7)
+    reseeded = [npc_stream.random() for _ in range(3)]
+    separate = RandomStreams(7)
+    separate.stream("npc").random() # Drawing from one world leaves the other alone
+    untouched = RandomStreams(7).stream("npc").random() == before[0]
+
+    buffered = RandomStreams(11).buffer("combat")
+    blocks = [buffered.random(3) for _ in range(3)]
+    direct = RandomStreams(11).generator("combat").random(buffered.block_size)[:9]
+    refilled = RandomStreams(11).buffer("combat", block_size=4)
+    over_block = [refilled.random(3), refilled.random(3)]
+
+    test_cases = [
+        ("The same world seed replays maps, spawns and moves", first == replay),
+        ("A different world seed gives a different world", first[:2] != other_seed[:2]),
+        ("Dialogue draws don't change what NPCs do", talkative == first),
+        ("Reseeding restarts streams fetched earlier", before == reseeded),
+        ("Separate stream sets don't share state", untouched),
+        ("The buffer hands out the Generator's numbers in order", [x for block in blocks for x in block] == list(direct)),
+        ("The buffer refills when a draw doesn't fit", all(len(block) == 3 for block in over_block)),
+        ("Integers from the buffer stay below their bounds", all(0 <= i < 5 for i in buffered.integers(5, 1000))),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Random Stream Tests Complete ---")
+
+if __name__ == "__main__":
+    run_random_streams_tests()
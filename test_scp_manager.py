@@ -0,0 +1,107 @@
+# test_scp_manager.py
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+from map_visualizer import load_map_data
+from scp import SCP
+from scp_manager import SCPManager
+from scps import get_scp_class
+from map_generator import generate_grid_map
+from room_graph import RoomGraph
+from visibility import Visibility
+
+class WatchfulSCP(SCP):
+    """Records the events it receives."""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.events = []
+
+    def on_player_enter_room(self, player_location, game_state):
+        self.events.append(("enter", player_location))
+
+    def on_turn_start(self, game_state):
+        self.events.append(("turn", None))
+
+def run_scp_manager_tests():
+    print("--- Running SCP Manager Tests ---")
+
+    map_data = load_map_data()
+    if not map_data:
+        print("Error: Could not load map data for SCP manager tests.")
+        return
+
+    scp_manager = SCPManager(map_data)
+    watcher_a = WatchfulSCP("scp_901", "SCP-901", "Euclid", "hallway_a")
+    watcher_b = WatchfulSCP("scp_902", "SCP-902", "Euclid", "cell")
+    idle = SCP("scp_903", "SCP-903", "Safe", "hallway_a")
+    for scp in (watcher_a, watcher_b, idle):
+        scp_manager.add_scp(scp)
+
+    scp_manager.trigger_event("on_turn_start", game_state=None)
+    scp_manager.trigger_event("on_player_enter_room", player_location="hallway_a", game_state=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scp_manager.move_scp("scp_902", "hallway_a")
+    scp_manager.trigger_event("on_player_enter_room", player_location="hallway_a", game_state=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scp_manager.trigger_event("on_breach", game_state=None)
+    all_breached = not any(scp.is_contained for scp in (watcher_a, watcher_b, idle))
+    with contextlib.redirect_stdout(io.StringIO()):
+        scp_manager.breach_scp("scp_903", target_room_id="storage_room")
+        scp_manager.contain_scp("scp_902")
+
+    # Only the behavior classes a definition references get imported
+    definitions = {"scp_049": {"class_name": "SCP049", "initial_room": "control_room"},
+                   "scp_999": {"class_name": "SCP999", "initial_room": "cell"}}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(definitions, f)
+    loaded = SCPManager(map_data)
+    with contextlib.redirect_stdout(io.StringIO()):
+        loaded.load_scps_from_definitions(f.name)
+    os.remove(f.name)
+    lazily_imported = "scps.scp_173" not in sys.modules
+
+    display = scp_manager.get_scp_locations_for_display()
+
+    # SCP-173 is watched only from its own row or column, within range
+    grid_map, _ = generate_grid_map(10, 10)
+    visibility = Visibility(RoomGraph(grid_map), max_range=3)
+    statues = SCPManager(grid_map)
+    statue = get_scp_class("SCP173")("scp_173", "SCP-173", "Euclid", "room_5_5")
+    statues.add_scp(statue)
+    seen = []
+    for observers in (["room_5_2"], ["room_5_1"], ["room_9_9", "room_2_5"], ["room_4_4"]):
+        statues.update_observation(visibility, observers)
+        seen.append(statue.is_observed)
+
+    test_cases = [
+        ("Definitions get their registered behavior class", type(loaded.get_scp_by_id("scp_049")).__name__ == "SCP049"),
+        ("Unregistered classes fall back to the base SCP", type(loaded.get_scp_by_id("scp_999")) is SCP),
+        ("Unreferenced SCP modules are not imported", lazily_imported),
+        ("Base no-op hooks have no subscribers", "scp_903" not in scp_manager._subscribers["on_turn_start"]),
+        ("Overridden hooks reach every overriding SCP", watcher_a.events[0] == watcher_b.events[0] == ("turn", None)),
+        ("Room-scoped events only reach SCPs in that room", watcher_a.events[1:] == [("enter", "hallway_a")] * 2),
+        ("move_scp keeps the room filter up to date", watcher_b.events[1:] == [("enter", "hallway_a")]),
+        ("Hooks with base behavior reach every SCP", all_breached),
+        ("Room index follows moves, breaches and containment",
+         [scp.id for scp in scp_manager.get_scps_in_room("hallway_a")] == ["scp_901"]
+         and scp_manager.get_scps_in_room("storage_room") == [idle]
+         and scp_manager.get_scps_in_room("cell") == [watcher_b]),
+        ("Display markers follow the room index", display == {"hallway_a": ["901"], "storage_room": ["903"], "cell": ["902"]}),
+        ("SCP-173 is observed only along its corridors within range", seen == [True, False, True, False]),
+        ("Breached SCPs are tracked", {scp.id for scp in scp_manager.get_breached_scps()} == {"scp_901", "scp_903"}),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- SCP Manager Tests Complete ---")
+
+if __name__ == "__main__":
+    run_scp_manager_tests()
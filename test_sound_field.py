@@ -0,0 +1,52 @@
+# test_sound_field.py
+
+from door_manager import DoorManager
+from map_visualizer import load_map_data
+from sound_field import SoundField, sound_levels
+
+def run_sound_field_tests():
+    print("--- Running Sound Field Tests ---")
+
+    map_data = load_map_data()
+    if not map_data:
+        print("Error: Could not load map data for sound field tests.")
+        return
+
+    door_manager = DoorManager(map_data)
+    sound_field = SoundField(door_manager)
+    sound_field.set_source("scp_173", "hallway_b", 5, "scraping")
+    sound_field.set_source("gunfire", "cell", 3, "gunfire")
+    # hallway_b -> hallway_a costs 1 (L0 door), hallway_a -> cell costs 2 (L1 door)
+    initial = {room_id: sound_field.noise_at(room_id) for room_id in ("hallway_b", "hallway_a", "cell")}
+    description = sound_field.describe_sounds("hallway_a")
+
+    sound_field.move_source("scp_173", "control_room")
+    moved = sound_field.noise_at("hallway_a")
+    sound_field.move_source("scp_173", "hallway_b") # Back again, from the cache
+    back = {room_id: sound_field.noise_at(room_id) for room_id in ("hallway_b", "hallway_a", "cell")}
+
+    door_manager.set_door_level("hallway_a", "west", 0)
+    after_door = sound_field.noise_at("cell")
+    fresh = sound_levels(door_manager.graph, door_manager.graph.index["hallway_b"], 5)
+
+    sound_field.remove_source("scp_173")
+    sound_field.remove_source("gunfire")
+
+    test_cases = [
+        ("Noise from every source adds up", initial == {"hallway_b": 5, "hallway_a": 4 + 1, "cell": 2 + 3}),
+        ("Moving a source moves its noise", moved == 1 + 1), # control_room -> hallway_b is an L2 door (cost 3)
+        ("Moving back restores the same field", back == initial),
+        ("Door changes refresh the sources they affect", after_door == fresh[door_manager.graph.index["cell"]] + 3),
+        ("Describes sounds by loudness", description == "You hear nearby scraping, faint gunfire."),
+        ("Removing every source leaves silence", all(sound_field.noise_at(room_id) == 0 for room_id in map_data)),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Sound Field Tests Complete ---")
+
+if __name__ == "__main__":
+    run_sound_field_tests()
@@ -0,0 +1,106 @@
+# test_turn_scheduler.py
+
+import contextlib
+import io
+
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+from scp import SCP
+from scp_manager import SCPManager
+from turn_scheduler import TurnScheduler, run_world_turn
+
+class TimedSCP(SCP):
+    """Records the turns it is woken on."""
+    wake_interval = 3
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.woken = []
+
+    def on_turn_start(self, game_state):
+        self.woken.append(game_state["turn"])
+
+def wake_turns(scheduler, turns, repeat=None):
+    """Advances the scheduler and returns {key: [turns it was due on]}; keys in repeat are booked again."""
+    woken = {}
+    for _ in range(turns):
+        for key in scheduler.advance():
+            woken.setdefault(key, []).append(scheduler.turn)
+            if repeat and key in repeat:
+                scheduler.schedule_in(key, repeat[key])
+    return woken
+
+def run_turn_scheduler_tests():
+    print("--- Running Turn Scheduler Tests ---")
+
+    # A small wheel, so wake-ups wrap around it and spill into the overflow heap
+    scheduler = TurnScheduler(wheel_size=4)
+    scheduler.schedule_in("lap", 3)
+    scheduler.schedule_in("near", 10)
+    scheduler.schedule_in("far", 100)
+    scheduler.schedule_in("moved", 2)
+    scheduler.schedule_in("moved", 5) # Replaces the turn 2 wake-up
+    scheduler.schedule_in("pulled_in", 20)
+    scheduler.schedule_in("pulled_in", 3) # Earlier than the overflow entry it replaces
+    scheduler.schedule_in("cancelled", 2)
+    scheduler.schedule_in("cancelled_far", 50)
+    overflow_before = len(scheduler._overflow)
+    pending_before = len(scheduler)
+    cancelled = scheduler.cancel("cancelled") and scheduler.cancel("cancelled_far")
+    cancelled_twice = scheduler.cancel("cancelled")
+    woken = wake_turns(scheduler, 120, repeat={"lap": 3})
+
+    past = TurnScheduler(start_turn=10)
+    past.schedule("late", 4)
+    late_turn = past.next_wake_turn("late")
+
+    # NPCs and SCPs woken through run_world_turn
+    game_map, _ = generate_grid_map(10, 10)
+    npc_manager = NPCManager(game_map)
+    scp_manager = SCPManager(game_map)
+    with contextlib.redirect_stdout(io.StringIO()):
+        guard = npc_manager.spawn_npc("Guard", "room_5_5")
+        scientist = npc_manager.spawn_npc("Scientist", "room_2_2")
+    timed = TimedSCP("scp_910", "SCP-910", "Euclid", "room_0_0")
+    untimed = SCP("scp_911", "SCP-911", "Safe", "room_9_9")
+    scp_manager.add_scp(timed)
+    scp_manager.add_scp(untimed)
+
+    world = TurnScheduler(wheel_size=4)
+    world.schedule_in(("npc", guard), 1)
+    world.schedule_in(("npc", scientist), 1)
+    scp_manager.schedule_turn_hooks(world)
+    game_state = {"turn": 0}
+    npc_wakes = {guard: [], scientist: []}
+    for _ in range(9):
+        game_state["turn"] = world.turn + 1
+        for kind, entity_id in run_world_turn(world, npc_manager, scp_manager, game_state):
+            if kind == "npc":
+                npc_wakes[entity_id].append(world.turn)
+
+    test_cases = [
+        ("Wake-ups wrap around the wheel", woken.get("lap", [])[:5] == [3, 6, 9, 12, 15]),
+        ("Far wake-ups wait in the overflow heap", overflow_before == 5),
+        ("Overflow wake-ups move onto the wheel on time", woken.get("near") == [10] and woken.get("far") == [100]),
+        ("Rescheduling replaces the old wake-up", woken.get("moved") == [5] and woken.get("pulled_in") == [3]),
+        ("Each key is pending once", pending_before == 7),
+        ("Cancelled wake-ups never fire", cancelled and not cancelled_twice
+         and "cancelled" not in woken and "cancelled_far" not in woken),
+        ("Only repeating keys stay pending", len(scheduler) == 1),
+        ("Wake-ups in the past move to the next turn", late_turn == 11),
+        ("Guards are woken every 2 turns", npc_wakes[guard] == [1, 3, 5, 7, 9]),
+        ("Scientists are woken every 4 turns", npc_wakes[scientist] == [1, 5, 9]),
+        ("The NPC manager follows the scheduler's turn", npc_manager.turn == 9),
+        ("SCPs are woken on their interval", timed.woken == [3, 6, 9]),
+        ("SCPs without an interval are never scheduled", world.next_wake_turn(("scp", "scp_911")) is None),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- Turn Scheduler Tests Complete ---")
+
+if __name__ == "__main__":
+    run_turn_scheduler_tests()
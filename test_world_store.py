@@ -0,0 +1,145 @@
+# test_world_store.py
+
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+
+from door_manager import DoorManager, DOOR_LOCKED
+from items import ItemManager
+from map_generator import generate_grid_map
+from npc_manager import NPCManager
+from player import Player
+from room_graph import RoomRegistry
+from world_store import WorldStore
+
+ITEMS = {"battery": {"name": "Battery", "weight": 0.1, "stackable": True},
+         "keycard_l1": {"name": "Level 1 Keycard", "weight": 0.01},
+         "document": {"name": "Document", "weight": 0.05}}
+
+def run_world_store_tests():
+    print("--- Running World Store Tests ---")
+
+    game_map, start_room_id = generate_grid_map(20, 20)
+    game_map["room_2_2"]["items"] = ["keycard_l1", "battery", "battery"]
+    game_map["room_4_4"]["items"] = ["document", "battery"]
+    path = os.path.join(tempfile.mkdtemp(), "facility.db")
+    WorldStore.create(path, game_map, start_room_id).close()
+
+    store = WorldStore(path, cache_size=16, write_batch=4)
+    same_order = RoomRegistry(store).room_ids == RoomRegistry(game_map).room_ids
+    door_manager = DoorManager(store) # Reads every room through the cache
+    bounded = store.cached_room_count() <= 16
+    changes_before = store._db.total_changes
+    for room_id in store:
+        store[room_id]
+    read_only_writes = store._db.total_changes - changes_before
+
+    store.keep_hot(["room_5_5", "room_6_5"])
+    hot_room = store["room_5_5"]
+    door_manager.lock_door("room_5_5", "east")
+    for _, room in store.items():
+        pass
+    hot_kept = store["room_5_5"] is hot_room
+
+    # Changes to evicted rooms go out in batches, before any flush
+    for x in range(10):
+        door_manager.lock_door(f"room_{x}_0", "north")
+    for room_id in store:
+        store[room_id]
+    with sqlite3.connect(path) as db:
+        written_early = db.execute("SELECT data FROM rooms WHERE room_id = 'room_3_0'").fetchone()[0]
+    batched = '"state":"locked"' in written_early and len(store._pending) < 4
+
+    store["annex"] = {"name": "Annex", "description": "A new wing.", "exits": {}}
+    added = len(store) == 401 and "annex" in store
+    del store["annex"]
+    removed = len(store) == 400 and "annex" not in store
+
+    # NPC positions, item placements and the player are saved with the world
+    npc_manager = NPCManager(store, graph=door_manager.graph)
+    with contextlib.redirect_stdout(io.StringIO()):
+        guard = npc_manager.spawn_npc("Guard", "room_7_7")
+        scientist = npc_manager.spawn_npc("Scientist", "room_1_9")
+    npc_manager.move_npc(guard)
+    npc_manager.get_character(scientist).health = 0
+    npc_manager.defeat_fallen_npcs("room_1_9")
+    guard_room, guard_name = npc_manager.get_npc_room(guard), npc_manager.get_character(guard).name
+    item_manager = ItemManager(store, ITEMS)
+    item_manager.npc_items(scientist).add(item_manager.take("room_2_2", "keycard_l1"))
+    item_manager.drop("room_9_9", item_manager.take("room_2_2", "battery", 1))
+    player = Player("room_4_4", item_registry=item_manager.registry, item_locations=item_manager.locations)
+    player.hold_item(item_manager.take("room_4_4", "document"))
+    player.inventory.add(item_manager.take("room_4_4", "battery"))
+    store.save_world(npc_manager, item_manager, player)
+    with sqlite3.connect(path) as db: # A checkpoint is on disk before the store is closed
+        checkpointed = (db.execute("SELECT COUNT(*) FROM npcs").fetchone()[0] == 2
+                        and db.execute("SELECT 1 FROM meta WHERE key = 'player'").fetchone() is not None
+                        and '"document"' not in db.execute("SELECT data FROM rooms WHERE room_id = 'room_4_4'").fetchone()[0])
+    store.close()
+
+    with WorldStore(path, cache_size=16) as reopened:
+        locked = (DoorManager(reopened).get_door_state("room_5_5", "east") == DOOR_LOCKED
+                  and reopened["room_6_5"]["exits"]["west"]["state"] == DOOR_LOCKED
+                  and reopened["room_3_0"]["exits"]["north"]["state"] == DOOR_LOCKED)
+        restored_npcs = NPCManager(reopened)
+        npc_count = reopened.load_npcs(restored_npcs)
+        restored_items = ItemManager(reopened, ITEMS)
+        reopened.load_npc_items(restored_items)
+        lazy_rooms = not restored_items._rooms # Nothing read from the rooms until one is touched
+        missing = restored_items.locate("no_such_item")
+        batteries = restored_items.locate_all("battery")
+        stocked_only_holders = (missing is None and len(batteries) == 2
+                                and sorted(restored_items.rooms.room_ids[r] for r in restored_items._rooms) == ["room_2_2", "room_9_9"])
+        restored_player = Player("room_0_0", item_registry=restored_items.registry, item_locations=restored_items.locations)
+        player_back = (reopened.load_player(restored_player) and restored_player.location == "room_4_4"
+                       and restored_player.right_hand.item_id == "document" and restored_player.left_hand is None
+                       and restored_player.inventory.count("battery") == 1
+                       and not restored_items.room_items("room_4_4")
+                       and restored_items.locate("document") == ("player", "right_hand"))
+        npcs_back = (npc_count == 2 and restored_npcs.get_npc_room(guard) == guard_room
+                     and restored_npcs.get_character(guard).name == guard_name
+                     and restored_npcs.get_npc_room(scientist) == "room_1_9"
+                     and restored_npcs.is_defeated(scientist) and not restored_npcs.is_defeated(guard))
+        items_back = (restored_items.locate("keycard_l1") == ("npc", scientist)
+                      and restored_items.room_items("room_2_2").count("battery") == 1
+                      and restored_items.room_items("room_9_9").count("battery") == 1)
+        start_kept = reopened.get_meta("start_room_id") == start_room_id
+
+    # A new world in the same file starts without the old one's NPCs, items and player
+    new_map, new_start = generate_grid_map(5, 5)
+    with WorldStore.create(path, new_map, new_start) as fresh:
+        fresh_items = ItemManager(fresh, ITEMS)
+        fresh.load_npc_items(fresh_items)
+        fresh_player = Player(new_start, item_registry=fresh_items.registry, item_locations=fresh_items.locations)
+        nothing_old = (fresh.load_npcs(NPCManager(fresh)) == 0 and not fresh_items.npc_contents()
+                       and not fresh.load_player(fresh_player) and len(fresh) == 25)
+
+    test_cases = [
+        ("Rooms come back in the order they were stored", same_order),
+        ("The cache stays within its size", bounded),
+        ("Reading rooms writes nothing back", read_only_writes == 0),
+        ("Hot rooms are never evicted", hot_kept),
+        ("Changed rooms are written back in batches", batched),
+        ("Rooms can be added and removed", added and removed),
+        ("Door changes survive reopening the store", locked),
+        ("NPCs come back with their ids, rooms and characters", npcs_back),
+        ("Checkpoints write NPCs, items and the player without closing", checkpointed),
+        ("Item placements come back", items_back),
+        ("Room items are only read when a room is touched", lazy_rooms),
+        ("Locating an item fills only the rooms that hold it", stocked_only_holders),
+        ("The player comes back where they were, carrying what they took", player_back),
+        ("The start room is kept with the world", start_kept),
+        ("Creating a world clears the previous one's saves", nothing_old),
+    ]
+
+    for desc, passed in test_cases:
+        print(f"\nTest: {desc} [{'PASS' if passed else 'FAIL'}]")
+        if not passed:
+            print(f"  !!! TEST FAILED: {desc}")
+
+    print("\n--- World Store Tests Complete ---")
+
+if __name__ == "__main__":
+    run_world_store_tests()
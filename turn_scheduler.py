@@ -0,0 +1,98 @@
+# turn_scheduler.py
+# Wake-up scheduling for NPCs and SCPs, so each world turn only touches the
+# entities that are actually due instead of polling everyone.
+
+import heapq
+
+
+class TurnScheduler:
+    """
+    Hashed timing wheel over integer turns. Wake-ups less than wheel_size
+    turns ahead go straight into their wheel slot (O(1)); later ones wait in
+    an overflow heap (O(log n)) until they come within range. Each entity key
+    has at most one pending wake-up: scheduling it again replaces the old one.
+    Keys are any hashable; run_world_turn expects ("npc", npc_id) and
+    ("scp", scp_id), e.g. ("npc", "npc_001").
+    """
+    def __init__(self, wheel_size=256, start_turn=0):
+        self.turn = start_turn
+        self.wheel_size = wheel_size
+        self._wheel = [[] for _ in range(wheel_size)] # slot -> [(turn, key), ...]
+        self._overflow = [] # heap of (turn, sequence, key)
+        self._sequence = 0
+        self._wake_turn = {} # {key: turn}; older entries left in the wheel are skipped
+
+    def __len__(self):
+        return len(self._wake_turn)
+
+    def _insert(self, turn, key):
+        if turn - self.turn < self.wheel_size:
+            self._wheel[turn % self.wheel_size].append((turn, key))
+        else:
+            heapq.heappush(self._overflow, (turn, self._sequence, key))
+            self._sequence += 1
+
+    def schedule(self, key, turn):
+        """Wakes key on the given turn (at the earliest, the next one)."""
+        turn = max(turn, self.turn + 1)
+        self._wake_turn[key] = turn
+        self._insert(turn, key)
+
+    def schedule_in(self, key, delay):
+        """Wakes key delay turns from now."""
+        self.schedule(key, self.turn + delay)
+
+    def cancel(self, key):
+        """Drops any pending wake-up for key. Returns True if there was one."""
+        return self._wake_turn.pop(key, None) is not None
+
+    def next_wake_turn(self, key):
+        return self._wake_turn.get(key)
+
+    def advance(self):
+        """Moves to the next turn and returns the keys due on it."""
+        self.turn += 1
+        overflow = self._overflow
+        while overflow and overflow[0][0] - self.turn < self.wheel_size:
+            turn, _, key = heapq.heappop(overflow)
+            if self._wake_turn.get(key) == turn:
+                self._wheel[turn % self.wheel_size].append((turn, key))
+
+        slot = self.turn % self.wheel_size
+        entries = self._wheel[slot]
+        self._wheel[slot] = []
+        due = []
+        for turn, key in entries:
+            if self._wake_turn.get(key) == turn:
+                del self._wake_turn[key]
+                due.append(key)
+        return due
+
+
+def run_world_turn(scheduler, npc_manager=None, scp_manager=None, game_state=None):
+    """
+    Advances the scheduler by one turn and wakes only the NPCs and SCPs due
+    on it (keys ("npc", npc_id) and ("scp", scp_id)). Returns the due keys.
+    """
+    due = scheduler.advance()
+    if npc_manager is not None:
+        npc_manager.turn = scheduler.turn
+    for kind, entity_id in due:
+        if kind == "npc" and npc_manager is not None:
+            npc_manager.wake_npc(entity_id, scheduler)
+        elif kind == "scp" and scp_manager is not None:
+            scp_manager.wake_scp(entity_id, scheduler, game_state)
+    return due
+
+
+if __name__ == "__main__":
+    scheduler = TurnScheduler(wheel_size=8)
+    scheduler.schedule_in(("npc", "npc_001"), 1)
+    scheduler.schedule_in(("scp", "scp_173"), 3)
+    scheduler.schedule_in(("scp", "scp_049"), 20) # Beyond the wheel, waits in the overflow heap
+    scheduler.schedule_in(("npc", "npc_002"), 2)
+    scheduler.schedule_in(("npc", "npc_002"), 5) # Replaces the turn 2 wake-up
+    for _ in range(20):
+        due = scheduler.advance()
+        if due:
+            print(f"Turn {scheduler.turn}: {due}")
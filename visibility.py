@@ -0,0 +1,135 @@
+# visibility.py
+# Line of sight between rooms along straight corridors, for SCPs whose behavior
+# depends on being watched (SCP-173).
+
+from array import array
+
+# Each axis is a (forward, backward) pair of exit directions
+SIGHT_AXES = (("east", "west"), ("south", "north"))
+
+
+class Visibility:
+    """
+    Precomputed line of sight over a RoomGraph. A corridor is a maximal chain
+    of rooms joined by exits in the same direction (an unbroken row or column
+    of a generated map); from any room you see the rooms of its east-west and
+    north-south corridors, up to max_range rooms away (None for no limit).
+
+    Sight is stored as bitsets (Python ints) over positions along each
+    corridor rather than over all rooms, so a 100k-room map stays small:
+    every room keeps one sight mask per axis, and a set of observers is
+    turned into one observer bitset per corridor by OR-ing their positions.
+    Whether a room is observed is then an AND of its sight masks with the
+    observer bitsets of its own two corridors.
+    """
+    def __init__(self, graph, max_range=None):
+        self.graph = graph
+        self.max_range = max_range
+        n = len(graph)
+        self._corridors = [] # corridor -> [room_index, ...] in forward order
+        self._corridor_of = [array('i', [-1]) * n for _ in SIGHT_AXES] # per axis: room -> corridor, -1 if none
+        self._position = [array('i', [0]) * n for _ in SIGHT_AXES] # per axis: room -> position in its corridor
+        self._sight = [[0] * n for _ in SIGHT_AXES] # per axis: room -> bitset of corridor positions it sees
+
+        for axis, (forward, _) in enumerate(SIGHT_AXES):
+            following = [graph.edge_index(room_index, forward) for room_index in range(n)]
+            following = [graph.dest[e] if e is not None else -1 for e in following]
+            has_previous = set(following)
+            # Corridors start at rooms nothing leads into in the forward direction;
+            # the second pass picks up loops of exits, which have no such room
+            starts = [r for r in range(n) if r not in has_previous and following[r] != -1]
+            for room_index in starts + list(range(n)):
+                if following[room_index] == -1 or self._corridor_of[axis][room_index] != -1:
+                    continue
+                rooms = [room_index]
+                in_corridor = {room_index}
+                next_room = following[room_index]
+                while next_room != -1 and next_room not in in_corridor and self._corridor_of[axis][next_room] == -1:
+                    rooms.append(next_room)
+                    in_corridor.add(next_room)
+                    next_room = following[next_room]
+                self._add_corridor(axis, rooms)
+
+    def _add_corridor(self, axis, rooms):
+        corridor = len(self._corridors)
+        self._corridors.append(rooms)
+        whole = (1 << len(rooms)) - 1 # Shared by every room when sight is unlimited
+        for position, room_index in enumerate(rooms):
+            self._corridor_of[axis][room_index] = corridor
+            self._position[axis][room_index] = position
+            if self.max_range is None:
+                self._sight[axis][room_index] = whole
+            else:
+                low = max(position - self.max_range, 0)
+                high = min(position + self.max_range, len(rooms) - 1)
+                self._sight[axis][room_index] = ((1 << (high - low + 1)) - 1) << low
+
+    def observer_masks(self, observer_room_indices):
+        """
+        ORs observer locations into per-corridor bitsets. Returns
+        ({corridor: bitset}, set(room_index)); the set holds the observers'
+        own rooms, which are always observed even outside any corridor.
+        """
+        masks = {}
+        rooms = set()
+        for room_index in observer_room_indices:
+            room_index = int(room_index)
+            rooms.add(room_index)
+            for axis in range(len(SIGHT_AXES)):
+                corridor = self._corridor_of[axis][room_index]
+                if corridor != -1:
+                    masks[corridor] = masks.get(corridor, 0) | (1 << self._position[axis][room_index])
+        return masks, rooms
+
+    def is_observed(self, room_index, observers):
+        """True if any observer in observers (from observer_masks) can see room_index."""
+        masks, rooms = observers
+        if room_index in rooms:
+            return True
+        for axis in range(len(SIGHT_AXES)):
+            corridor = self._corridor_of[axis][room_index]
+            if corridor != -1 and masks.get(corridor, 0) & self._sight[axis][room_index]:
+                return True
+        return False
+
+    def is_room_observed(self, room_id, observer_room_ids):
+        """Convenience wrapper over room ids: is room_id seen from any of observer_room_ids?"""
+        index = self.graph.index
+        room_index = index.get(room_id)
+        if room_index is None:
+            return False
+        observers = self.observer_masks(index[r] for r in observer_room_ids if r in index)
+        return self.is_observed(room_index, observers)
+
+    def visible_rooms(self, room_id):
+        """Returns the ids of every room in line of sight of room_id (itself included)."""
+        room_index = self.graph.index.get(room_id)
+        if room_index is None:
+            return []
+        seen = {room_index}
+        for axis in range(len(SIGHT_AXES)):
+            corridor = self._corridor_of[axis][room_index]
+            if corridor == -1:
+                continue
+            sight = self._sight[axis][room_index]
+            seen.update(r for position, r in enumerate(self._corridors[corridor]) if sight >> position & 1)
+        return [self.graph.room_ids[r] for r in sorted(seen)]
+
+
+if __name__ == "__main__":
+    import time
+    from map_generator import generate_grid_map
+    from room_graph import RoomGraph
+
+    game_map, start_room_id = generate_grid_map(316, 316)
+    graph = RoomGraph(game_map)
+    start = time.perf_counter()
+    visibility = Visibility(graph, max_range=5)
+    print(f"{len(graph)} rooms: visibility precomputed in {time.perf_counter() - start:.2f}s")
+    print(f"Seen from {start_room_id}: {visibility.visible_rooms(start_room_id)}")
+
+    observers = [f"room_{i}_{i}" for i in range(0, 316, 3)]
+    start = time.perf_counter()
+    watched = visibility.observer_masks(graph.index[r] for r in observers)
+    observed = sum(visibility.is_observed(r, watched) for r in range(len(graph)))
+    print(f"{len(observers)} observers see {observed} rooms ({time.perf_counter() - start:.3f}s for every room)")
@@ -0,0 +1,297 @@
+# world_store.py
+# Optional SQLite backend for facilities too big to keep in memory: rooms,
+# item placements, NPC positions and the player's location and belongings
+# live in a local database file, and the game reaches rooms through a
+# bounded cache instead of one big dict.
+
+import json
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (room_index INTEGER PRIMARY KEY, room_id TEXT UNIQUE NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS npcs (slot INTEGER PRIMARY KEY, role TEXT NOT NULL, seed INTEGER NOT NULL,
+                                 room_id TEXT NOT NULL, last_moved_at INTEGER NOT NULL, defeated INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS npc_items (npc_id TEXT NOT NULL, item_id TEXT NOT NULL, count INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Rooms are compared as JSON text to find the changed ones, so every room is encoded the same way
+encode_room = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+
+UPSERT_ROOM = ("INSERT INTO rooms (room_id, data) VALUES (?, ?) "
+               "ON CONFLICT(room_id) DO UPDATE SET data = excluded.data")
+
+
+class WorldStore(MutableMapping):
+    """
+    A game_map backed by a SQLite file. It behaves like the usual
+    {room_id: room_dict} map, so the managers and main.py use it unchanged,
+    but only cache_size rooms are held at once, least recently used first
+    out. Rooms passed to keep_hot (the player's surroundings, rooms with
+    active entities) are never evicted, so room dicts being worked on stay
+    the same objects.
+
+    Rooms are edited in place as usual; nothing has to be marked dirty.
+    Each cached room remembers the JSON it was loaded from. On eviction
+    its JSON is compared with that, and only changed rooms are queued for
+    write-back. The queue goes to the database in one transaction every
+    write_batch rooms, and on flush() and close(). Room data in memory is
+    therefore bounded by cache_size + write_batch rooms (plus any hot rooms
+    beyond that), however big the facility is; the managers' own indices
+    (RoomGraph, the door table) stay in memory as compact per-room rows.
+
+    Iteration order is the order rooms were first stored, so a RoomRegistry
+    built over the store numbers rooms the same way every session.
+    """
+    def __init__(self, path, cache_size=4096, write_batch=256):
+        self.path = path
+        self.cache_size = cache_size
+        self.write_batch = write_batch
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self._cache = OrderedDict() # {room_id: room dict}, least recently used first
+        self._loaded = {} # {room_id: JSON text as last read or written}, for cached rooms
+        self._pending = {} # {room_id: JSON text} evicted changes not yet written
+        self._hot = set() # room ids never evicted
+        self._size = self._db.execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+
+    @classmethod
+    def create(cls, path, game_map, start_room_id=None, **options):
+        """
+        Writes a whole map into a new store and returns the store. Anything
+        an earlier world left in the file (rooms, NPCs, carried items, the
+        player) is cleared first, so none of it is restored into this one.
+        """
+        store = cls(path, **options)
+        with store._db:
+            for table in ("rooms", "npcs", "npc_items", "meta"):
+                store._db.execute(f"DELETE FROM {table}")
+            store._db.executemany("INSERT INTO rooms (room_id, data) VALUES (?, ?)",
+                                  ((room_id, encode_room(room)) for room_id, room in game_map.items()))
+        store._size = len(game_map)
+        if start_room_id is not None:
+            store.set_meta("start_room_id", start_room_id)
+        return store
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        # Ids are read up front so rooms can be loaded and written back while iterating
+        return iter([row[0] for row in self._db.execute("SELECT room_id FROM rooms ORDER BY room_index")])
+
+    def __contains__(self, room_id):
+        if room_id in self._cache or room_id in self._pending:
+            return True
+        return self._db.execute("SELECT 1 FROM rooms WHERE room_id = ?", (room_id,)).fetchone() is not None
+
+    def __getitem__(self, room_id):
+        room = self._cache.get(room_id)
+        if room is not None:
+            self._cache.move_to_end(room_id)
+            return room
+        text = self._pending.get(room_id)
+        if text is None:
+            row = self._db.execute("SELECT data FROM rooms WHERE room_id = ?", (room_id,)).fetchone()
+            if row is None:
+                raise KeyError(room_id)
+            text = row[0]
+        return self._cache_room(room_id, json.loads(text), text)
+
+    def __setitem__(self, room_id, room):
+        if room_id not in self:
+            with self._db:
+                self._db.execute("INSERT INTO rooms (room_id, data) VALUES (?, ?)", (room_id, encode_room(room)))
+            self._size += 1
+        self._pending.pop(room_id, None)
+        self._cache.pop(room_id, None)
+        self._cache_room(room_id, room, None) # Never equal to its JSON, so it is written back
+
+    def __delitem__(self, room_id):
+        if room_id not in self:
+            raise KeyError(room_id)
+        self._cache.pop(room_id, None)
+        self._loaded.pop(room_id, None)
+        self._pending.pop(room_id, None)
+        self._hot.discard(room_id)
+        with self._db:
+            self._db.execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+        self._size -= 1
+
+    def items(self):
+        """Streams (room_id, room) through the cache a page at a time, for whole-map passes (RoomGraph...)."""
+        last = -1
+        while True: # One page of rows at a time, so only the cache is ever in memory
+            rows = self._db.execute("SELECT room_index, room_id, data FROM rooms WHERE room_index > ? "
+                                    "ORDER BY room_index LIMIT ?", (last, self.cache_size)).fetchall()
+            if not rows:
+                return
+            for last, room_id, text in rows:
+                room = self._cache.get(room_id)
+                if room is None:
+                    text = self._pending.get(room_id, text)
+                    room = self._cache_room(room_id, json.loads(text), text)
+                yield room_id, room
+
+    def values(self):
+        return (room for _, room in self.items())
+
+    def _cache_room(self, room_id, room, text):
+        self._cache[room_id] = room
+        self._loaded[room_id] = text
+        if len(self._cache) > self.cache_size:
+            self._evict()
+        return room
+
+    def _evict(self):
+        """Drops least recently used rooms that are not hot, queueing the changed ones for write-back."""
+        cache = self._cache
+        skipped = 0 # Hot rooms are moved to the back instead, at most once each
+        while len(cache) > self.cache_size and skipped < len(cache):
+            room_id, room = cache.popitem(last=False)
+            if room_id in self._hot:
+                cache[room_id] = room
+                skipped += 1
+                continue
+            text = encode_room(room)
+            if text != self._loaded.pop(room_id):
+                self._pending[room_id] = text
+        if len(self._pending) >= self.write_batch:
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._db:
+            self._db.executemany(UPSERT_ROOM, self._pending.items())
+        self._pending.clear()
+
+    def keep_hot(self, room_ids):
+        """Replaces the set of rooms that stay cached (e.g. the player's room and its neighbours)."""
+        self._hot = set(room_ids)
+
+    def flush(self):
+        """Writes every changed room, cached or queued, to the database."""
+        for room_id, room in self._cache.items():
+            text = encode_room(room)
+            if text != self._loaded[room_id]:
+                self._pending[room_id] = text
+                self._loaded[room_id] = text
+        if self._pending:
+            self._write_pending()
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def cached_room_count(self):
+        return len(self._cache)
+
+    def get_meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set_meta(self, key, value):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def save_npcs(self, npc_manager):
+        """Replaces the stored NPCs with every NPC of an NPCManager (role, seed, position, defeated or not)."""
+        with self._db:
+            self._db.execute("DELETE FROM npcs")
+            self._db.executemany("INSERT INTO npcs VALUES (?, ?, ?, ?, ?, ?)", npc_manager.npc_records())
+
+    def load_npcs(self, npc_manager):
+        """Restores the stored NPCs into an empty NPCManager, keeping their ids. Returns how many."""
+        rows = self._db.execute("SELECT role, seed, room_id, last_moved_at, defeated FROM npcs ORDER BY slot").fetchall()
+        for role, seed, room_id, last_moved_at, defeated in rows:
+            npc_manager.restore_npc(role, room_id, seed, last_moved_at, bool(defeated))
+        return len(rows)
+
+    def save_items(self, item_manager):
+        """
+        Writes where items are now: each room's "items" list becomes its
+        current contents, and what NPCs carry goes to its own table. The
+        player's own items are saved by save_player.
+        """
+        for room_id, item_ids in item_manager.room_contents():
+            self[room_id]["items"] = item_ids
+        with self._db:
+            self._db.execute("DELETE FROM npc_items")
+            self._db.executemany("INSERT INTO npc_items VALUES (?, ?, ?)", item_manager.npc_contents())
+
+    def load_npc_items(self, item_manager):
+        """Gives NPCs back the items they carried (rooms restock themselves from their "items" lists)."""
+        for npc_id, item_id, count in self._db.execute("SELECT npc_id, item_id, count FROM npc_items").fetchall():
+            item_manager.npc_items(npc_id).add_item(item_id, count)
+
+    def save_world(self, npc_manager, item_manager, player):
+        """
+        Checkpoints everything that lives outside the rooms (NPCs, item
+        placements, the player) and writes every changed room, so a crash
+        loses only what happened since.
+        """
+        self.save_npcs(npc_manager)
+        self.save_items(item_manager)
+        self.save_player(player)
+        self.flush()
+
+    def save_player(self, player):
+        """Keeps the player's room, backpack and hands with the world, as they were taken out of its rooms."""
+        hands = {}
+        for hand in ("left_hand", "right_hand"):
+            item = getattr(player, hand)
+            hands[hand] = [item.item_id, item.count] if item is not None else None
+        self.set_meta("player", dict(hands, location=player.location,
+                                     backpack=[[instance.item_id, instance.count] for instance in player.inventory]))
+
+    def load_player(self, player):
+        """Puts a new Player back where it was saved, carrying what it carried. Returns False if none was saved."""
+        saved = self.get_meta("player")
+        if saved is None:
+            return False
+        if saved["location"] in self:
+            player.location = saved["location"]
+        for item_id, count in saved["backpack"]:
+            player.inventory.add_item(item_id, count)
+        for hand in ("left", "right"):
+            held = saved[f"{hand}_hand"]
+            if held is not None:
+                player.set_hand(hand, player.inventory.registry.create(*held))
+        return True
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from door_manager import DoorManager
+    from map_generator import generate_grid_map
+
+    game_map, start_room_id = generate_grid_map(316, 316, door_level_weights={0: 6, 1: 3, 2: 1})
+    path = os.path.join(tempfile.mkdtemp(), "facility.db")
+    start = time.perf_counter()
+    WorldStore.create(path, game_map, start_room_id).close()
+    print(f"{len(game_map)} rooms written to {path} in {time.perf_counter() - start:.2f}s")
+    del game_map
+
+    with WorldStore(path, cache_size=2048) as store:
+        start = time.perf_counter()
+        door_manager = DoorManager(store)
+        print(f"DoorManager built over the store in {time.perf_counter() - start:.2f}s, "
+              f"{store.cached_room_count()} rooms cached")
+        start = time.perf_counter()
+        for x in range(316):
+            store.keep_hot([f"room_{x}_{x}"])
+            door_manager.lock_door(f"room_{x}_{x}", "north" if x < 315 else "south")
+        store.flush()
+        print(f"316 doors locked along the diagonal and written back in {time.perf_counter() - start:.2f}s")
+
+    with WorldStore(path) as store:
+        print(f"Reopened: room_100_100 north is {store['room_100_100']['exits']['north'].get('state')}")